@@ -0,0 +1,313 @@
+# db_archive.py
+
+import datetime
+import glob
+import os
+import re
+import sqlite3
+import threading
+from db_operations.db_connect import DatabaseManager
+from db_operations.db_search_index import ensure_archive_search_index, index_archived_weighings
+from utils.logger_config import app_logger
+
+# Días que un pesaje cerrado (y un registro de acceso) permanece en la base viva;
+# se cambia con app_settings 'archive_after_days' (0 = no archivar)
+DEFAULT_ARCHIVE_AFTER_DAYS = 365
+ARCHIVE_DIR_NAME = 'archive'
+ARCHIVE_FILE_PATTERN = 'scale_archive_{year}.db'
+# Pesajes principales por transacción al archivar
+ARCHIVE_BATCH_SIZE = 2000
+# SQLite permite 10 bases adjuntas por conexión (SQLITE_MAX_ATTACHED)
+MAX_ATTACHED_ARCHIVES = 9
+
+# Tablas que se archivan, con las mismas columnas que en la base viva
+ARCHIVE_TABLES = ('weighing_records', 'folio_history', 'logins')
+ARCHIVE_INDEXES = (
+    'CREATE INDEX IF NOT EXISTS archive.idx_archive_folio_history_weighing ON folio_history (id_weighing)',
+)
+
+
+def archive_dir(db_path=None):
+    """Carpeta de los archivos anuales, junto a la base de datos viva"""
+    db_path = db_path or DatabaseManager.default_db_path
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), ARCHIVE_DIR_NAME)
+
+
+def archive_path(year, db_path=None):
+    return os.path.join(archive_dir(db_path), ARCHIVE_FILE_PATTERN.format(year=year))
+
+
+def list_archives(db_path=None, limit=MAX_ATTACHED_ARCHIVES):
+    """
+    Archivos anuales existentes, del más reciente al más antiguo.
+
+    Returns:
+        list: (año, ruta)
+    """
+    archives = []
+    for path in glob.glob(os.path.join(archive_dir(db_path), ARCHIVE_FILE_PATTERN.format(year='*'))):
+        match = re.search(r'(\d{4})\.db$', path)
+        if match:
+            archives.append((match.group(1), path))
+    archives.sort(reverse=True)
+    return archives[:limit] if limit else archives
+
+
+class WeighingArchive:
+    """
+    Mueve los pesajes cerrados más antiguos que 'archive_after_days' (con su
+    complementario de ALM2 y su historial) y los registros de acceso viejos a
+    un archivo SQLite por año (año de cierre o de acceso).
+
+    Cada año se procesa con su archivo adjunto (ATTACH), por lotes: en cada
+    transacción primero se copia con INSERT OR REPLACE y después se borra de
+    la base viva.
+    Con WAL el commit no es atómico entre archivos; si se interrumpe entre
+    ambos, la siguiente corrida vuelve a copiar (sin duplicar) y termina de borrar.
+
+    Nunca se archiva la fila con el id más alto de cada tabla: sin AUTOINCREMENT,
+    SQLite reutilizaría ese id y chocaría con el archivado. Tampoco un pesaje
+    (o su complementario) con envíos pendientes en la cola de Odoo: el worker
+    necesita la fila viva para leer su id de Odoo y guardar el resultado.
+
+    Cada archivo tiene su propio índice de texto completo (weighing_search, igual
+    al de la base viva) para que el historial se busque igual en ambos.
+    """
+
+    def __init__(self, db_manager=None):
+        self.logger = app_logger.getChild('WeighingArchive')
+        self.db_manager = db_manager or DatabaseManager()
+
+    def archive_after_days(self, conn):
+        try:
+            row = conn.execute(
+                "SELECT setting_value FROM app_settings WHERE setting_key = 'archive_after_days'"
+            ).fetchone()
+            return max(0, int(row[0])) if row else DEFAULT_ARCHIVE_AFTER_DAYS
+        except (sqlite3.Error, TypeError, ValueError):
+            return DEFAULT_ARCHIVE_AFTER_DAYS
+
+    def _ensure_archive_schema(self, cursor):
+        """
+        Crear las tablas y el índice de texto en el archivo adjunto y agregar las
+        columnas nuevas de la base viva (no hace commit)
+        """
+        for table in ARCHIVE_TABLES:
+            exists = cursor.execute(
+                "SELECT 1 FROM archive.sqlite_master WHERE type = 'table' AND name = ?", (table,)
+            ).fetchone()
+            if not exists:
+                create_sql = cursor.execute(
+                    "SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?", (table,)
+                ).fetchone()[0]
+                cursor.execute(re.sub(r'^CREATE TABLE\s+"?\w+"?', f'CREATE TABLE archive.{table}', create_sql))
+                continue
+
+            archived_columns = {row[1] for row in cursor.execute(f"PRAGMA archive.table_info({table})")}
+            for row in cursor.execute(f"PRAGMA main.table_info({table})").fetchall():
+                if row[1] not in archived_columns:
+                    cursor.execute(f"ALTER TABLE archive.{table} ADD COLUMN {row[1]} {row[2]}")
+        for statement in ARCHIVE_INDEXES:
+            cursor.execute(statement)
+        ensure_archive_search_index(cursor, 'archive')
+
+    def _columns(self, cursor, table):
+        return ', '.join(row[1] for row in cursor.execute(f"PRAGMA main.table_info({table})").fetchall())
+
+    def _archive_weighing_batch(self, conn, year, cutoff):
+        """Copiar y borrar un lote de pesajes del año con su historial; devuelve (pesajes, historial)"""
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+
+        # Pesajes principales cerrados del año y sus complementarios de ALM2
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS archive_ids (id_weighing INTEGER PRIMARY KEY)")
+        cursor.execute("DELETE FROM temp.archive_ids")
+        cursor.execute('''
+            INSERT INTO temp.archive_ids (id_weighing)
+            SELECT id_weighing FROM main.weighing_records
+            WHERE scale_record_status = 'Cerrado'
+            AND companion_of IS NULL
+            AND date_end < ? AND substr(date_end, 1, 4) = ?
+            AND id_weighing < (SELECT MAX(id_weighing) FROM main.weighing_records)
+            AND NOT EXISTS (SELECT 1 FROM main.odoo_outbox o WHERE o.id_weighing = weighing_records.id_weighing)
+            AND NOT EXISTS (
+                SELECT 1 FROM main.weighing_records c
+                JOIN main.odoo_outbox o ON o.id_weighing = c.id_weighing
+                WHERE c.companion_of = weighing_records.id_weighing
+            )
+            ORDER BY id_weighing
+            LIMIT ?
+        ''', (cutoff, year, ARCHIVE_BATCH_SIZE))
+        if cursor.rowcount == 0:
+            conn.rollback()
+            return 0, 0
+        cursor.execute('''
+            INSERT OR IGNORE INTO temp.archive_ids (id_weighing)
+            SELECT id_weighing FROM main.weighing_records
+            WHERE companion_of IN (SELECT id_weighing FROM temp.archive_ids)
+            AND id_weighing < (SELECT MAX(id_weighing) FROM main.weighing_records)
+        ''')
+
+        columns = self._columns(cursor, 'weighing_records')
+        cursor.execute(f'''
+            INSERT OR REPLACE INTO archive.weighing_records ({columns})
+            SELECT {columns} FROM main.weighing_records
+            WHERE id_weighing IN (SELECT id_weighing FROM temp.archive_ids)
+        ''')
+        index_archived_weighings(cursor, 'archive', 'wr.id_weighing IN (SELECT id_weighing FROM temp.archive_ids)')
+
+        history_filter = '''
+            id_weighing IN (SELECT id_weighing FROM temp.archive_ids)
+            AND id_history < (SELECT MAX(id_history) FROM main.folio_history)
+        '''
+        columns = self._columns(cursor, 'folio_history')
+        cursor.execute(f'''
+            INSERT OR REPLACE INTO archive.folio_history ({columns})
+            SELECT {columns} FROM main.folio_history WHERE {history_filter}
+        ''')
+        cursor.execute(f"DELETE FROM main.folio_history WHERE {history_filter}")
+        history = cursor.rowcount
+
+        cursor.execute("DELETE FROM main.weighing_records WHERE id_weighing IN (SELECT id_weighing FROM temp.archive_ids)")
+        weighings = cursor.rowcount
+        cursor.execute("DELETE FROM temp.archive_ids")
+        conn.commit()
+        return weighings, history
+
+    def _archive_logins(self, conn, year, cutoff):
+        """Copiar y borrar los registros de acceso del año; devuelve cuántos se archivaron"""
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        logins_filter = '''
+            datetime < ? AND substr(datetime, 1, 4) = ?
+            AND id_login_history < (SELECT MAX(id_login_history) FROM main.logins)
+        '''
+        columns = self._columns(cursor, 'logins')
+        cursor.execute(f'''
+            INSERT OR REPLACE INTO archive.logins ({columns})
+            SELECT {columns} FROM main.logins WHERE {logins_filter}
+        ''', (cutoff, year))
+        cursor.execute(f"DELETE FROM main.logins WHERE {logins_filter}", (cutoff, year))
+        logins = cursor.rowcount
+        conn.commit()
+        return logins
+
+    def _archive_year(self, conn, year, cutoff):
+        """
+        Archivar un año por lotes de ARCHIVE_BATCH_SIZE pesajes (cada lote en su
+        transacción, para no bloquear a la interfaz mientras tanto).
+
+        Returns:
+            tuple: (pesajes, historial, accesos) archivados
+        """
+        conn.execute("ATTACH DATABASE ? AS archive", (archive_path(year, self.db_manager.db_path),))
+        try:
+            self._ensure_archive_schema(conn.cursor())
+            conn.commit()
+            weighings = history = 0
+            while True:
+                batch_weighings, batch_history = self._archive_weighing_batch(conn, year, cutoff)
+                if batch_weighings == 0:
+                    break
+                weighings += batch_weighings
+                history += batch_history
+            logins = self._archive_logins(conn, year, cutoff)
+            return weighings, history, logins
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.execute("DETACH DATABASE archive")
+
+    def index_archives(self):
+        """
+        Crear el índice de texto completo en los archivos anuales que no lo tienen
+        (archivos de antes del índice).
+
+        Returns:
+            list: años indexados
+        """
+        conn = None
+        indexed = []
+        try:
+            conn = self.db_manager.connect_db(row_factory=None)
+            for year, path in list_archives(self.db_manager.db_path, limit=None):
+                conn.execute("ATTACH DATABASE ? AS archive", (path,))
+                try:
+                    if ensure_archive_search_index(conn.cursor(), 'archive'):
+                        indexed.append(year)
+                    conn.commit()
+                finally:
+                    if conn.in_transaction:
+                        conn.rollback()
+                    conn.execute("DETACH DATABASE archive")
+            if indexed:
+                self.logger.info(f"🔎 Índice de texto creado en los archivos: {', '.join(indexed)}")
+            return indexed
+
+        except sqlite3.Error as e:
+            self.logger.error(f"❌ Error al indexar los archivos anuales: {e}")
+            return indexed
+        finally:
+            if conn:
+                self.db_manager.close_db(conn)
+
+    def archive_old_records(self, older_than_days=None):
+        """
+        Archivar los pesajes cerrados y accesos más antiguos que older_than_days
+        (por defecto app_settings 'archive_after_days').
+
+        Returns:
+            dict: año -> (pesajes, historial, accesos) archivados
+        """
+        conn = None
+        archived = {}
+        try:
+            conn = self.db_manager.connect_db(row_factory=None)
+            days = self.archive_after_days(conn) if older_than_days is None else older_than_days
+            if days <= 0:
+                return archived
+
+            cutoff = (datetime.datetime.now() - datetime.timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+            years = [row[0] for row in conn.execute('''
+                SELECT substr(date_end, 1, 4) FROM weighing_records
+                WHERE scale_record_status = 'Cerrado' AND companion_of IS NULL AND date_end < ?
+                UNION
+                SELECT substr(datetime, 1, 4) FROM logins WHERE datetime < ?
+            ''', (cutoff, cutoff)).fetchall() if row[0]]
+            if not years:
+                return archived
+
+            os.makedirs(archive_dir(self.db_manager.db_path), exist_ok=True)
+            for year in sorted(years):
+                archived[year] = self._archive_year(conn, year, cutoff)
+                self.logger.info(
+                    f"🗄️ Archivo {year}: {archived[year][0]} pesajes, "
+                    f"{archived[year][1]} cambios de historial, {archived[year][2]} accesos"
+                )
+            return archived
+
+        except (sqlite3.Error, OSError) as e:
+            self.logger.error(f"❌ Error al archivar registros antiguos: {e}")
+            return archived
+        finally:
+            if conn:
+                self.db_manager.close_db(conn)
+
+
+def start_archive_job():
+    """Archivar en segundo plano al iniciar la aplicación, sin detener la interfaz"""
+    def run():
+        archive = WeighingArchive()
+        try:
+            archive.index_archives()
+            archive.archive_old_records()
+        finally:
+            archive.db_manager.close_thread_connections()
+
+    thread = threading.Thread(target=run, name='WeighingArchive', daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == '__main__':
+    print(WeighingArchive().archive_old_records())
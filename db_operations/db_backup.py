@@ -0,0 +1,296 @@
+# db_backup.py
+
+import datetime
+import glob
+import os
+import sqlite3
+import threading
+import time
+from db_operations.db_connect import DatabaseManager
+from utils.logger_config import app_logger
+
+# Cada cuánto se respalda y cuántos respaldos se conservan; se cambian con
+# app_settings 'backup_interval_minutes' (0 = sin respaldos) y 'backup_keep'
+DEFAULT_BACKUP_INTERVAL_MINUTES = 60
+DEFAULT_BACKUP_KEEP = 24
+# Carpeta de respaldos junto a la base viva; app_settings 'backup_dir' la cambia
+BACKUP_DIR_NAME = 'backups'
+BACKUP_FILE_PATTERN = 'scale_backup_{stamp}.db'
+BACKUP_STAMP_FORMAT = '%Y%m%d_%H%M%S_%f'
+PARTIAL_SUFFIX = '.partial'
+# Páginas copiadas por paso y pausa entre pasos (la copia cede la E/S a la interfaz)
+BACKUP_PAGES_PER_STEP = 64
+BACKUP_STEP_SLEEP_SECONDS = 0.005
+# Espera antes del primer respaldo, para no competir con el arranque de la aplicación
+FIRST_BACKUP_DELAY_SECONDS = 30
+
+
+def read_setting(conn, key, default):
+    """Valor entero de app_settings (default si no existe o no es válido)"""
+    try:
+        row = conn.execute("SELECT setting_value FROM app_settings WHERE setting_key = ?", (key,)).fetchone()
+        return max(0, int(row[0])) if row else default
+    except (sqlite3.Error, TypeError, ValueError):
+        return default
+
+
+class BackupService:
+    """
+    Respaldo en línea de la base de datos con la API de respaldo de SQLite
+    (sqlite3.Connection.backup), en un hilo de fondo.
+
+    La copia se hace desde una conexión propia que mantiene abierta una
+    transacción de lectura: con WAL los escritores no se bloquean y el
+    respaldo es una foto consistente de ese instante (sin esa transacción,
+    cada commit de otra conexión reiniciaría la copia desde el principio).
+    Se copian BACKUP_PAGES_PER_STEP páginas por paso con una pausa entre pasos.
+
+    Cada respaldo se escribe primero como '.partial', se valida con
+    PRAGMA integrity_check y solo entonces se renombra; se conservan los
+    'backup_keep' más recientes.
+    """
+
+    def __init__(self, db_manager=None):
+        self.logger = app_logger.getChild('BackupService')
+        self.db_manager = db_manager or DatabaseManager()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.last_result = None
+
+    def backup_dir(self, conn=None):
+        """Carpeta de respaldos: app_settings 'backup_dir' o 'backups' junto a la base viva"""
+        if conn is not None:
+            try:
+                row = conn.execute("SELECT setting_value FROM app_settings WHERE setting_key = 'backup_dir'").fetchone()
+                if row and row[0]:
+                    return row[0]
+            except sqlite3.Error:
+                pass
+        return os.path.join(os.path.dirname(os.path.abspath(self.db_manager.db_path)), BACKUP_DIR_NAME)
+
+    def list_backups(self, directory=None):
+        """Respaldos terminados, del más reciente al más antiguo"""
+        directory = directory or self.backup_dir()
+        return sorted(glob.glob(os.path.join(directory, BACKUP_FILE_PATTERN.format(stamp='*'))), reverse=True)
+
+    def _copy(self, source, target_path):
+        """
+        Copiar la base por pasos a target_path.
+
+        Returns:
+            tuple: (páginas copiadas, pasos)
+        """
+        progress = {'pages': 0, 'steps': 0}
+
+        def on_progress(status, remaining, total):
+            progress['pages'] = total
+            progress['steps'] += 1
+            # sqlite3 solo duerme entre pasos si la base está ocupada: la pausa se hace aquí
+            if remaining:
+                time.sleep(BACKUP_STEP_SLEEP_SECONDS)
+
+        target = sqlite3.connect(target_path)
+        try:
+            # Transacción de lectura: fija la foto de la base durante toda la copia
+            source.execute("BEGIN")
+            source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+            try:
+                source.backup(target, pages=BACKUP_PAGES_PER_STEP, progress=on_progress)
+            finally:
+                source.rollback()
+
+            # El respaldo queda como un solo archivo, sin -wal ni -shm
+            target.execute("PRAGMA journal_mode=DELETE")
+            result = target.execute("PRAGMA integrity_check").fetchall()
+            if result != [('ok',)]:
+                raise sqlite3.DatabaseError(
+                    "integrity_check: " + "; ".join(str(row[0]) for row in result[:5])
+                )
+            return progress['pages'], progress['steps']
+        finally:
+            target.close()
+
+    def run_backup(self):
+        """
+        Hacer un respaldo ahora y rotar los anteriores.
+
+        Returns:
+            dict: path, seconds, bytes, mb_per_second, pages, steps y removed,
+                  o None si falló
+        """
+        source = None
+        partial_path = None
+        try:
+            source = self.db_manager.open_dedicated_connection()
+            directory = self.backup_dir(source)
+            keep = read_setting(source, 'backup_keep', DEFAULT_BACKUP_KEEP)
+            os.makedirs(directory, exist_ok=True)
+
+            stamp = datetime.datetime.now().strftime(BACKUP_STAMP_FORMAT)
+            final_path = os.path.join(directory, BACKUP_FILE_PATTERN.format(stamp=stamp))
+            partial_path = final_path + PARTIAL_SUFFIX
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+
+            started = time.perf_counter()
+            pages, steps = self._copy(source, partial_path)
+            os.replace(partial_path, final_path)
+            seconds = time.perf_counter() - started
+
+            size = os.path.getsize(final_path)
+            removed = self.rotate(directory, keep)
+            self.last_result = {
+                'path': final_path,
+                'seconds': round(seconds, 3),
+                'bytes': size,
+                'mb_per_second': round(size / 1_048_576 / seconds, 1) if seconds else 0.0,
+                'pages': pages,
+                'steps': steps,
+                'removed': removed,
+            }
+            self.logger.info(
+                f"💾 Respaldo {os.path.basename(final_path)}: {size / 1_048_576:.1f} MB en "
+                f"{seconds:.2f} s ({self.last_result['mb_per_second']} MB/s, {steps} pasos), "
+                f"integridad ok, {len(removed)} respaldos antiguos eliminados"
+            )
+            return self.last_result
+
+        except (sqlite3.Error, OSError) as e:
+            self.logger.error(f"❌ Error al respaldar la base de datos: {e}")
+            if partial_path and os.path.exists(partial_path):
+                try:
+                    os.remove(partial_path)
+                except OSError:
+                    pass
+            return None
+        finally:
+            if source:
+                source.close()
+
+    def rotate(self, directory, keep):
+        """Borrar los respaldos que sobran (y restos '.partial'); devuelve los eliminados"""
+        removed = []
+        stale = self.list_backups(directory)[keep:] if keep else []
+        stale += glob.glob(os.path.join(directory, BACKUP_FILE_PATTERN.format(stamp='*') + PARTIAL_SUFFIX))
+        for path in stale:
+            try:
+                os.remove(path)
+                removed.append(path)
+            except OSError as e:
+                self.logger.warning(f"⚠️ No se pudo eliminar el respaldo {path}: {e}")
+        return removed
+
+    def _interval_seconds(self):
+        conn = self.db_manager.connect_db(row_factory=None)
+        if conn is None:
+            return DEFAULT_BACKUP_INTERVAL_MINUTES * 60
+        try:
+            return read_setting(conn, 'backup_interval_minutes', DEFAULT_BACKUP_INTERVAL_MINUTES) * 60
+        finally:
+            self.db_manager.close_db(conn)
+
+    def _run(self, first_delay):
+        try:
+            if self._stop_event.wait(first_delay):
+                return
+            while True:
+                interval = self._interval_seconds()
+                if interval <= 0:
+                    self.logger.info("💾 Respaldos desactivados (backup_interval_minutes = 0)")
+                    return
+                self.run_backup()
+                if self._stop_event.wait(interval):
+                    return
+        finally:
+            self.db_manager.close_thread_connections()
+
+    def start(self, first_delay=FIRST_BACKUP_DELAY_SECONDS):
+        """Iniciar los respaldos periódicos en un hilo de fondo"""
+        if self._thread and self._thread.is_alive():
+            return self._thread
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, args=(first_delay,), name='BackupService', daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout=None):
+        """Detener los respaldos periódicos (espera a que termine un respaldo en curso)"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+_backup_service = None
+
+
+def start_backup_service():
+    """Servicio de respaldos de la aplicación, iniciado una sola vez"""
+    global _backup_service
+    if _backup_service is None:
+        _backup_service = BackupService()
+    _backup_service.start()
+    return _backup_service
+
+
+def benchmark(weighings=200_000):
+    """
+    Respaldar una base temporal con escrituras simultáneas y medir la espera
+    máxima de cada escritura mientras corre la copia.
+    """
+    import shutil
+    import tempfile
+    from db_operations.db_create_db import create_database
+
+    original_path = DatabaseManager.default_db_path
+    temp_dir = tempfile.mkdtemp(prefix='scale_backup_')
+    DatabaseManager.configure(os.path.join(temp_dir, 'backup_benchmark.db'))
+    manager = DatabaseManager()
+    try:
+        create_database()
+        conn = manager.connect_db(row_factory=None)
+        conn.executemany(
+            "INSERT INTO weighing_records (folio_number, weighing_type, scale_record_status, date_start, notes) VALUES (?, 'Entrada', 'Cerrado', '2024-01-01 08:00:00', ?)",
+            ((f"{number:06d}", 'x' * 200) for number in range(1, weighings + 1))
+        )
+        conn.commit()
+
+        done = threading.Event()
+        latencies = []
+
+        def writer():
+            writer_conn = manager.open_dedicated_connection()
+            number = weighings
+            while not done.is_set():
+                number += 1
+                started = time.perf_counter()
+                writer_conn.execute(
+                    "INSERT INTO weighing_records (folio_number, weighing_type, scale_record_status, date_start) VALUES (?, 'Entrada', 'Pendiente', '2024-01-01 08:00:00')",
+                    (f"{number:06d}",)
+                )
+                writer_conn.commit()
+                latencies.append(time.perf_counter() - started)
+                time.sleep(0.01)
+            writer_conn.close()
+
+        writer_thread = threading.Thread(target=writer)
+        writer_thread.start()
+        result = BackupService(manager).run_backup()
+        done.set()
+        writer_thread.join()
+
+        print(result)
+        if latencies:
+            latencies.sort()
+            print(
+                f"Escrituras durante el respaldo: {len(latencies)} | "
+                f"mediana {latencies[len(latencies) // 2] * 1000:.2f} ms | máxima {latencies[-1] * 1000:.2f} ms"
+            )
+    finally:
+        manager.close_thread_connections()
+        DatabaseManager.configure(original_path)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    benchmark()
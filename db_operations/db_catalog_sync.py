@@ -0,0 +1,169 @@
+# db_catalog_sync.py
+
+import os
+import sqlite3
+import tempfile
+import time
+from db_operations.db_connect import DatabaseManager
+from utils.logger_config import app_logger
+
+
+class CatalogSync:
+    """
+    Sincronización masiva de un catálogo de Odoo (vehículos, remolques, choferes,
+    materiales, clientes) en una sola transacción:
+
+    1. Los registros se cargan con executemany en una tabla temporal.
+    2. INSERT ... ON CONFLICT(llave externa) DO UPDATE inserta los nuevos y
+       actualiza solo las filas que cambiaron.
+    3. Los registros locales que ya no vienen de Odoo se desactivan con un
+       anti-join (NOT EXISTS), sin listas NOT IN (?, ?, ...) que superen el
+       límite de variables de SQLite.
+
+    La llave externa 0 queda reservada para los registros "externos" locales y
+    nunca se toca (los índices únicos de la migración 5 la excluyen).
+    """
+
+    def __init__(self, table, key_column, active_column, columns, db_manager=None):
+        """
+        Args:
+            table: tabla del catálogo
+            key_column: columna con el id de Odoo (external_id_*)
+            active_column: columna de activo/inactivo
+            columns: columnas que se sincronizan, sin la llave (mismo orden que las filas)
+        """
+        self.logger = app_logger.getChild('CatalogSync')
+        self.table = table
+        self.key_column = key_column
+        self.active_column = active_column
+        self.columns = tuple(columns)
+        self.db_manager = db_manager or DatabaseManager()
+        self.staging_table = f"sync_{table}"
+
+    def _statements(self):
+        all_columns = (self.key_column,) + self.columns
+        column_list = ', '.join(all_columns)
+        placeholders = ', '.join('?' for _ in all_columns)
+        changed = ' OR '.join(f'{self.table}.{column} IS NOT excluded.{column}' for column in self.columns)
+        updates = ', '.join(f'{column} = excluded.{column}' for column in self.columns)
+
+        create_staging = f'''
+            CREATE TEMP TABLE IF NOT EXISTS {self.staging_table} (
+                {self.key_column} INTEGER PRIMARY KEY,
+                {', '.join(self.columns)}
+            )
+        '''
+        # Si Odoo repite un id, gana el último registro (igual que antes fila por fila)
+        stage = f"INSERT OR REPLACE INTO temp.{self.staging_table} ({column_list}) VALUES ({placeholders})"
+        # "WHERE true" evita que el ON CONFLICT se lea como parte de un JOIN
+        upsert = f'''
+            INSERT INTO {self.table} ({column_list})
+            SELECT {column_list} FROM temp.{self.staging_table} WHERE true
+            ON CONFLICT({self.key_column}) WHERE {self.key_column} <> 0
+            DO UPDATE SET {updates}
+            WHERE {changed}
+        '''
+        deactivate = f'''
+            UPDATE {self.table}
+            SET {self.active_column} = 0
+            WHERE {self.key_column} <> 0
+            AND {self.active_column} <> 0
+            AND NOT EXISTS (
+                SELECT 1 FROM temp.{self.staging_table} s
+                WHERE s.{self.key_column} = {self.table}.{self.key_column}
+            )
+        '''
+        return create_staging, stage, upsert, deactivate
+
+    def sync(self, rows, extra_deactivation=None):
+        """
+        Sincronizar el catálogo con los registros de Odoo.
+
+        Args:
+            rows: tuplas (llave externa, *columnas) en el orden de 'columns'
+            extra_deactivation: (condición SQL, parámetros) para desactivar además
+                                otros registros dentro de la misma transacción
+
+        Returns:
+            tuple: (registros procesados, registros desactivados)
+
+        Raises:
+            sqlite3.Error: la transacción se deshace completa
+        """
+        rows = [row for row in rows if row[0] != 0]
+        create_staging, stage, upsert, deactivate = self._statements()
+
+        conn = self.db_manager.connect_db(row_factory=None)
+        try:
+            cursor = conn.cursor()
+            cursor.execute(create_staging)
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(f"DELETE FROM temp.{self.staging_table}")
+            cursor.executemany(stage, rows)
+            cursor.execute(upsert)
+
+            deactivated = 0
+            # Una respuesta vacía de Odoo no desactiva todo el catálogo
+            if rows:
+                cursor.execute(deactivate)
+                deactivated = cursor.rowcount
+            if extra_deactivation:
+                condition, params = extra_deactivation
+                cursor.execute(
+                    f"UPDATE {self.table} SET {self.active_column} = 0 "
+                    f"WHERE {self.active_column} <> 0 AND ({condition})",
+                    params
+                )
+                deactivated += cursor.rowcount
+
+            cursor.execute(f"DELETE FROM temp.{self.staging_table}")
+            conn.commit()
+            self.logger.info(f"🔄 {self.table}: {len(rows)} registros sincronizados, {deactivated} desactivados")
+            return len(rows), deactivated
+        finally:
+            self.db_manager.close_db(conn)
+
+
+def benchmark(sizes=(10_000, 100_000, 1_000_000)):
+    """
+    Medir la sincronización de vehículos sobre una base temporal:
+    carga inicial, resincronización sin cambios y resincronización con 10 %
+    de registros modificados y 1 % dados de baja.
+    """
+    from db_operations.db_create_db import create_database
+    from db_operations.db_vehicles import Vehicles
+
+    def odoo_vehicles(count, version=0, skip_every=None):
+        for external_id in range(1, count + 1):
+            if skip_every and external_id % skip_every == 0:
+                continue
+            model = f"Modelo {external_id % 50}" + (f" v{version}" if external_id % 10 == 0 else '')
+            yield {'id': external_id, 'license_plate': f"P{external_id:08d}",
+                   'model_id': [external_id % 50, model], 'x_studio_tara': external_id % 9000, 'active': True}
+
+    original_path = DatabaseManager.default_db_path
+    for size in sizes:
+        temp_dir = tempfile.mkdtemp(prefix='scale_sync_')
+        DatabaseManager.configure(os.path.join(temp_dir, 'sync_benchmark.db'))
+        try:
+            create_database()
+            vehicles = Vehicles()
+            for label, records in (
+                ('carga inicial', list(odoo_vehicles(size))),
+                ('sin cambios', list(odoo_vehicles(size))),
+                ('10 % cambios, 1 % bajas', list(odoo_vehicles(size, version=1, skip_every=100))),
+            ):
+                started = time.perf_counter()
+                vehicles.save_vehicles_from_odoo(records)
+                elapsed = time.perf_counter() - started
+                print(f"{size:>9,} vehículos | {label:<24} | {elapsed:7.2f} s | {size / elapsed:>10,.0f} reg/s")
+        finally:
+            DatabaseManager().close_thread_connections()
+            DatabaseManager.configure(original_path)
+            for file_name in os.listdir(temp_dir):
+                os.remove(os.path.join(temp_dir, file_name))
+            os.rmdir(temp_dir)
+
+
+if __name__ == '__main__':
+    benchmark()
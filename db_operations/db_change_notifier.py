@@ -0,0 +1,167 @@
+# db_change_notifier.py
+
+import sqlite3
+import tkinter as tk
+from db_operations.db_connect import DatabaseManager
+from utils.logger_config import app_logger
+
+# Tablas con contador de cambios. weighing_records más los catálogos cuyo
+# texto aparece en las listas de folios y en los autocompletados.
+WATCHED_TABLES = (
+    'weighing_records', 'vehicles', 'trailers', 'drivers', 'customers', 'materials', 'users',
+)
+
+# Lo que muestran las tablas de folios: pesajes y los nombres de sus catálogos
+FOLIO_TABLES = WATCHED_TABLES
+
+POLL_INTERVAL_MS = 1000
+
+
+def create_change_counters(cursor):
+    """
+    Crear table_versions y los triggers que suben la versión de cada tabla
+    vigilada en cada INSERT, UPDATE o DELETE (paso de migración).
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS table_versions (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+    for table in WATCHED_TABLES:
+        cursor.execute("INSERT OR IGNORE INTO table_versions (table_name, version) VALUES (?, 0)", (table,))
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{event.lower()}
+                AFTER {event} ON {table} BEGIN
+                    UPDATE table_versions SET version = version + 1 WHERE table_name = '{table}';
+                END
+            ''')
+
+
+class ChangeNotifier:
+    """
+    Avisa a las tablas y autocompletados cuando cambian los datos que muestran,
+    aunque el cambio venga de otro hilo, proceso o estación.
+
+    Cada ciclo consulta PRAGMA data_version en una conexión propia (fuera del
+    pool): el valor cambia con cualquier commit de otra conexión, incluidas las
+    del pool de esta misma aplicación, y consultarlo no lee páginas. Solo si
+    cambió se leen los contadores de table_versions y se llama a los
+    suscriptores de las tablas que subieron de versión.
+
+    Se usa desde el hilo de Tk: start() programa el sondeo con after().
+    """
+
+    def __init__(self, db_manager=None, interval_ms=POLL_INTERVAL_MS):
+        self.logger = app_logger.getChild('ChangeNotifier')
+        self.db_manager = db_manager or DatabaseManager()
+        self.interval_ms = interval_ms
+        self._conn = None
+        self._data_version = None
+        self._versions = {}
+        self._published = {}
+        self._subscribers = []
+        self._widget = None
+        self._after_id = None
+
+    def subscribe(self, tables, callback):
+        """
+        Registrar callback(tablas_cambiadas) para una tabla o una tupla de tablas.
+        Se llama una sola vez por ciclo aunque cambien varias de sus tablas.
+        """
+        if isinstance(tables, str):
+            tables = (tables,)
+        self._subscribers.append((frozenset(tables), callback))
+
+    def unsubscribe(self, callback):
+        self._subscribers = [(tables, subscriber) for tables, subscriber in self._subscribers if subscriber != callback]
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = self.db_manager.open_dedicated_connection()
+        return self._conn
+
+    def _refresh(self):
+        """Releer table_versions solo si data_version cambió desde la última lectura"""
+        try:
+            conn = self._connection()
+            data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version != self._data_version or not self._versions:
+                self._versions = dict(conn.execute("SELECT table_name, version FROM table_versions"))
+                self._data_version = data_version
+        except sqlite3.Error as e:
+            self.logger.error(f"❌ Error al leer las versiones de las tablas: {e}")
+
+    def versions(self, tables=WATCHED_TABLES):
+        """
+        Versión actual de las tablas indicadas, para guardarla junto con lo
+        que se cargó y comparar después.
+
+        Returns:
+            tuple: versiones en el orden de 'tables'
+        """
+        self._refresh()
+        if isinstance(tables, str):
+            tables = (tables,)
+        return tuple(self._versions.get(table, 0) for table in tables)
+
+    def poll(self):
+        """
+        Revisar cambios y avisar a los suscriptores.
+
+        Returns:
+            set: tablas que cambiaron desde el ciclo anterior
+        """
+        self._refresh()
+        if not self._published:
+            # Primer ciclo: solo se toma la línea base
+            self._published = dict(self._versions)
+            return set()
+
+        changed = {table for table, version in self._versions.items() if self._published.get(table) != version}
+        if not changed:
+            return changed
+        self._published = dict(self._versions)
+        self.logger.debug(f"🔔 Tablas con cambios: {', '.join(sorted(changed))}")
+
+        for tables, callback in list(self._subscribers):
+            if tables & changed:
+                try:
+                    callback(tables & changed)
+                except Exception as e:
+                    self.logger.error(f"❌ Error en suscriptor de cambios {callback}: {e}")
+        return changed
+
+    def start(self, widget):
+        """Iniciar el sondeo en el loop de Tk (llamar desde el hilo principal)"""
+        self._widget = widget
+        if self._after_id is None:
+            self.poll()
+            self._after_id = widget.after(self.interval_ms, self._tick)
+
+    def stop(self):
+        if self._after_id is not None:
+            try:
+                self._widget.after_cancel(self._after_id)
+            except tk.TclError:
+                pass
+            self._after_id = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _tick(self):
+        self.poll()
+        self._after_id = self._widget.after(self.interval_ms, self._tick)
+
+
+_change_notifier = None
+
+
+def get_change_notifier():
+    """Notificador compartido por toda la aplicación"""
+    global _change_notifier
+    if _change_notifier is None:
+        _change_notifier = ChangeNotifier()
+    return _change_notifier
@@ -2,6 +2,7 @@
 
 
 from tkinter import filedialog
+import json
 import os
 import sqlite3
 from PIL import Image, ImageTk
@@ -9,13 +10,38 @@ from db_operations.db_connect import  DatabaseManager
 
 db_manager = DatabaseManager()
 
+# Valores por defecto de la lectura de báscula (se pueden sobrescribir por sitio en app_settings)
+SCALE_DEFAULT_SETTINGS = {
+    'scale_read_mode': 'event',      # 'event': read() bloqueante con timeout corto, 'poll': sondeo periódico
+    'scale_read_timeout': '0.05',    # Segundos que read() espera datos en modo 'event'
+    'scale_poll_interval': '3',      # Segundos entre lecturas en modo 'poll'
+    'scale_stability_samples': '5',  # Tamaño de la ventana de muestras para detectar estabilidad
+    'scale_stability_window_ms': '500',  # Tiempo mínimo que la ventana debe mantenerse estable
+    'scale_stability_tolerance': '10',   # kg de dispersión (o desviación estándar) aceptados
+    'scale_stability_mode': 'spread',    # 'spread' (máx - mín) o 'variance' (desviación estándar)
+    'scale_baudrate': '9600',            # Velocidad del puerto serial
+    'scale_framing': '8N1',              # Formato de carácter: '8N1', '7E1' o '7O1'
+    'scale_protocol': 'generic',         # Decodificador de trama: 'generic', 'toledo', 'ascii_st_gs'
+    'scale_max_frame_bytes': '256',      # Tamaño máximo de trama; lo que lo exceda se descarta y se resincroniza
+    'scale_capture_path': '',            # Archivo donde grabar los bytes crudos del puerto ('' = no grabar)
+    'scale_reconnect_base': '0.5',       # Primer reintento de conexión (segundos); se duplica en cada fallo
+    'scale_reconnect_max': '30',         # Tope del backoff de reconexión (segundos)
+    'scale_silent_timeout': '0',         # Segundos sin datos con el puerto abierto antes de reconectar (0 = no vigilar; los indicadores que solo envían al cambiar se quedan callados)
+    'scale_display_hz': '15',            # Frecuencia máxima de refresco del peso en pantalla
+    'scale_platforms': '',               # JSON con las plataformas: [{"name": "...", "port": "COM4", "protocol": "toledo", "baudrate": 9600}]
+    'scale_broadcast_enabled': '0',      # '1' para difundir el peso en vivo por TCP (líneas JSON)
+    'scale_broadcast_host': '127.0.0.1', # Interfaz de la difusión ('0.0.0.0' para otras PCs de la red)
+    'scale_broadcast_port': '8765',      # Puerto TCP de la difusión
+    'scale_reader_process': '0',         # '1' para leer las básculas en un proceso aparte (memoria compartida)
+}
+
 def set_logo_path(logo_path):
     """
     Guarda la ruta del logotipo en la base de datos.
     """
     conn = None
     try:
-        conn = sqlite3.connect('scale_app_DB.db')
+        conn = db_manager.connect_db(row_factory=None)
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -30,7 +56,7 @@ def set_logo_path(logo_path):
         return False
     finally:
         if conn:
-            conn.close()
+            db_manager.close_db(conn)
 
 def get_logo_path():
     """
@@ -66,7 +92,7 @@ def load_logo(width, height):
     conn = None
     logo_path = None
     try:
-        conn = sqlite3.connect('scale_app_DB.db')
+        conn = db_manager.connect_db(row_factory=None)
         cursor = conn.cursor()
         
         cursor.execute("SELECT setting_value FROM app_settings WHERE setting_key = 'logo_path'")
@@ -92,7 +118,7 @@ def load_logo(width, height):
         return None
     finally:
         if conn:
-            conn.close()
+            db_manager.close_db(conn)
 
 
 def set_logo_path_print(company_logo_path_print):
@@ -101,7 +127,7 @@ def set_logo_path_print(company_logo_path_print):
     """
     conn = None
     try:
-        conn = sqlite3.connect('scale_app_DB.db')
+        conn = db_manager.connect_db(row_factory=None)
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -116,7 +142,7 @@ def set_logo_path_print(company_logo_path_print):
         return False
     finally:
         if conn:
-            conn.close()
+            db_manager.close_db(conn)
 
 def get_logo_path_print():
     """
@@ -205,13 +231,40 @@ def save_company_data_settings(company_address, company_name, port_scale):
             db_manager.close_db(conn)
 
 
+def save_scale_settings(settings):
+    """
+    Guarda settings de la báscula ('scale_*') en app_settings.
+
+    Args:
+        settings (dict): clave -> valor
+    """
+    conn = None
+    try:
+        conn = db_manager.connect_db()
+        cursor = conn.cursor()
+        for key, value in settings.items():
+            cursor.execute('''
+                INSERT INTO app_settings (setting_key, setting_value)
+                VALUES (?, ?)
+                ON CONFLICT(setting_key) DO UPDATE SET setting_value=excluded.setting_value;
+            ''', (key, str(value)))
+        conn.commit()
+        return True
+    except sqlite3.Error as e:
+        print(f"Error al guardar la configuración de la báscula: {e}")
+        return False
+    finally:
+        if conn:
+            db_manager.close_db(conn)
+
+
 def get_company_config():
     """
     Obtiene la configuración de la compañia desde la base de datos.
     """
     conn = None
     try:
-        conn = sqlite3.connect('scale_app_DB.db')
+        conn = db_manager.connect_db(row_factory=None)
         cursor = conn.cursor()
         
         config = {}
@@ -231,5 +284,73 @@ def get_company_config():
         return {}
     finally:
         if conn:
-            conn.close()
+            db_manager.close_db(conn)
+
+
+
+def get_scale_config():
+    """
+    Obtiene la configuración de lectura de la báscula desde app_settings.
+    Las claves que no existan en la base de datos toman el valor por defecto.
+    """
+    config = dict(SCALE_DEFAULT_SETTINGS)
+    conn = None
+    try:
+        conn = db_manager.connect_db()
+        cursor = conn.cursor()
+        cursor.execute("SELECT setting_key, setting_value FROM app_settings WHERE setting_key LIKE 'scale_%'")
+        for key, value in cursor.fetchall():
+            if value not in (None, ''):
+                config[key] = value
+        return config
+
+    except (sqlite3.Error, AttributeError) as e:
+        print(f"Error al obtener la configuración de la báscula: {e}")
+        return config
+    finally:
+        if conn:
+            db_manager.close_db(conn)
+
+
+def get_scale_platforms(scale_config=None):
+    """
+    Obtiene la lista de plataformas (básculas) configuradas en 'scale_platforms'.
+    Sin configuración se regresa una sola plataforma con el puerto de la empresa.
+    Un 'baudrate' o 'protocol' en None usa los settings generales de la báscula.
 
+    Returns:
+        list: dicts con 'name', 'port', 'protocol' y 'baudrate'
+    """
+    if scale_config is None:
+        scale_config = get_scale_config()
+
+    default_platform = [{'name': 'Báscula 1', 'port': None, 'protocol': None, 'baudrate': None}]
+    raw_platforms = scale_config.get('scale_platforms')
+    if not raw_platforms:
+        return default_platform
+
+    try:
+        platforms = json.loads(raw_platforms)
+    except (TypeError, ValueError) as e:
+        print(f"Error en la configuración de plataformas de báscula: {e}")
+        return default_platform
+
+    result = []
+    for index, platform in enumerate(platforms if isinstance(platforms, list) else []):
+        if not isinstance(platform, dict):
+            continue
+        name = str(platform.get('name') or f"Báscula {index + 1}")
+        if any(existing['name'] == name for existing in result):
+            print(f"Plataforma de báscula duplicada ignorada: {name}")
+            continue
+        try:
+            baudrate = int(platform['baudrate']) if platform.get('baudrate') else None
+        except (TypeError, ValueError):
+            baudrate = None
+        result.append({
+            'name': name,
+            'port': platform.get('port') or None,
+            'protocol': platform.get('protocol') or None,
+            'baudrate': baudrate
+        })
+    return result or default_platform
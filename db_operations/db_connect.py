@@ -1,24 +1,136 @@
 # db_connect.py
 
+import os
 import sqlite3
+import threading
 
-class DatabaseManager:
-    def __init__(self, db_path="scale_app_DB.db"):
+# Ruta de la base de datos; se puede cambiar con la variable de entorno SCALE_APP_DB
+# o con DatabaseManager.configure() antes de abrir la primera conexión
+DEFAULT_DB_PATH = os.environ.get('SCALE_APP_DB', 'scale_app_DB.db')
+
+# PRAGMAs que se aplican una sola vez al abrir cada conexión
+CONNECTION_PRAGMAS = (
+    ('journal_mode', 'WAL'),       # Lectores y escritor no se bloquean entre sí
+    ('synchronous', 'NORMAL'),     # Seguro con WAL y mucho más rápido que FULL
+    ('busy_timeout', '5000'),      # Esperar al escritor en lugar de fallar con "database is locked"
+    ('cache_size', '-16000'),      # ~16 MB de caché de páginas por conexión
+    ('mmap_size', '67108864'),     # 64 MB de lectura mapeada en memoria
+    ('temp_store', 'MEMORY'),
+)
+
+STATEMENT_CACHE_SIZE = 256
+
+
+def open_connection(db_path, row_factory=None):
+    """Abrir una conexión nueva con los PRAGMAs de CONNECTION_PRAGMAS"""
+    conexion = sqlite3.connect(db_path, timeout=5, cached_statements=STATEMENT_CACHE_SIZE)
+    conexion.row_factory = row_factory
+    for pragma, value in CONNECTION_PRAGMAS:
+        conexion.execute(f"PRAGMA {pragma}={value}")
+    return conexion
+
+
+class _ConnectionPool:
+    """Una conexión persistente por hilo y por tipo de fila para una ruta de base de datos"""
+
+    def __init__(self, db_path):
         self.db_path = db_path
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.opened = 0
+
+    def get(self, row_factory):
+        connections = getattr(self.local, 'connections', None)
+        if connections is None:
+            connections = self.local.connections = {}
+
+        conexion = connections.get(row_factory)
+        if conexion is None:
+            conexion = self._open(row_factory)
+            connections[row_factory] = conexion
+        return conexion
+
+    def _open(self, row_factory):
+        conexion = open_connection(self.db_path, row_factory)
+        with self.lock:
+            self.opened += 1
+        return conexion
+
+    def close_thread(self):
+        """Cerrar las conexiones del hilo actual"""
+        connections = getattr(self.local, 'connections', None) or {}
+        for conexion in connections.values():
+            conexion.close()
+        connections.clear()
+
 
-    def connect_db(self):
-        """Establecer conexión con la base de datos"""
+class DatabaseManager:
+    """
+    Proveedor único de conexiones SQLite para toda la aplicación.
+
+    Cada hilo (UI, lector de báscula, sincronización) reutiliza su propia
+    conexión persistente, con los PRAGMAs de CONNECTION_PRAGMAS aplicados una
+    vez y la caché de sentencias preparadas de sqlite3. Todas las instancias
+    con la misma ruta comparten el mismo pool.
+
+    close_db() ya no cierra la conexión: solo deshace lo que el llamador no
+    confirmó con commit(), igual que antes al cerrar.
+    """
+
+    _pools = {}
+    _pools_lock = threading.Lock()
+    default_db_path = DEFAULT_DB_PATH
+
+    def __init__(self, db_path=None):
+        self._db_path = db_path
+
+    @property
+    def db_path(self):
+        """Ruta propia o, si no se indicó, la ruta por defecto vigente"""
+        return self._db_path or DatabaseManager.default_db_path
+
+    @classmethod
+    def configure(cls, db_path):
+        """Cambiar la ruta por defecto de la base de datos (afecta también a las instancias ya creadas sin ruta propia)"""
+        cls.default_db_path = db_path
+
+    def _pool(self):
+        key = os.path.abspath(self.db_path)
+        with DatabaseManager._pools_lock:
+            pool = DatabaseManager._pools.get(key)
+            if pool is None:
+                pool = DatabaseManager._pools[key] = _ConnectionPool(self.db_path)
+            return pool
+
+    def connect_db(self, row_factory=sqlite3.Row):
+        """
+        Obtener la conexión del hilo actual.
+
+        Args:
+            row_factory: sqlite3.Row (acceso por nombre de columna, por defecto)
+                         o None para filas como tuplas
+        """
         try:
-            conexion = sqlite3.connect(self.db_path)
-            conexion.row_factory = sqlite3.Row  # Para acceso por nombre de columna
-            return conexion
+            return self._pool().get(row_factory)
         except sqlite3.IntegrityError:
             return None
         except sqlite3.Error as e:
             print(f"Error al conectar con la base de datos: {e}")
             return None
-        
+
     def close_db(self, conexion):
-        """Cerrar la conexión con la base de datos"""
-        if conexion:
-            conexion.close()
\ No newline at end of file
+        """Liberar la conexión: se deshace cualquier transacción sin confirmar"""
+        if conexion and conexion.in_transaction:
+            conexion.rollback()
+
+    def open_dedicated_connection(self, row_factory=None):
+        """
+        Abrir una conexión propia, fuera del pool; el llamador la cierra.
+        Sirve para vigilar PRAGMA data_version, que solo cambia con los commits
+        de otras conexiones.
+        """
+        return open_connection(self.db_path, row_factory)
+
+    def close_thread_connections(self):
+        """Cerrar de verdad las conexiones del hilo actual (p. ej. al salir de la aplicación)"""
+        self._pool().close_thread()
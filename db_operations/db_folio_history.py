@@ -50,9 +50,31 @@ class FolioHistory:
             finally:
                 self.db_manager.close_db(conn)
           
+    @staticmethod
+    def add_change(cursor, history_data):
+        """
+        Insertar un cambio en folio_history con el cursor de una transacción ya abierta.
+
+        Returns:
+            int: id_history real del registro insertado
+        """
+        cursor.execute('''
+                    INSERT INTO folio_history (id_weighing, folio_number, previous_value, new_value, datetime_modification, id_user_modificacion, history_notes)
+                    VALUES (?, ?, ?, ?, ?, ?, ?);
+                ''', (
+                    history_data.get('id_weighing'),
+                    history_data.get('folio_number'),
+                    history_data.get('previous_value'),
+                    history_data.get('new_value'),
+                    history_data.get('datetime_modification'),
+                    history_data.get('id_user_modificacion'),
+                    history_data.get('history_notes')
+                ))
+        return cursor.lastrowid
+
     def incert_change(self,data):
         """
-        Guarda o actualiza los materiales obtenidos de Odoo en la base de datos local.
+        Guarda un cambio de folio en folio_history en su propia transacción.
         (Usa DatabaseManager para la conexión)
         """
         history_data = data
@@ -61,19 +83,7 @@ class FolioHistory:
         if conn:
             try:
                 cursor = conn.cursor()
-                id_weighing = history_data.get('id_weighing')
-                folio_number= history_data.get('folio_number')
-                previous_value= history_data.get('previous_value')
-                new_value= history_data.get('new_value')
-                datetime_modification= history_data.get('datetime_modification')
-                id_user_modificacion= history_data.get('id_user_modificacion')
-                history_notes=history_data.get('history_notes')
-
-                cursor.execute('''
-                            INSERT INTO folio_history (id_weighing, folio_number, previous_value, new_value, datetime_modification, id_user_modificacion, history_notes)
-                            VALUES (?, ?, ?, ?, ?, ?, ?);
-                        ''', (id_weighing, folio_number, previous_value, new_value, datetime_modification, id_user_modificacion, history_notes))
-                    
+                self.add_change(cursor, history_data)
                 conn.commit()
                 return True
                 
@@ -0,0 +1,117 @@
+# db_folio_sequence.py
+
+import sqlite3
+import threading
+from db_operations.db_connect import DatabaseManager
+from utils.logger_config import app_logger
+
+
+class FolioSequence:
+    """
+    Asignador atómico de folios sobre la tabla folio_sequences.
+
+    allocate() reserva uno o varios números con un UPSERT ... RETURNING dentro
+    de la transacción del INSERT que los usa: dos ventanas o dos estaciones
+    nunca reciben el mismo folio y el costo es O(1) sin importar el tamaño de
+    weighing_records.
+
+    Con folio_block_size > 1 (app_settings) la estación pre-reserva rangos y
+    los consume en memoria; los rangos de estaciones distintas no se cruzan,
+    pero los folios dejan de ser consecutivos entre estaciones.
+    """
+
+    DEFAULT_NAME = 'weighing'
+    FOLIO_WIDTH = 6
+
+    # Bloques reservados por esta estación: nombre -> range pendiente de usar
+    _blocks = {}
+    _blocks_lock = threading.Lock()
+
+    def __init__(self, name=DEFAULT_NAME, block_size=None, db_manager=None):
+        self.logger = app_logger.getChild('FolioSequence')
+        self.name = name
+        self.db_manager = db_manager or DatabaseManager()
+        self.block_size = block_size if block_size is not None else self._load_block_size()
+
+    def _load_block_size(self):
+        conn = None
+        try:
+            conn = self.db_manager.connect_db(row_factory=None)
+            row = conn.execute(
+                "SELECT setting_value FROM app_settings WHERE setting_key = 'folio_block_size'"
+            ).fetchone()
+            return max(1, int(row[0])) if row else 1
+        except (sqlite3.Error, TypeError, ValueError):
+            return 1
+        finally:
+            if conn:
+                self.db_manager.close_db(conn)
+
+    @classmethod
+    def format(cls, value):
+        """Número de folio con ceros a la izquierda (ej: '000001')"""
+        return f"{value:0{cls.FOLIO_WIDTH}d}"
+
+    def allocate(self, cursor, count=1):
+        """
+        Reservar 'count' números consecutivos dentro de la transacción del cursor.
+
+        Returns:
+            int: primer número del bloque reservado
+        """
+        cursor.execute('''
+            INSERT INTO folio_sequences (name, next_value)
+            VALUES (?, 1 + ?)
+            ON CONFLICT(name) DO UPDATE SET next_value = next_value + excluded.next_value - 1
+            RETURNING next_value - ?
+        ''', (self.name, count, count))
+        return cursor.fetchone()[0]
+
+    def next_value(self, cursor):
+        """Siguiente número para un registro nuevo (del bloque local o de la tabla)"""
+        if self.block_size <= 1:
+            return self.allocate(cursor)
+
+        with FolioSequence._blocks_lock:
+            block = FolioSequence._blocks.get(self.name)
+            if block:
+                FolioSequence._blocks[self.name] = block[1:]
+                return block[0]
+
+        first = self.allocate(cursor, self.block_size)
+        with FolioSequence._blocks_lock:
+            FolioSequence._blocks[self.name] = range(first + 1, first + self.block_size)
+        self.logger.debug(f"📦 Bloque de folios reservado: {self.format(first)} - {self.format(first + self.block_size - 1)}")
+        return first
+
+    def next_folio(self, cursor):
+        return self.format(self.next_value(cursor))
+
+    def discard_block(self):
+        """
+        Olvidar el bloque local. Se llama cuando la transacción que lo reservó se
+        deshace, porque entonces el rango no quedó apartado en la base.
+        """
+        with FolioSequence._blocks_lock:
+            FolioSequence._blocks.pop(self.name, None)
+
+    def peek(self):
+        """Folio que recibiría el siguiente registro (solo para mostrarlo; no lo reserva)"""
+        with FolioSequence._blocks_lock:
+            block = FolioSequence._blocks.get(self.name)
+            if block:
+                return self.format(block[0])
+
+        conn = None
+        try:
+            conn = self.db_manager.connect_db(row_factory=None)
+            row = conn.execute(
+                "SELECT next_value FROM folio_sequences WHERE name = ?", (self.name,)
+            ).fetchone()
+            return self.format(row[0] if row else 1)
+        except sqlite3.Error as e:
+            self.logger.error(f"❌ Error al consultar la secuencia de folios: {e}")
+            return None
+        finally:
+            if conn:
+                self.db_manager.close_db(conn)
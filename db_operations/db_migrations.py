@@ -0,0 +1,204 @@
+# db_migrations.py
+
+import sqlite3
+from db_operations.db_change_notifier import create_change_counters
+from db_operations.db_connect import DatabaseManager
+from db_operations.db_create_db import create_base_schema
+from db_operations.db_search_index import create_search_index
+from utils.logger_config import app_logger
+
+logger = app_logger.getChild('DBMigrations')
+db_manager = DatabaseManager()
+
+
+# Índices para las consultas más frecuentes:
+# - listas de folios por estado ordenadas por id (cerrados, pendientes)
+# - JOIN de customers por external_id_customer
+# - búsquedas por external_id_* durante la sincronización con Odoo
+SEARCH_INDEXES = [
+    '''
+    CREATE INDEX IF NOT EXISTS idx_weighing_records_status
+    ON weighing_records (scale_record_status, id_weighing)
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_customers_external_id ON customers (external_id_customer)',
+    'CREATE INDEX IF NOT EXISTS idx_vehicles_external_id ON vehicles (external_id_vehicle)',
+    'CREATE INDEX IF NOT EXISTS idx_trailers_external_id ON trailers (external_id_trailer)',
+    'CREATE INDEX IF NOT EXISTS idx_drivers_external_id ON drivers (external_id_driver)',
+    'CREATE INDEX IF NOT EXISTS idx_materials_external_id ON materials (external_id_material)',
+    'CREATE INDEX IF NOT EXISTS idx_folio_history_weighing ON folio_history (id_weighing)',
+]
+
+
+# Secuencia de folios: se inicia una sola vez con el mayor folio numérico existente
+# (los folios con sufijo, como los 'NNNA' de ALM2, no cuentan)
+FOLIO_SEQUENCES = [
+    '''
+    CREATE TABLE IF NOT EXISTS folio_sequences (
+        name TEXT PRIMARY KEY,
+        next_value INTEGER NOT NULL
+    )
+    ''',
+    '''
+    INSERT OR IGNORE INTO folio_sequences (name, next_value)
+    SELECT 'weighing', COALESCE(MAX(CAST(folio_number AS INTEGER)), 0) + 1
+    FROM weighing_records
+    WHERE folio_number <> '' AND folio_number NOT GLOB '*[^0-9]*'
+    ''',
+]
+
+
+# Catálogos sincronizados con Odoo: (tabla, llave primaria, llave externa, columna de activo)
+CATALOG_TABLES = (
+    ('customers', 'id_customer', 'external_id_customer', 'active_customer'),
+    ('vehicles', 'id_vehicle', 'external_id_vehicle', 'active_vehicle'),
+    ('trailers', 'id_trailer', 'external_id_trailer', 'active_trailer'),
+    ('drivers', 'id_driver', 'external_id_driver', 'active_driver'),
+    ('materials', 'id_material', 'external_id_material', 'active_material'),
+)
+
+
+def unique_catalog_external_ids(cursor):
+    """
+    Índices únicos parciales sobre las llaves externas (sin la llave 0 de los
+    registros externos locales), necesarios para el UPSERT de CatalogSync.
+    Si ya hubiera duplicados, se conserva el registro más antiguo y los demás
+    quedan inactivos con la llave externa en negativo: no se borran porque
+    pueden estar referenciados por pesajes.
+    """
+    for table, primary_key, external_key, active_column in CATALOG_TABLES:
+        cursor.execute(f'''
+            UPDATE {table}
+            SET {external_key} = -{primary_key}, {active_column} = 0
+            WHERE {external_key} <> 0
+            AND {primary_key} > (
+                SELECT MIN(first.{primary_key}) FROM {table} first
+                WHERE first.{external_key} = {table}.{external_key}
+            )
+        ''')
+        if cursor.rowcount:
+            logger.warning(f"⚠️ {table}: {cursor.rowcount} registro(s) con llave externa duplicada desactivados")
+        cursor.execute(f'''
+            CREATE UNIQUE INDEX IF NOT EXISTS ux_{table}_external_id
+            ON {table} ({external_key}) WHERE {external_key} <> 0
+        ''')
+
+
+# Pesajes complementarios de ALM2: companion_of apunta al pesaje principal.
+# Los existentes se reconocen por el folio 'NNNA' del principal 'NNN'; si el
+# principal ya no existe quedan con 0 para que sigan fuera de las listas.
+COMPANION_FOLIOS = [
+    'ALTER TABLE weighing_records ADD COLUMN companion_of INTEGER REFERENCES weighing_records(id_weighing)',
+    '''
+    UPDATE weighing_records
+    SET companion_of = COALESCE((
+        SELECT parent.id_weighing FROM weighing_records parent
+        WHERE parent.folio_number = substr(weighing_records.folio_number, 1, length(weighing_records.folio_number) - 1)
+    ), 0)
+    WHERE folio_number LIKE '%A'
+    ''',
+    # Pendientes y cerrados sin complementarios: un solo índice parcial por
+    # (estado, id). Uno por estado empataría en costo con idx_weighing_records_status
+    # y el planificador no lo elegiría.
+    '''
+    CREATE INDEX IF NOT EXISTS idx_weighing_records_status_main
+    ON weighing_records (scale_record_status, id_weighing)
+    WHERE companion_of IS NULL
+    ''',
+    '''
+    CREATE INDEX IF NOT EXISTS idx_weighing_records_companion
+    ON weighing_records (companion_of)
+    WHERE companion_of IS NOT NULL
+    ''',
+]
+
+
+# Cola persistente de envíos a Odoo (db_odoo_outbox). El índice da la entrada
+# más antigua de cada folio: las operaciones de un folio salen en orden.
+ODOO_OUTBOX = [
+    '''
+    CREATE TABLE IF NOT EXISTS odoo_outbox (
+        id_outbox INTEGER PRIMARY KEY,
+        id_weighing INTEGER NOT NULL,
+        operation TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_attempt_at TEXT NOT NULL,
+        last_error TEXT,
+        created_at TEXT NOT NULL
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_odoo_outbox_weighing ON odoo_outbox (id_weighing, id_outbox)',
+]
+
+
+# Migraciones en orden: (versión, descripción, pasos). Cada paso es una
+# sentencia SQL o una función que recibe el cursor. Nunca se modifica una
+# migración ya publicada: los cambios nuevos se agregan con la siguiente versión.
+MIGRATIONS = [
+    (1, "Tablas base", [create_base_schema]),
+    (2, "Índices de estado, folio y llaves externas", SEARCH_INDEXES),
+    (3, "Secuencia atómica de folios", FOLIO_SEQUENCES),
+    (4, "Índice de texto completo de pesajes", [create_search_index]),
+    (5, "Llaves externas únicas de los catálogos", [unique_catalog_external_ids]),
+    (6, "Pesajes complementarios de ALM2 indexados", COMPANION_FOLIOS),
+    (7, "Contadores de cambios por tabla", [create_change_counters]),
+    (8, "Cola persistente de envíos a Odoo", ODOO_OUTBOX),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn=None):
+    """Versión del esquema guardada en PRAGMA user_version (0 = base sin migraciones)"""
+    own_connection = conn is None
+    conn = conn or db_manager.connect_db(row_factory=None)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        if own_connection:
+            db_manager.close_db(conn)
+
+
+def apply_migrations():
+    """
+    Aplicar en orden las migraciones pendientes, cada una en su propia transacción
+    junto con su número de versión.
+
+    Returns:
+        bool: True si el esquema quedó en la última versión
+    """
+    conn = None
+    try:
+        conn = db_manager.connect_db(row_factory=None)
+        current_version = get_schema_version(conn)
+        if current_version >= LATEST_VERSION:
+            return True
+
+        cursor = conn.cursor()
+        for version, description, steps in MIGRATIONS:
+            if version <= current_version:
+                continue
+            logger.info(f"🛠️ Aplicando migración {version}: {description}")
+            cursor.execute("BEGIN")
+            for step in steps:
+                if callable(step):
+                    step(cursor)
+                else:
+                    cursor.execute(step)
+            cursor.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+
+        logger.info(f"✅ Esquema de base de datos en la versión {LATEST_VERSION}")
+        return True
+
+    except sqlite3.Error as e:
+        logger.error(f"❌ Error al aplicar migraciones: {e}")
+        return False
+    finally:
+        if conn:
+            db_manager.close_db(conn)
+
+
+if __name__ == '__main__':
+    print(f"Versión actual: {get_schema_version()} / última: {LATEST_VERSION}")
+    apply_migrations()
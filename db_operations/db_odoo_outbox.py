@@ -0,0 +1,350 @@
+# db_odoo_outbox.py
+
+import datetime
+import json
+import sqlite3
+import threading
+import time
+from db_operations.db_connect import DatabaseManager
+from db_operations.db_odoo_save_folio import ODOO_WEIGHING_SELECT
+from logic.logic_odoo_records import OdooAPI
+from utils.logger_config import app_logger
+
+# Operación de la cola: crear o actualizar en Odoo el pesaje (x_scale_records)
+OUTBOX_UPSERT_WEIGHING = 'upsert_weighing'
+# Reintentos: 15 s, 30 s, 1 min, ... hasta un máximo de 30 min entre intentos
+OUTBOX_RETRY_BASE_SECONDS = 15
+OUTBOX_RETRY_MAX_SECONDS = 30 * 60
+# Entradas por consulta y espera máxima del worker sin avisos
+OUTBOX_BATCH_SIZE = 50
+OUTBOX_POLL_SECONDS = 60
+# Cada cuánto el worker encola los pesajes sin envío que no están en la cola
+OUTBOX_BACKFILL_SECONDS = 60 * 60
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _now():
+    return datetime.datetime.now().strftime(DATETIME_FORMAT)
+
+
+def retry_delay_seconds(attempts):
+    """Espera antes del siguiente intento tras 'attempts' fallos (exponencial con tope)"""
+    return min(OUTBOX_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), OUTBOX_RETRY_MAX_SECONDS)
+
+
+# Solo la entrada más antigua de cada folio puede enviarse: las siguientes esperan
+HEAD_OF_FOLIO = '''
+    id_outbox = (SELECT MIN(first.id_outbox) FROM odoo_outbox first WHERE first.id_weighing = o.id_weighing)
+'''
+
+
+class OdooOutbox:
+    """
+    Cola persistente de envíos a Odoo (tabla odoo_outbox, migración 8).
+
+    Guardar o cerrar un pesaje agrega su entrada con enqueue() dentro de la
+    misma transacción local: la operación regresa al hacer commit y el envío
+    lo hace OdooOutboxWorker en segundo plano. Cada entrada lleva la copia de
+    la fila (ODOO_WEIGHING_SELECT) en JSON como payload.
+    """
+
+    def __init__(self, db_manager=None):
+        self.logger = app_logger.getChild('OdooOutbox')
+        self.db_manager = db_manager or DatabaseManager()
+
+    @staticmethod
+    def enqueue(cursor, id_weighing, operation=OUTBOX_UPSERT_WEIGHING):
+        """
+        Agregar a la cola el pesaje con la transacción del llamador (no hace commit).
+
+        Returns:
+            int: id_outbox, o None si el pesaje no existe
+        """
+        cursor.execute(f"{ODOO_WEIGHING_SELECT} WHERE wr.id_weighing = ?", (id_weighing,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        record = dict(zip([description[0] for description in cursor.description], row))
+
+        now = _now()
+        cursor.execute('''
+            INSERT INTO odoo_outbox (id_weighing, operation, payload, next_attempt_at, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (id_weighing, operation, json.dumps(record, ensure_ascii=False), now, now))
+        return cursor.lastrowid
+
+    def enqueue_unsent(self, operation=OUTBOX_UPSERT_WEIGHING):
+        """
+        Encolar de una vez los pesajes sin envío a Odoo que no tienen entrada en
+        la cola (p. ej. folios de antes de la cola): un solo INSERT ... SELECT,
+        con la misma copia de ODOO_WEIGHING_SELECT que enqueue() armada con json_object.
+
+        Returns:
+            int: entradas agregadas
+        """
+        conn = self.db_manager.connect_db(row_factory=None)
+        if conn is None:
+            return 0
+        try:
+            cursor = conn.cursor()
+            # Columnas de la copia, tomadas de la propia consulta
+            cursor.execute(f"{ODOO_WEIGHING_SELECT} WHERE 0")
+            payload = ", ".join(f"'{description[0]}', r.{description[0]}" for description in cursor.description)
+            now = _now()
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(f'''
+                INSERT INTO odoo_outbox (id_weighing, operation, payload, next_attempt_at, created_at)
+                SELECT r.id_weighing, ?, json_object({payload}), ?, ?
+                FROM ({ODOO_WEIGHING_SELECT}
+                      WHERE COALESCE(wr.saved_in_Odoo, 0) <> 1
+                        AND NOT EXISTS (SELECT 1 FROM odoo_outbox o WHERE o.id_weighing = wr.id_weighing)) r
+                ORDER BY r.id_weighing
+            ''', (operation, now, now))
+            added = cursor.rowcount
+            conn.commit()
+            return added
+        except sqlite3.Error as e:
+            self.logger.error(f"❌ Error al encolar los pesajes sin envío a Odoo: {e}")
+            return 0
+        finally:
+            self.db_manager.close_db(conn)
+
+    def due_entries(self, limit=OUTBOX_BATCH_SIZE):
+        """Primeras entradas de cada folio cuyo intento ya toca, en orden de llegada"""
+        conn = self.db_manager.connect_db(row_factory=None)
+        if conn is None:
+            return []
+        try:
+            return conn.execute(f'''
+                SELECT id_outbox, id_weighing, operation, payload, attempts
+                FROM odoo_outbox o
+                WHERE next_attempt_at <= ? AND {HEAD_OF_FOLIO}
+                ORDER BY id_outbox
+                LIMIT ?
+            ''', (_now(), limit)).fetchall()
+        except sqlite3.Error as e:
+            self.logger.error(f"❌ Error al leer la cola de Odoo: {e}")
+            return []
+        finally:
+            self.db_manager.close_db(conn)
+
+    def seconds_until_next(self, maximum=OUTBOX_POLL_SECONDS):
+        """Segundos hasta el próximo intento pendiente (maximum si la cola está vacía)"""
+        conn = self.db_manager.connect_db(row_factory=None)
+        if conn is None:
+            return maximum
+        try:
+            row = conn.execute(f"SELECT MIN(next_attempt_at) FROM odoo_outbox o WHERE {HEAD_OF_FOLIO}").fetchone()
+        except sqlite3.Error:
+            return maximum
+        finally:
+            self.db_manager.close_db(conn)
+        if not row or not row[0]:
+            return maximum
+        next_attempt = datetime.datetime.strptime(row[0], DATETIME_FORMAT)
+        return max(0.0, min((next_attempt - datetime.datetime.now()).total_seconds(), maximum))
+
+    def current_odoo_id(self, id_weighing):
+        """
+        id_status_odoo vigente del pesaje: la copia de la cola puede ser anterior
+        a la creación del registro en Odoo. None si no tiene o ya no existe.
+        """
+        conn = self.db_manager.connect_db(row_factory=None)
+        if conn is None:
+            return None
+        try:
+            row = conn.execute("SELECT id_status_odoo FROM weighing_records WHERE id_weighing = ?", (id_weighing,)).fetchone()
+            return row[0] if row else None
+        finally:
+            self.db_manager.close_db(conn)
+
+    def mark_sent(self, id_outbox):
+        conn = self.db_manager.connect_db(row_factory=None)
+        try:
+            conn.execute("DELETE FROM odoo_outbox WHERE id_outbox = ?", (id_outbox,))
+            conn.commit()
+        except sqlite3.Error as e:
+            # Se volverá a enviar: como actualización, porque el pesaje ya tiene id de Odoo
+            self.logger.error(f"❌ Error al quitar la entrada {id_outbox} de la cola de Odoo: {e}")
+        finally:
+            self.db_manager.close_db(conn)
+
+    def mark_failed(self, id_outbox, attempts, error):
+        """Registrar el fallo y programar el siguiente intento; devuelve la espera en segundos"""
+        delay = retry_delay_seconds(attempts)
+        next_attempt = (datetime.datetime.now() + datetime.timedelta(seconds=delay)).strftime(DATETIME_FORMAT)
+        conn = self.db_manager.connect_db(row_factory=None)
+        try:
+            conn.execute('''
+                UPDATE odoo_outbox SET attempts = ?, next_attempt_at = ?, last_error = ?
+                WHERE id_outbox = ?
+            ''', (attempts, next_attempt, error, id_outbox))
+            conn.commit()
+        except sqlite3.Error as e:
+            self.logger.error(f"❌ Error al reprogramar la entrada {id_outbox} de la cola de Odoo: {e}")
+        finally:
+            self.db_manager.close_db(conn)
+        return delay
+
+    def pending_count(self):
+        conn = self.db_manager.connect_db(row_factory=None)
+        if conn is None:
+            return 0
+        try:
+            return conn.execute("SELECT COUNT(*) FROM odoo_outbox").fetchone()[0]
+        finally:
+            self.db_manager.close_db(conn)
+
+
+class OdooOutboxWorker:
+    """
+    Hilo de fondo que vacía la cola de Odoo.
+
+    Envía la entrada más antigua de cada folio; si falla, se reprograma con
+    espera exponencial (retry_delay_seconds) y las siguientes del mismo folio
+    esperan a que salga. Tras un fallo el hilo espera al menos
+    OUTBOX_RETRY_BASE_SECONDS antes de seguir con otros folios: casi siempre
+    es Odoo o la red que no responden.
+    notify() despierta al hilo después de cada commit que encola.
+    Al arrancar y cada OUTBOX_BACKFILL_SECONDS encola los pesajes sin envío
+    que no tienen entrada (OdooOutbox.enqueue_unsent).
+    """
+
+    def __init__(self, outbox=None):
+        self.logger = app_logger.getChild('OdooOutboxWorker')
+        self.outbox = outbox or OdooOutbox()
+        self.handlers = {
+            OUTBOX_UPSERT_WEIGHING: self._push_weighing,
+        }
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._last_backfill = None
+
+    def backfill(self):
+        """Encolar los pesajes sin envío que no están en la cola, si ya toca"""
+        now = time.monotonic()
+        if self._last_backfill is not None and now - self._last_backfill < OUTBOX_BACKFILL_SECONDS:
+            return 0
+        self._last_backfill = now
+        added = self.outbox.enqueue_unsent()
+        if added:
+            self.logger.info(f"📤 Cola de Odoo: {added} pesajes sin envío agregados")
+        return added
+
+    def _push_weighing(self, id_weighing, record):
+        odoo_api = OdooAPI(id_weighing, interactive=False)
+        if not odoo_api.configured:
+            return "Faltan datos de configuración de la API de Odoo"
+        if not odoo_api.authenticate():
+            return "Sin conexión o autenticación con Odoo"
+        odoo_id = self.outbox.current_odoo_id(id_weighing)
+        if odoo_id is not None:
+            record['id_status_odoo'] = odoo_id
+        return None if odoo_api.push_weighing(record) else "Odoo rechazó o no respondió el envío"
+
+    def send(self, entry):
+        """
+        Enviar una entrada de la cola.
+
+        Returns:
+            bool: True si se envió (y se quitó de la cola)
+        """
+        id_outbox, id_weighing, operation, payload, attempts = entry
+        handler = self.handlers.get(operation)
+        try:
+            error = handler(id_weighing, json.loads(payload)) if handler else f"Operación desconocida: {operation}"
+        except Exception as e:
+            self.logger.error(f"❌ Error al enviar a Odoo la entrada {id_outbox}: {e}", exc_info=True)
+            error = str(e)
+
+        if error is None:
+            self.outbox.mark_sent(id_outbox)
+            self.logger.info(f"✅ Pesaje {id_weighing} enviado a Odoo ({operation}, intento {attempts + 1})")
+            return True
+
+        delay = self.outbox.mark_failed(id_outbox, attempts + 1, error)
+        self.logger.warning(
+            f"⚠️ Pesaje {id_weighing} sin enviar a Odoo (intento {attempts + 1}): {error}. "
+            f"Siguiente intento en {delay} s"
+        )
+        return False
+
+    def drain(self):
+        """
+        Enviar todo lo que ya toca, hasta el primer fallo.
+
+        Returns:
+            tuple: (enviadas, True si hubo un fallo)
+        """
+        sent = 0
+        while not self._stop_event.is_set():
+            entries = self.outbox.due_entries()
+            if not entries:
+                break
+            for entry in entries:
+                if self._stop_event.is_set():
+                    break
+                if not self.send(entry):
+                    return sent, True
+                sent += 1
+        return sent, False
+
+    def _run(self):
+        try:
+            while not self._stop_event.is_set():
+                self._wake_event.clear()
+                try:
+                    self.backfill()
+                    _, failed = self.drain()
+                except Exception as e:
+                    self.logger.error(f"❌ Error en la cola de Odoo: {e}", exc_info=True)
+                    failed = True
+                wait = self.outbox.seconds_until_next()
+                wait = min(wait, max(0.0, self._last_backfill + OUTBOX_BACKFILL_SECONDS - time.monotonic()))
+                if failed:
+                    wait = max(wait, OUTBOX_RETRY_BASE_SECONDS)
+                self._wake_event.wait(wait)
+        finally:
+            self.outbox.db_manager.close_thread_connections()
+
+    def notify(self):
+        """Despertar al hilo: hay entradas nuevas en la cola"""
+        self._wake_event.set()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return self._thread
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='OdooOutboxWorker', daemon=True)
+        self._thread.start()
+        pending = self.outbox.pending_count()
+        if pending:
+            self.logger.info(f"📤 Cola de Odoo: {pending} envíos pendientes")
+        return self._thread
+
+    def stop(self, timeout=None):
+        """Detener el hilo (un envío en curso termina antes)"""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+_outbox_worker = None
+
+
+def start_odoo_outbox_worker():
+    """Worker de la cola de Odoo de la aplicación, iniciado una sola vez"""
+    global _outbox_worker
+    if _outbox_worker is None:
+        _outbox_worker = OdooOutboxWorker()
+    _outbox_worker.start()
+    return _outbox_worker
+
+
+def notify_odoo_outbox():
+    """Avisar al worker (si está corriendo) después de un commit que encoló envíos"""
+    if _outbox_worker is not None:
+        _outbox_worker.notify()
@@ -4,6 +4,41 @@ from db_operations.db_connect import DatabaseManager
 from utils.logger_config import app_logger 
 from typing import List, Dict
 
+# Fila de un pesaje con las llaves externas de Odoo (OdooAPI.push_weighing);
+# también se guarda como copia en la cola de Odoo (db_odoo_outbox)
+ODOO_WEIGHING_SELECT = """
+    SELECT 
+        wr.id_weighing,
+        wr.folio_number,
+        wr.date_start,
+        wr.date_end,
+        wr.days_open_folio,
+        wr.weighing_type,
+        wr.gross_weight,
+        wr.tare_weight,
+        wr.net_weight,
+        wr.scale_record_status,
+        wr.weight_original,
+        wr.id_status_odoo,
+        wr.notes,
+        v.external_id_vehicle,
+        t.external_id_trailer,
+        d.external_id_driver,
+        c.external_id_customer,
+        m.external_id_material,
+        u.user_name AS user_name_open,
+        uc.user_name AS user_name_closed
+    FROM weighing_records wr
+    LEFT JOIN vehicles v ON wr.id_vehicle = v.id_vehicle
+    LEFT JOIN trailers t ON wr.id_trailer = t.id_trailer 
+    LEFT JOIN drivers d ON wr.id_driver = d.id_driver 
+    LEFT JOIN customers c ON wr.id_customer = c.external_id_customer 
+    LEFT JOIN materials m ON wr.id_material = m.id_material 
+    LEFT JOIN users u ON wr.id_user = u.id_user
+    LEFT JOIN users uc ON wr.id_user_closed = uc.id_user
+"""
+
+
 class OdooDBManager:
     def __init__(self, folio_id):
         
@@ -30,35 +65,7 @@ class OdooDBManager:
             self.logger.warning("⚠️ folio_id es None, obteniendo todos los registros")
             
         query = f"""
-            SELECT 
-                wr.id_weighing,
-                wr.folio_number,
-                wr.date_start,
-                wr.date_end,
-                wr.days_open_folio,
-                wr.weighing_type,
-                wr.gross_weight,
-                wr.tare_weight,
-                wr.net_weight,
-                wr.scale_record_status,
-                wr.weight_original,
-                wr.id_status_odoo,
-                wr.notes,
-                v.external_id_vehicle,
-                t.external_id_trailer,
-                d.external_id_driver,
-                c.external_id_customer,
-                m.external_id_material,
-                u.user_name AS user_name_open,
-                uc.user_name AS user_name_closed
-            FROM weighing_records wr
-            LEFT JOIN vehicles v ON wr.id_vehicle = v.id_vehicle
-            LEFT JOIN trailers t ON wr.id_trailer = t.id_trailer 
-            LEFT JOIN drivers d ON wr.id_driver = d.id_driver 
-            LEFT JOIN customers c ON wr.id_customer = c.external_id_customer 
-            LEFT JOIN materials m ON wr.id_material = m.id_material 
-            LEFT JOIN users u ON wr.id_user = u.id_user
-            LEFT JOIN users uc ON wr.id_user_closed = uc.id_user
+            {ODOO_WEIGHING_SELECT}
             {where_clause}  
             ORDER BY wr.id_weighing DESC
         """
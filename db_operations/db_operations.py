@@ -3,13 +3,16 @@
 import datetime
 import sqlite3
 import bcrypt
+from db_operations.db_connect import DatabaseManager
+
+db_manager = DatabaseManager()
 
 def check_and_create_admin_user():
     # ... (esta función se mantiene igual)
     current_date_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     conn = None
     try:
-        conn = sqlite3.connect('scale_app_DB.db')
+        conn = db_manager.connect_db(row_factory=None)
         cursor = conn.cursor()
 
         cursor.execute("SELECT COUNT(*) FROM users")
@@ -36,7 +39,7 @@ def check_and_create_admin_user():
         return False
     finally:
         if conn:
-            conn.close()
+            db_manager.close_db(conn)
 
 
 def verify_login(user_name, password):
@@ -48,7 +51,7 @@ def verify_login(user_name, password):
     user_id = None
     user_active = None
     try:
-        conn = sqlite3.connect('scale_app_DB.db')
+        conn = db_manager.connect_db(row_factory=None)
         cursor = conn.cursor()
         cursor.execute("SELECT id_user, password_hash, access_level, active_user FROM users WHERE user_name = ?", (user_name,))
         result = cursor.fetchone()
@@ -64,12 +67,12 @@ def verify_login(user_name, password):
         return None
     finally:
         if conn:
-            conn.close()
+            db_manager.close_db(conn)
 
 def log_login_attempt( user_id, user_text, success):
         conn = None
         try:
-            conn = sqlite3.connect('scale_app_DB.db')
+            conn = db_manager.connect_db(row_factory=None)
             cursor = conn.cursor()
             now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
@@ -83,5 +86,5 @@ def log_login_attempt( user_id, user_text, success):
             print("Error", f"Error al registrar el intento de login: {e}")
         finally:
             if conn:
-                conn.close()  
+                db_manager.close_db(conn)
 
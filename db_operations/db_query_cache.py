@@ -0,0 +1,212 @@
+# db_query_cache.py
+
+import functools
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from db_operations.db_connect import DatabaseManager
+from utils.logger_config import app_logger
+
+# Límite de memoria de la caché: entradas y filas guardadas en total. Un
+# resultado con más filas que MAX_CACHED_ROWS no se guarda.
+MAX_CACHED_ENTRIES = 256
+MAX_CACHED_ROWS = 50_000
+
+
+class QueryCache:
+    """
+    Caché de resultados de consultas de lectura (listas de folios, búsquedas y
+    catálogos activos).
+
+    Cada entrada se guarda por (base de datos, consulta, parámetros) junto con
+    la versión de las tablas de las que depende (table_versions, migración 7).
+    Al leerla se compara con la versión actual: si alguna tabla cambió, en
+    este u otro proceso, la entrada se descarta y se vuelve a consultar. No hay
+    caducidad por tiempo. Las entradas menos usadas salen primero (LRU) cuando
+    se rebasa MAX_CACHED_ENTRIES o MAX_CACHED_ROWS.
+
+    Los resultados se comparten entre llamadas: quien los reciba no debe
+    modificarlos.
+    """
+
+    def __init__(self, max_entries=MAX_CACHED_ENTRIES, max_rows=MAX_CACHED_ROWS):
+        self.logger = app_logger.getChild('QueryCache')
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self._entries = OrderedDict()
+        self._rows = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+        self.saved_seconds = 0.0
+
+    def _current_versions(self, db_manager, tables):
+        """Versión actual de las tablas con la conexión del hilo (None si no hay contadores)"""
+        conn = db_manager.connect_db(row_factory=None)
+        if conn is None:
+            return None
+        try:
+            versions = dict(conn.execute(
+                f"SELECT table_name, version FROM table_versions WHERE table_name IN ({', '.join('?' for _ in tables)})",
+                tables
+            ).fetchall())
+            return tuple(versions.get(table) for table in tables)
+        except sqlite3.Error:
+            return None
+        finally:
+            db_manager.close_db(conn)
+
+    def get_or_load(self, db_manager, name, args, kwargs, tables, loader):
+        """
+        Devolver el resultado guardado si sus tablas no cambiaron; si no,
+        ejecutar loader() y guardar lo que devuelva.
+        """
+        versions = self._current_versions(db_manager, tables)
+        if versions is None:
+            return loader()
+
+        key = (db_manager.db_path, name, args, tuple(sorted(kwargs.items())))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                cached_versions, result, load_seconds = entry
+                if cached_versions == versions:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    self.saved_seconds += load_seconds
+                    return result
+                self._remove(key)
+                self.stale += 1
+            self.misses += 1
+
+        started = time.perf_counter()
+        result = loader()
+        load_seconds = time.perf_counter() - started
+
+        # Un resultado vacío puede venir de un error atrapado por el DAO: no se guarda
+        if result and len(result) <= self.max_rows:
+            with self._lock:
+                if key in self._entries:
+                    self._remove(key)
+                self._entries[key] = (versions, result, load_seconds)
+                self._rows += len(result)
+                while len(self._entries) > self.max_entries or self._rows > self.max_rows:
+                    self._remove(next(iter(self._entries)))
+                    self.evictions += 1
+        return result
+
+    def _remove(self, key):
+        _, result, _ = self._entries.pop(key)
+        self._rows -= len(result)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._rows = 0
+
+    def stats(self):
+        """Métricas de la caché: aciertos, fallos, entradas descartadas y tiempo de consulta ahorrado"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'rows': self._rows,
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale': self.stale,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'saved_ms': round(self.saved_seconds * 1000, 1),
+            }
+
+    def log_stats(self):
+        stats = self.stats()
+        self.logger.info(
+            f"📊 Caché de consultas: {stats['hits']} aciertos, {stats['misses']} fallos "
+            f"({stats['hit_rate']:.0%}), {stats['stale']} invalidadas, {stats['evictions']} desalojadas, "
+            f"{stats['entries']} entradas / {stats['rows']} filas, {stats['saved_ms']} ms ahorrados"
+        )
+
+
+_query_cache = QueryCache()
+
+
+def get_query_cache():
+    """Caché compartida por todos los DAOs"""
+    return _query_cache
+
+
+def cached_query(*tables):
+    """
+    Decorador para métodos de lectura de los DAOs (que tienen self.db_manager):
+    el resultado se guarda en la caché compartida y se invalida cuando cambia
+    la versión de alguna de 'tables'. El método original queda en .uncached.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            return _query_cache.get_or_load(
+                self.db_manager, method.__qualname__, args, kwargs, tables,
+                lambda: method(self, *args, **kwargs)
+            )
+        wrapper.uncached = method
+        return wrapper
+    return decorator
+
+
+def benchmark(repeat=200):
+    """
+    Medir las listas de la interfaz con y sin caché sobre una base temporal
+    con 100 000 pesajes.
+    """
+    import os
+    import tempfile
+    from db_operations.db_create_db import create_database
+    from db_operations.db_save_folio import WeighingDBManager
+    from db_operations.db_search import SearchOperations
+    # Con "python -m" este módulo es __main__: la caché que usan los DAOs es la del paquete
+    from db_operations.db_query_cache import get_query_cache
+    query_cache = get_query_cache()
+
+    original_path = DatabaseManager.default_db_path
+    temp_dir = tempfile.mkdtemp(prefix='scale_cache_')
+    DatabaseManager.configure(os.path.join(temp_dir, 'cache_benchmark.db'))
+    manager = DatabaseManager()
+    try:
+        create_database()
+        conn = manager.connect_db(row_factory=None)
+        conn.executemany(
+            "INSERT INTO weighing_records (folio_number, weighing_type, scale_record_status, date_start) VALUES (?, 'Entrada', ?, '2024-01-01 08:00:00')",
+            ((f"{number:06d}", 'Pendiente' if number % 50 == 0 else 'Cerrado') for number in range(1, 100_001))
+        )
+        conn.commit()
+
+        search, weighing = SearchOperations(), WeighingDBManager()
+        for label, method in (
+            ('get_pending_weighings', weighing.get_pending_weighings),
+            ('get_last_folios_weighings_closed', search.get_last_folios_weighings_closed),
+        ):
+            started = time.perf_counter()
+            for _ in range(repeat):
+                method.uncached(method.__self__)
+            uncached = (time.perf_counter() - started) / repeat
+            started = time.perf_counter()
+            for _ in range(repeat):
+                method()
+            cached = (time.perf_counter() - started) / repeat
+            print(f"{label:<34} | sin caché {uncached * 1000:8.2f} ms | con caché {cached * 1000:8.3f} ms")
+        query_cache.log_stats()
+    finally:
+        query_cache.clear()
+        manager.close_thread_connections()
+        DatabaseManager.configure(original_path)
+        for file_name in os.listdir(temp_dir):
+            os.remove(os.path.join(temp_dir, file_name))
+        os.rmdir(temp_dir)
+
+
+if __name__ == '__main__':
+    benchmark()
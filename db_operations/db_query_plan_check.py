@@ -0,0 +1,279 @@
+# db_query_plan_check.py
+
+import inspect
+import os
+import re
+import sys
+import tempfile
+from types import SimpleNamespace
+from db_operations.db_connect import DatabaseManager
+from utils.logger_config import app_logger
+
+logger = app_logger.getChild('QueryPlanCheck')
+
+# Pesajes de la base temporal: 1-3 cerrados en 2020 (SEED_ARCHIVE_AFTER_DAYS los pasa a
+# scale_archive_2020.db), 4 pendiente de ALM2 con su complementario 5, 6 pendiente y
+# 7 cerrado reciente
+SEED_WEIGHINGS = [
+    (1, '000001', 'Entrada', 'Cerrado', '2020-03-01 08:00:00', '2020-03-01 09:00:00', None),
+    (2, '000002', 'Salida', 'Cerrado', '2020-03-02 08:00:00', '2020-03-02 09:00:00', None),
+    (3, '000003', 'Entrada', 'Cerrado', '2020-03-03 08:00:00', '2020-03-03 09:00:00', None),
+    (4, '000004', 'Entrada', 'Pendiente', '2024-01-01 08:00:00', None, None),
+    (5, '000004A', 'Entrada', 'Pendiente', '2024-01-01 08:00:00', None, 4),
+    (6, '000006', 'Salida', 'Pendiente', '2024-01-02 08:00:00', None, None),
+    (7, '000007', 'Entrada', 'Cerrado', '2024-01-03 08:00:00', '2024-01-03 09:00:00', None),
+]
+SEED_ARCHIVE_AFTER_DAYS = 365 * 4
+
+# Clases cuyos métodos públicos se revisan todos (test_query_plans verifica que
+# cada uno tenga su llamada en QUERY_CALLS)
+QUERY_CLASSES = ('SearchOperations', 'WeighingDBManager')
+
+
+def _weighing(**changes):
+    from logic.logic_weighing import DataWeighing
+    values = dict(
+        folio='', date_start='2024-02-01 08:00:00', gross_weight=15000, tare_weight=0,
+        date_end=None, peso_neto=0, id_changes=0, notes='ABC', id_customer=None,
+        id_vehicle=None, id_trailer=None, id_driver=None, id_material=None,
+        id_usuario=1, tipo_pesaje='Entrada',
+    )
+    values.update(changes)
+    return DataWeighing(**values)
+
+
+def _manual_weighing(**changes):
+    from logic.logic_weighing_manual import DataManualWeighing
+    values = dict(
+        folio='', date_start='2024-02-01 08:00:00', gross_weight=15000, tare_weight=5000,
+        date_end='2024-02-01 09:00:00', net_weight=10000, id_changes=0, notes='ABC',
+        id_customer=None, id_vehicle=None, id_trailer=None, id_driver=None,
+        id_material=None, id_usuario=1, weighing_type='Entrada', scale_record_status='Cerrado',
+    )
+    values.update(changes)
+    return DataManualWeighing(**values)
+
+
+def _close_data(id_weighing, **changes):
+    values = dict(
+        id_weighing=id_weighing, gross_weight=15000, tare_weight=5000, net_weight=10000,
+        date_end='2024-02-01 09:00:00', id_changes=0, scale_record_status='Cerrado',
+        id_user_closed=1, notes='ABC',
+    )
+    values.update(changes)
+    return values
+
+
+def _history(id_weighing):
+    return {
+        'id_weighing': id_weighing, 'folio_number': '000004', 'previous_value': '0',
+        'new_value': '5000', 'datetime_modification': '2024-02-01 09:00:00',
+        'id_user_modificacion': 1, 'history_notes': 'ABC',
+    }
+
+
+# Llamada a cada método público: (método, llamada con el contexto, alias que pueden
+# recorrerse completos y por qué). Solo las listas completas sin paginar pueden
+# recorrer weighing_records; los métodos que escriben se ejecutan sobre la base temporal.
+QUERY_CALLS = [
+    # --- SearchOperations ---
+    ('SearchOperations.next_page_cursor',
+     lambda ctx: ctx.search.next_page_cursor([{'id_weighing': 7}]), {}),
+    ('SearchOperations.iter_folio_pages',
+     lambda ctx: list(ctx.search.iter_folio_pages(ctx.search.get_folios_weighings_closed, fetch_size=1)), {}),
+    ('SearchOperations.iter_folios',
+     lambda ctx: list(ctx.search.iter_folios(ctx.search.get_last_folios_weighings_manual, fetch_size=2)), {}),
+    ('SearchOperations.search_folio_for_text',
+     lambda ctx: ctx.search.search_folio_for_text('ABC'),
+     {'ws': 'ventana acotada de coincidencias FTS5 (SEARCH_RANK_WINDOW)'}),
+    ('SearchOperations.search_folio_for_text',
+     lambda ctx: ctx.search.search_folio_for_text('ABC', page_size=10, page_cursor=(0.0, 7)),
+     {'ws': 'ventana acotada de coincidencias FTS5 (SEARCH_RANK_WINDOW)'}),
+    ('SearchOperations.search_folio_history',
+     lambda ctx: ctx.search.search_folio_history('ABC'), {}),
+    ('SearchOperations.search_folio_history',
+     lambda ctx: ctx.search.search_folio_history('ABC', page_size=10, page_cursor=7), {}),
+    ('SearchOperations.get_folios_weighings_closed',
+     lambda ctx: ctx.search.get_folios_weighings_closed(), {}),
+    ('SearchOperations.get_all_folios_weighings_closed',
+     # Lista completa de folios de cualquier estado sin paginar: recorre toda la tabla a propósito
+     lambda ctx: ctx.search.get_all_folios_weighings_closed(),
+     {'wr': 'lista completa de folios sin paginar'}),
+    ('SearchOperations.get_all_folios_weighings_closed',
+     lambda ctx: ctx.search.get_all_folios_weighings_closed(page_size=200, page_cursor=1000), {}),
+    ('SearchOperations.get_last_folios_weighings_closed',
+     lambda ctx: ctx.search.get_last_folios_weighings_closed(), {}),
+    ('SearchOperations.search_folio_for_text_manual',
+     lambda ctx: ctx.search.search_folio_for_text_manual('ABC'),
+     {'ws': 'ventana acotada de coincidencias FTS5 (SEARCH_RANK_WINDOW)'}),
+    ('SearchOperations.get_last_folios_weighings_manual',
+     lambda ctx: ctx.search.get_last_folios_weighings_manual(), {}),
+    # --- WeighingDBManager ---
+    ('WeighingDBManager.get_last_folio',
+     lambda ctx: ctx.weighing.get_last_folio(), {}),
+    ('WeighingDBManager.get_next_folio',
+     lambda ctx: ctx.weighing.get_next_folio(), {}),
+    ('WeighingDBManager.save_weighing_record',
+     lambda ctx: ctx.weighing.save_weighing_record(_weighing(), companion=_weighing(folio_ALM2='A')), {}),
+    ('WeighingDBManager.save_manual_weighing_record',
+     lambda ctx: ctx.weighing.save_manual_weighing_record(_manual_weighing()), {}),
+    ('WeighingDBManager.update_weighing_manual',
+     lambda ctx: ctx.weighing.update_weighing_manual(_manual_weighing(folio='000007', id_weighing=7)), {}),
+    ('WeighingDBManager.get_pending_weighings',
+     lambda ctx: ctx.weighing.get_pending_weighings(), {}),
+    ('WeighingDBManager.get_companion_id',
+     lambda ctx: ctx.weighing.get_companion_id(4), {}),
+    ('WeighingDBManager.close_weighing_input',
+     lambda ctx: ctx.weighing.close_weighing_input(_close_data(6)), {}),
+    ('WeighingDBManager.close_weighing_output',
+     lambda ctx: ctx.weighing.close_weighing_output(_close_data(6)), {}),
+    ('WeighingDBManager.close_weighings',
+     lambda ctx: ctx.weighing.close_weighings([(_close_data(5), None), (_close_data(4), _history(4))]), {}),
+    ('WeighingDBManager.get_folios_weighings',
+     # Lista completa de folios sin paginar: recorre toda la tabla a propósito
+     lambda ctx: ctx.weighing.get_folios_weighings(),
+     {'wr': 'lista completa de folios sin paginar'}),
+]
+
+# Sentencias internas de FTS5 ('main'.'weighing_search_config', 'archive_0'. ...)
+INTERNAL_STATEMENT = re.compile(r"'\w+'\.'")
+
+
+def query_methods():
+    """Métodos públicos de QUERY_CLASSES, como 'Clase.método'"""
+    from db_operations.db_save_folio import WeighingDBManager
+    from db_operations.db_search import SearchOperations
+
+    methods = []
+    for cls in (SearchOperations, WeighingDBManager):
+        assert cls.__name__ in QUERY_CLASSES
+        methods += [f"{cls.__name__}.{name}" for name, _ in inspect.getmembers(cls, inspect.isfunction)
+                    if not name.startswith('_')]
+    return methods
+
+
+def explain(conn, sql):
+    """Líneas de EXPLAIN QUERY PLAN de una sentencia"""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def find_full_scans(plan, allowed_aliases=()):
+    """
+    Recorridos completos de tabla en un plan: 'SCAN <alias>' (con o sin índice
+    de recorrido) e índices automáticos, que indican un JOIN sin índice. Una
+    tabla FTS5 consultada con MATCH (índice ':M') no es un recorrido completo,
+    ni leer el catálogo del esquema (sqlite_master).
+    """
+    problems = []
+    for detail in plan:
+        if 'AUTOMATIC' in detail:
+            problems.append(detail)
+        elif detail.startswith('SCAN ') and 'VIRTUAL TABLE INDEX' in detail and ':M' in detail:
+            continue
+        elif detail.startswith('SCAN '):
+            alias = detail.split()[1]
+            if alias not in allowed_aliases and alias.split('.')[-1] not in ('CONSTANT', 'sqlite_master'):
+                problems.append(detail)
+    return problems
+
+
+def _seed(manager):
+    """Pesajes de SEED_WEIGHINGS y un archivo anual con los de 2020"""
+    from db_operations.db_archive import WeighingArchive
+
+    conn = manager.connect_db(row_factory=None)
+    conn.executemany('''
+        INSERT INTO weighing_records (id_weighing, folio_number, weighing_type, scale_record_status,
+                                      date_start, date_end, companion_of, notes, id_user)
+        VALUES (?, ?, ?, ?, ?, ?, ?, 'ABC', 1)
+    ''', SEED_WEIGHINGS)
+    conn.commit()
+    if not WeighingArchive(manager).archive_old_records(older_than_days=SEED_ARCHIVE_AFTER_DAYS):
+        raise RuntimeError("No se pudo crear el archivo anual de prueba")
+
+
+def _plan_connection(manager):
+    """Conexión para EXPLAIN con los archivos adjuntos como los adjunta search_folio_history"""
+    from db_operations.db_archive import list_archives
+
+    conn = manager.open_dedicated_connection()
+    for index, (year, path) in enumerate(list_archives(manager.db_path)):
+        conn.execute(f"ATTACH DATABASE ? AS archive_{index}", (path,))
+    return conn
+
+
+def check_query_plans(verbose=True):
+    """
+    Ejecutar todos los métodos públicos de SearchOperations y WeighingDBManager
+    (QUERY_CALLS) sobre una base temporal con el esquema actual y un archivo
+    anual adjunto, y revisar el plan de cada sentencia que ejecutan.
+
+    Returns:
+        list: (método, detalle del plan) de cada recorrido completo no permitido
+    """
+    from db_operations.db_create_db import create_database
+    from db_operations.db_query_cache import get_query_cache
+    from db_operations.db_save_folio import WeighingDBManager
+    from db_operations.db_search import SearchOperations
+
+    original_path = DatabaseManager.default_db_path
+    temp_dir = tempfile.mkdtemp(prefix='scale_plan_')
+    DatabaseManager.configure(os.path.join(temp_dir, 'plan_check.db'))
+    manager = DatabaseManager()
+    failures = []
+    plan_conn = None
+    try:
+        if not create_database():
+            raise RuntimeError("No se pudo crear la base temporal")
+        _seed(manager)
+        get_query_cache().clear()
+
+        statements = []
+        connections = [manager.connect_db(), manager.connect_db(row_factory=None)]
+        plan_conn = _plan_connection(manager)
+        ctx = SimpleNamespace(search=SearchOperations(), weighing=WeighingDBManager())
+
+        for name, call, allowed in QUERY_CALLS:
+            statements.clear()
+            for conn in connections:
+                conn.set_trace_callback(statements.append)
+            try:
+                call(ctx)
+            finally:
+                for conn in connections:
+                    conn.set_trace_callback(None)
+
+            queries = [sql for sql in statements
+                       if sql.lstrip().upper().startswith(('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH'))
+                       and not INTERNAL_STATEMENT.search(sql)]
+            for sql in queries:
+                plan = explain(plan_conn, sql)
+                problems = find_full_scans(plan, allowed)
+                failures.extend((name, problem) for problem in problems)
+                if verbose:
+                    status = '❌' if problems else '✅'
+                    print(f"{status} {name}: {' '.join(sql.split())[:100]}")
+                    for detail in plan:
+                        print(f"      {detail}")
+                    for alias, reason in allowed.items():
+                        print(f"      (recorrido permitido de {alias}: {reason})")
+    finally:
+        if plan_conn:
+            plan_conn.close()
+        manager.close_thread_connections()
+        get_query_cache().clear()
+        DatabaseManager.configure(original_path)
+        for root, directories, files in os.walk(temp_dir, topdown=False):
+            for file_name in files:
+                os.remove(os.path.join(root, file_name))
+            for directory in directories:
+                os.rmdir(os.path.join(root, directory))
+        os.rmdir(temp_dir)
+
+    if failures:
+        logger.warning(f"⚠️ {len(failures)} recorrido(s) completo(s) de tabla en las consultas revisadas")
+    return failures
+
+
+if __name__ == '__main__':
+    sys.exit(1 if check_query_plans() else 0)
@@ -2,57 +2,35 @@
 
 import sqlite3
 from typing import List, Dict, Optional
-from logic.logic_odoo_records import OdooAPI
+from db_operations.db_connect import DatabaseManager
+from db_operations.db_folio_history import FolioHistory
+from db_operations.db_folio_sequence import FolioSequence
+from db_operations.db_query_cache import cached_query
+from db_operations.db_change_notifier import FOLIO_TABLES
+from db_operations.db_odoo_outbox import OdooOutbox, notify_odoo_outbox
+
+# Columnas que puede escribir el cierre de un pesaje (close_weighings)
+CLOSE_COLUMNS = (
+    'gross_weight', 'tare_weight', 'date_end', 'net_weight', 'id_changes',
+    'scale_record_status', 'id_user_closed', 'notes',
+)
 
 class WeighingDBManager:
     def __init__(self):
-        self.db_path = 'scale_app_DB.db'
+        self.db_manager = DatabaseManager()
+        self.folio_sequence = FolioSequence(db_manager=self.db_manager)
         self.folio_id = None
-        self.get_folio_id = None
     
     def get_last_folio(self) -> Optional[str]:
         """
-        Obtiene el último folio disponible de la tabla weighing_records.
+        Obtiene el siguiente folio disponible de la secuencia de folios (O(1)).
+        Es solo una vista previa: el folio definitivo se asigna al guardar.
         
         Returns:
-            str: El último folio en formato secuencial (ej: '000001')
-            None: Si no hay registros o hay error
+            str: El siguiente folio en formato secuencial (ej: '000001')
+            None: Si hay error
         """
-        conn = None
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Consultar el último folio
-            cursor.execute('''
-                SELECT folio_number
-                FROM weighing_records 
-                ORDER BY id_weighing DESC 
-                LIMIT 1
-            ''')
-            
-            result = cursor.fetchone()
-            if result and result[0]:
-                # Si hay folio existente, incrementarlo
-                last_folio = result[0]
-                try:
-                    # Intentar convertir a número y sumar 1
-                    folio_num = int(last_folio)
-                    new_folio = folio_num + 1
-                    return f"{new_folio:06d}"  # Formato 6 dígitos con ceros a la izquierda
-                except ValueError:
-                    # Si el folio no es numérico, empezar desde 1
-                    return "000001"
-            else:
-                # No hay registros, empezar desde 1
-                return "000001"
-                
-        except sqlite3.Error as e:
-            print(f"Error al obtener último folio: {e}")
-            return None
-        finally:
-            if conn:
-                conn.close()
+        return self.folio_sequence.peek()
     
     def get_next_folio(self) -> str:
         """
@@ -68,140 +46,164 @@ class WeighingDBManager:
         else:
             # Folio por defecto en caso de error
             return "000001"
-        
-    def save_weighing_record(self, weighing_data):
+
+    def _assign_folio(self, cursor, weighing_data, companion=None):
         """
-        Guarda un registro de pesaje en la base de datos.
-        
-        Args:
-            weighing_data: Objeto DataWeighing con los datos del pesaje
-            
+        Asignar el folio definitivo dentro de la transacción del INSERT.
+        El pesaje complementario de ALM2 recibe el mismo folio con sufijo 'A'.
+        """
+        preview_folio = weighing_data.folio
+        folio = self.folio_sequence.next_folio(cursor)
+        if preview_folio and preview_folio != folio:
+            print(f"⚠️ El folio {preview_folio} ya fue asignado; se usa el folio {folio}")
+
+        weighing_data.folio = folio
+        if companion is not None:
+            companion.folio = f"{folio}A"
+            if companion.folio_ALM2:
+                companion.folio_ALM2 = companion.folio
+            weighing_data.folio_ALM2 = companion.folio
+        return folio
+
+    def _weighing_values(self, weighing_data):
+        # Mapear los datos a la estructura real de la tabla
+        return (
+            weighing_data.folio,
+            weighing_data.date_start,      # date_start
+            weighing_data.gross_weight,        # gross_weight
+            weighing_data.tare_weight,         # tare_weight
+            weighing_data.date_end,         # date_end
+            weighing_data.peso_neto,         # net_weight
+            weighing_data.id_changes,     # id_changes
+            weighing_data.tipo_pesaje,       # weighing_type
+            weighing_data.notes,             # notes
+            weighing_data.folio_ALM2,
+            weighing_data.weight_original,
+            weighing_data.id_customer,        # external_id_customer
+            weighing_data.id_vehicle,       # id_vehicle
+            weighing_data.id_trailer,       # id_trailer
+            weighing_data.id_driver,         # id_driver
+            weighing_data.id_material,       # id_material
+            weighing_data.id_usuario         # id_user
+        )
+
+    def _manual_weighing_values(self, weighing_data):
+        # Mapear los datos a la estructura real de la tabla
+        return (
+            weighing_data.folio,
+            weighing_data.date_start,      # date_start
+            weighing_data.gross_weight,        # gross_weight
+            weighing_data.tare_weight,         # tare_weight
+            weighing_data.date_end,         # date_end
+            weighing_data.net_weight,         # net_weight
+            weighing_data.id_changes,     # id_changes
+            weighing_data.weighing_type,       # weighing_type
+            weighing_data.notes,             # notes
+            weighing_data.folio_ALM2,
+            weighing_data.weight_original,
+            weighing_data.id_customer,        # external_id_customer
+            weighing_data.id_vehicle,       # id_vehicle
+            weighing_data.id_trailer,       # id_trailer
+            weighing_data.id_driver,         # id_driver
+            weighing_data.id_material,       # id_material
+            weighing_data.id_usuario,         # id_user
+            weighing_data.scale_record_status,
+            weighing_data.id_usuario
+        )
+
+    def _insert_new_weighing(self, sql, values_function, weighing_data, companion=None):
+        """
+        Insertar un pesaje nuevo (y su complementario de ALM2, si lo hay) en una
+        sola transacción, con el folio asignado por la secuencia.
+
         Returns:
-            bool: True si se guardó correctamente, False si hubo error
+            tuple: (éxito, siguiente folio)
         """
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self.db_manager.connect_db(row_factory=None)
             cursor = conn.cursor()
 
-            # Adaptar a la estructura REAL de la tabla weighing_records
-            sql = """
-            INSERT INTO weighing_records (
-                folio_number, date_start, gross_weight,tare_weight, date_end, net_weight, 
-                id_changes, weighing_type, notes, folio_ALM2, weight_original,
-                id_customer, id_vehicle, id_trailer, id_driver, id_material, id_user
-            ) 
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """
-
-            # Mapear los datos a la estructura real de la tabla
-            values = (
-                weighing_data.folio,
-                weighing_data.date_start,      # date_start
-                weighing_data.gross_weight,        # gross_weight
-                weighing_data.tare_weight,         # tare_weight
-                weighing_data.date_end,         # date_end
-                weighing_data.peso_neto,         # net_weight
-                weighing_data.id_changes,     # id_changes
-                weighing_data.tipo_pesaje,       # weighing_type
-                weighing_data.notes,             # notes
-                weighing_data.folio_ALM2,
-                weighing_data.weight_original,
-                weighing_data.id_customer,        # external_id_customer
-                weighing_data.id_vehicle,       # id_vehicle
-                weighing_data.id_trailer,       # id_trailer
-                weighing_data.id_driver,         # id_driver
-                weighing_data.id_material,       # id_material
-                weighing_data.id_usuario         # id_user
-            )
-            
-            cursor.execute(sql, values)
+            # IMMEDIATE: la secuencia y el INSERT quedan bajo el mismo candado de escritura
+            cursor.execute("BEGIN IMMEDIATE")
+            self._assign_folio(cursor, weighing_data, companion)
+
+            saved_ids = []
+            if companion is not None:
+                cursor.execute(sql, values_function(companion))
+                saved_ids.append(cursor.lastrowid)
+            cursor.execute(sql, values_function(weighing_data))
+            saved_ids.append(cursor.lastrowid)
+            if companion is not None:
+                cursor.execute(
+                    "UPDATE weighing_records SET companion_of = ? WHERE id_weighing = ?",
+                    (saved_ids[1], saved_ids[0])
+                )
+            # El envío a Odoo queda en la cola con la misma transacción
+            for saved_id in saved_ids:
+                OdooOutbox.enqueue(cursor, saved_id)
             conn.commit()
+            notify_odoo_outbox()
+            self.folio_id = saved_ids[-1]
             
             # Obtener el siguiente folio después de guardar
             siguiente_folio = self.get_next_folio()
-            self.folio_id = cursor.lastrowid
-            self.get_folio_id = OdooAPI(self.folio_id)
-
-            #print(f'El id del folio insertado es: {self.folio_id}')
-            self.get_folio_id.create_record_scale()
 
             return True, siguiente_folio
             
         except sqlite3.Error as e:
             print(f"Error al guardar registro de pesaje: {e}")
+            if conn and conn.in_transaction:
+                conn.rollback()
+                self.folio_sequence.discard_block()
             return False, None
         finally:
             if conn:
-                conn.close()
-
-    def save_manual_weighing_record(self, weighing_data):
+                self.db_manager.close_db(conn)
+        
+    def save_weighing_record(self, weighing_data, companion=None):
         """
         Guarda un registro de pesaje en la base de datos.
         
         Args:
             weighing_data: Objeto DataWeighing con los datos del pesaje
+            companion: Pesaje complementario de ALM2 (opcional), se guarda en la misma transacción
             
         Returns:
             bool: True si se guardó correctamente, False si hubo error
         """
-        conn = None
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # Adaptar a la estructura REAL de la tabla weighing_records
-            sql = """
-            INSERT INTO weighing_records (
-                folio_number, date_start, gross_weight,tare_weight, date_end, net_weight, 
-                id_changes, weighing_type, notes, folio_ALM2, weight_original,
-                id_customer, id_vehicle, id_trailer, id_driver, id_material, id_user, scale_record_status, id_user_closed
-            ) 
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """
-
-            # Mapear los datos a la estructura real de la tabla
-            values = (
-                weighing_data.folio,
-                weighing_data.date_start,      # date_start
-                weighing_data.gross_weight,        # gross_weight
-                weighing_data.tare_weight,         # tare_weight
-                weighing_data.date_end,         # date_end
-                weighing_data.net_weight,         # net_weight
-                weighing_data.id_changes,     # id_changes
-                weighing_data.weighing_type,       # weighing_type
-                weighing_data.notes,             # notes
-                weighing_data.folio_ALM2,
-                weighing_data.weight_original,
-                weighing_data.id_customer,        # external_id_customer
-                weighing_data.id_vehicle,       # id_vehicle
-                weighing_data.id_trailer,       # id_trailer
-                weighing_data.id_driver,         # id_driver
-                weighing_data.id_material,       # id_material
-                weighing_data.id_usuario,         # id_user
-                weighing_data.scale_record_status,
-                weighing_data.id_usuario
-            )
-            
-            cursor.execute(sql, values)
-            conn.commit()
-            
-            # Obtener el siguiente folio después de guardar
-            siguiente_folio = self.get_next_folio()
-            self.folio_id = cursor.lastrowid
-            self.get_folio_id = OdooAPI(self.folio_id)
-
-            #print(f'El id del folio insertado es: {self.folio_id}')
-            self.get_folio_id.create_record_scale()
+        # Adaptar a la estructura REAL de la tabla weighing_records
+        sql = """
+        INSERT INTO weighing_records (
+            folio_number, date_start, gross_weight,tare_weight, date_end, net_weight, 
+            id_changes, weighing_type, notes, folio_ALM2, weight_original,
+            id_customer, id_vehicle, id_trailer, id_driver, id_material, id_user
+        ) 
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """
+        return self._insert_new_weighing(sql, self._weighing_values, weighing_data, companion)
 
-            return True, siguiente_folio
+    def save_manual_weighing_record(self, weighing_data, companion=None):
+        """
+        Guarda un registro de pesaje en la base de datos.
+        
+        Args:
+            weighing_data: Objeto DataWeighing con los datos del pesaje
+            companion: Pesaje complementario de ALM2 (opcional), se guarda en la misma transacción
             
-        except sqlite3.Error as e:
-            print(f"Error al guardar registro de pesaje: {e}")
-            return False, None
-        finally:
-            if conn:
-                conn.close()
+        Returns:
+            bool: True si se guardó correctamente, False si hubo error
+        """
+        # Adaptar a la estructura REAL de la tabla weighing_records
+        sql = """
+        INSERT INTO weighing_records (
+            folio_number, date_start, gross_weight,tare_weight, date_end, net_weight, 
+            id_changes, weighing_type, notes, folio_ALM2, weight_original,
+            id_customer, id_vehicle, id_trailer, id_driver, id_material, id_user, scale_record_status, id_user_closed
+        ) 
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """
+        return self._insert_new_weighing(sql, self._manual_weighing_values, weighing_data, companion)
 
 
     def update_weighing_manual(self, weighing_data: dict) -> bool:
@@ -212,7 +214,7 @@ class WeighingDBManager:
         conn = None
         result = {'exito': False, 'updated_row': None}
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self.db_manager.connect_db(row_factory=None)
             cursor = conn.cursor()
 
             # La consulta UPDATE actualizada con todos los campos
@@ -270,13 +272,13 @@ class WeighingDBManager:
                 )
             
             cursor.execute(query, values)
-            conn.commit()
             self.folio_id = weighing_data.id_weighing
             
-            # Solo crear la API y llamar al método si tenemos un folio_id válido
+            # Solo encolar el envío a Odoo si tenemos un folio_id válido
             if self.folio_id:
-                self.get_folio_id = OdooAPI(self.folio_id)
-                self.get_folio_id.create_record_scale()
+                OdooOutbox.enqueue(conn.cursor(), self.folio_id)
+            conn.commit()
+            notify_odoo_outbox()
             
             if cursor.rowcount > 0:                
                 # Ahora obtener todos los datos con los JOINs
@@ -331,17 +333,18 @@ class WeighingDBManager:
             print(f"❌ Error al actualizar el pesaje ID {weighing_data.id_weighing}: {e}")
         finally:
             if conn:
-                conn.close()
+                self.db_manager.close_db(conn)
         
         return result
 
     
 
+    @cached_query(*FOLIO_TABLES)
     def get_pending_weighings(self) -> List[Dict]:
         """Obtener pesajes pendientes de la base de datos"""
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self.db_manager.connect_db(row_factory=None)
             cursor = conn.cursor()
 
             query = """
@@ -373,7 +376,7 @@ class WeighingDBManager:
                 LEFT JOIN materials m ON wr.id_material = m.id_material
                 LEFT JOIN users u ON wr.id_user = u.id_user
                 WHERE wr.scale_record_status = 'Pendiente' 
-                AND wr.folio_number NOT LIKE '%A'
+                AND wr.companion_of IS NULL
                 -- OR wr.scale_record_status IS NULL --
                 ORDER BY wr.id_weighing DESC
              """
@@ -390,7 +393,30 @@ class WeighingDBManager:
             return []
         finally:
             if conn:
-                conn.close()
+                self.db_manager.close_db(conn)
+
+    def get_companion_id(self, id_weighing) -> Optional[int]:
+        """
+        Obtener el id del pesaje complementario de ALM2 de un pesaje principal.
+
+        Returns:
+            int: id_weighing del complementario
+            None: si no tiene complementario o hubo error
+        """
+        conn = None
+        try:
+            conn = self.db_manager.connect_db(row_factory=None)
+            row = conn.execute(
+                "SELECT id_weighing FROM weighing_records WHERE companion_of = ?",
+                (int(id_weighing),)
+            ).fetchone()
+            return row[0] if row else None
+        except sqlite3.Error as e:
+            print(f"Error al obtener el pesaje complementario de {id_weighing}: {e}")
+            return None
+        finally:
+            if conn:
+                self.db_manager.close_db(conn)
 
     def close_weighing_input(self, weighing_closed_data: dict) -> bool:
         """
@@ -400,7 +426,7 @@ class WeighingDBManager:
         conn = None
         result = {'exito': False, 'updated_row': None}
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self.db_manager.connect_db(row_factory=None)
             cursor = conn.cursor()
 
             # La consulta UPDATE usa placeholders (?) para seguridad
@@ -433,12 +459,10 @@ class WeighingDBManager:
             )
             
             cursor.execute(query, values)
-            conn.commit()
             self.folio_id = weighing_closed_data['id_weighing']
-            self.get_folio_id = OdooAPI(self.folio_id)
-
-            #print(f'El id del folio actualizado es: {self.folio_id}')
-            self.get_folio_id.create_record_scale()
+            OdooOutbox.enqueue(conn.cursor(), self.folio_id)
+            conn.commit()
+            notify_odoo_outbox()
             
             if cursor.rowcount > 0:                
             # Ahora obtener todos los datos con los JOINs
@@ -491,20 +515,19 @@ class WeighingDBManager:
             print(f"❌ Error al cerrar el pesaje ID {weighing_closed_data.get('id_weighing', 'N/A')}: {e}")
         finally:
             if conn:
-                conn.close()
+                self.db_manager.close_db(conn)
         
         return result
     
-    def close_weighing_input_alm2(self, weighing_closed_data_alm2: dict) -> bool:
+    def close_weighing_output(self, weighing_closed_data: dict) -> bool:
         """
         Ejecuta el UPDATE final para cerrar un registro de pesaje 
         en la tabla weighing_records usando los datos del diccionario.
         """
         conn = None
-        #exito = False
         result = {'exito': False, 'updated_row': None}
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self.db_manager.connect_db(row_factory=None)
             cursor = conn.cursor()
 
             # La consulta UPDATE usa placeholders (?) para seguridad
@@ -512,7 +535,6 @@ class WeighingDBManager:
                 UPDATE weighing_records
                 SET 
                     gross_weight = ?,
-                    tare_weight = ?,
                     date_end = ?,
                     net_weight = ?,
                     id_changes = ?,
@@ -524,28 +546,27 @@ class WeighingDBManager:
             """
 
             # Los valores para los placeholders, en el orden de la consulta
-            id_changes = weighing_closed_data_alm2.get('id_changes', 0)
+            id_changes = weighing_closed_data.get('id_changes', 0)
             values = (
-                weighing_closed_data_alm2['gross_weight'],
-                weighing_closed_data_alm2['tare_weight'],
-                weighing_closed_data_alm2['date_end'],
-                weighing_closed_data_alm2['net_weight'],
+                weighing_closed_data['gross_weight'],
+                weighing_closed_data['date_end'],
+                weighing_closed_data['net_weight'],
                 id_changes,
-                weighing_closed_data_alm2['scale_record_status'],
-                weighing_closed_data_alm2['id_user_closed'],
-                weighing_closed_data_alm2['notes'],  
-                weighing_closed_data_alm2['id_weighing']
+                weighing_closed_data['scale_record_status'],
+                weighing_closed_data['id_user_closed'],
+                weighing_closed_data['notes'],
+                weighing_closed_data['id_weighing']
+                    
             )
             
             cursor.execute(query, values)
+            self.folio_id = weighing_closed_data['id_weighing']
+            OdooOutbox.enqueue(conn.cursor(), self.folio_id)
             conn.commit()
-            self.folio_id = weighing_closed_data_alm2['id_weighing']
-            self.get_folio_id = OdooAPI(self.folio_id)
-
-            self.get_folio_id.create_record_scale()
+            notify_odoo_outbox()
             
-            if cursor.rowcount > 0:
-                #print(f"✅ Pesaje ID {weighing_closed_data_alm2['id_weighing']} (Folio: {weighing_closed_data_alm2['folio_number']}) cerrado exitosamente.")
+            if cursor.rowcount > 0:                
+            # Ahora obtener todos los datos con los JOINs
                 select_query = """
                     SELECT 
                         wr.id_weighing,
@@ -578,7 +599,7 @@ class WeighingDBManager:
                     WHERE wr.id_weighing = ?;
                 """
                 
-                cursor.execute(select_query, (weighing_closed_data_alm2['id_weighing'],))
+                cursor.execute(select_query, (weighing_closed_data['id_weighing'],))
                 updated_row = cursor.fetchone()
                 if updated_row:
                     column_names = [description[0] for description in cursor.description]
@@ -586,68 +607,61 @@ class WeighingDBManager:
                     updated_row = dict(zip(column_names, updated_row))                
                     result['exito'] = True
                     result['updated_row'] = updated_row
-                #exito = True
             else:
-                print(f"⚠️ No se encontró el registro con ID {weighing_closed_data_alm2['id_weighing']} para cerrar.")
-                #exito = False 
+                print(f"⚠️ No se encontró el registro con ID {weighing_closed_data['id_weighing']} para cerrar.")
+
         except sqlite3.Error as e:
-            print(f"❌ Error al cerrar el pesaje ID {weighing_closed_data_alm2.get('id_weighing', 'N/A')}: {e}")
+            print(f"❌ Error al cerrar el pesaje ID {weighing_closed_data.get('id_weighing', 'N/A')}: {e}")
         finally:
             if conn:
-                conn.close()
-        
+                self.db_manager.close_db(conn)
+        print(f"Resultado de la  base de datos outpput: {result}")
         return result
+    
 
-
-    def close_weighing_output(self, weighing_closed_data: dict) -> bool:
+    def close_weighings(self, closes) -> dict:
         """
-        Ejecuta el UPDATE final para cerrar un registro de pesaje 
-        en la tabla weighing_records usando los datos del diccionario.
+        Cerrar uno o varios pesajes (p. ej. el par ALM2 + principal) y registrar
+        su historial en una sola transacción: o quedan todos cerrados o ninguno.
+
+        Args:
+            closes: lista de (weighing_closed_data, history_data). De cada
+                    weighing_closed_data se actualizan las columnas de CLOSE_COLUMNS
+                    que traiga. Si history_data no es None se inserta en
+                    folio_history y su id real (lastrowid) queda en id_changes.
+
+        Returns:
+            dict: {'exito': bool, 'updated_row': fila del último pesaje cerrado}
         """
         conn = None
         result = {'exito': False, 'updated_row': None}
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self.db_manager.connect_db(row_factory=None)
             cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
 
-            # La consulta UPDATE usa placeholders (?) para seguridad
-            query = """
-                UPDATE weighing_records
-                SET 
-                    gross_weight = ?,
-                    date_end = ?,
-                    net_weight = ?,
-                    id_changes = ?,
-                    scale_record_status = ?,
-                    id_user_closed = ?,
-                    notes = ?
-                WHERE 
-                    id_weighing = ?;
-            """
+            for weighing_closed_data, history_data in closes:
+                values = {column: weighing_closed_data[column] for column in CLOSE_COLUMNS if column in weighing_closed_data}
+                if history_data is not None:
+                    values['id_changes'] = FolioHistory.add_change(cursor, history_data)
+
+                assignments = ', '.join(f"{column} = ?" for column in values)
+                cursor.execute(
+                    f"UPDATE weighing_records SET {assignments} WHERE id_weighing = ?",
+                    tuple(values.values()) + (weighing_closed_data['id_weighing'],)
+                )
+                if cursor.rowcount == 0:
+                    print(f"⚠️ No se encontró el registro con ID {weighing_closed_data['id_weighing']} para cerrar.")
+                    conn.rollback()
+                    return result
+                OdooOutbox.enqueue(cursor, weighing_closed_data['id_weighing'])
 
-            # Los valores para los placeholders, en el orden de la consulta
-            id_changes = weighing_closed_data.get('id_changes', 0)
-            values = (
-                weighing_closed_data['gross_weight'],
-                weighing_closed_data['date_end'],
-                weighing_closed_data['net_weight'],
-                id_changes,
-                weighing_closed_data['scale_record_status'],
-                weighing_closed_data['id_user_closed'],
-                weighing_closed_data['notes'],
-                weighing_closed_data['id_weighing']
-                    
-            )
-            
-            cursor.execute(query, values)
             conn.commit()
-            self.folio_id = weighing_closed_data['id_weighing']
-            self.get_folio_id = OdooAPI(self.folio_id)
-            self.get_folio_id.create_record_scale()
-            
-            if cursor.rowcount > 0:                
-            # Ahora obtener todos los datos con los JOINs
-                select_query = """
+            notify_odoo_outbox()
+            self.folio_id = closes[-1][0]['id_weighing']
+
+            # Datos completos del último pesaje (el principal) para el ticket
+            cursor.execute("""
                     SELECT 
                         wr.id_weighing,
                         wr.folio_number,
@@ -677,33 +691,26 @@ class WeighingDBManager:
                     LEFT JOIN users u ON wr.id_user = u.id_user
                     LEFT JOIN users uc ON wr.id_user_closed = uc.id_user
                     WHERE wr.id_weighing = ?;
-                """
-                
-                cursor.execute(select_query, (weighing_closed_data['id_weighing'],))
-                updated_row = cursor.fetchone()
-                if updated_row:
-                    column_names = [description[0] for description in cursor.description]
-                # Crear diccionario con los datos actualizados
-                    updated_row = dict(zip(column_names, updated_row))                
-                    result['exito'] = True
-                    result['updated_row'] = updated_row
-            else:
-                print(f"⚠️ No se encontró el registro con ID {weighing_closed_data['id_weighing']} para cerrar.")
+                """, (closes[-1][0]['id_weighing'],))
+            updated_row = cursor.fetchone()
+            if updated_row:
+                column_names = [description[0] for description in cursor.description]
+                result['updated_row'] = dict(zip(column_names, updated_row))
+            result['exito'] = True
 
         except sqlite3.Error as e:
-            print(f"❌ Error al cerrar el pesaje ID {weighing_closed_data.get('id_weighing', 'N/A')}: {e}")
+            print(f"❌ Error al cerrar los pesajes {[data.get('id_weighing', 'N/A') for data, _ in closes]}: {e}")
         finally:
             if conn:
-                conn.close()
-        print(f"Resultado de la  base de datos outpput: {result}")
+                self.db_manager.close_db(conn)
+
         return result
-    
 
     def get_folios_weighings(self) -> List[Dict]:
         """Obtener pesajes pendientes de la base de datos"""
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self.db_manager.connect_db(row_factory=None)
             cursor = conn.cursor()
 
             query = """
@@ -749,6 +756,6 @@ class WeighingDBManager:
             return []
         finally:
             if conn:
-                conn.close()
+                self.db_manager.close_db(conn)
 
     
\ No newline at end of file
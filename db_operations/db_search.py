@@ -1,20 +1,144 @@
 from db_operations.db_connect import DatabaseManager
+from db_operations.db_search_index import build_match_query, ensure_archive_search_index
+from db_operations.db_archive import list_archives
+from db_operations.db_query_cache import cached_query
+from db_operations.db_change_notifier import FOLIO_TABLES
 from typing import List, Dict, Optional
 
+# Máximo de resultados por búsqueda de texto (los más relevantes primero)
+SEARCH_RESULT_LIMIT = 500
+# Coincidencias más recientes que se ordenan por relevancia: una palabra muy común
+# no obliga a calificar todo el historial
+SEARCH_RANK_WINDOW = 5000
+# Filas por página al recorrer listas completas con iter_folios()
+STREAM_FETCH_SIZE = 500
+# rowid más alto posible en SQLite: límite de la primera página por llave
+MAX_ROWID = 2 ** 63 - 1
+
+# Columnas de las búsquedas en el historial (base viva y archivos anuales)
+HISTORY_COLUMNS = """
+                        wr.id_weighing,
+                        wr.folio_number,
+                        wr.date_start,
+                        wr.date_end,
+                        wr.weighing_type,
+                        wr.gross_weight,
+                        wr.tare_weight,
+                        wr.net_weight,
+                        wr.scale_record_status,
+                        wr.id_status_odoo,
+                        wr.notes,
+                        wr.saved_in_odoo,
+                        v.plates as plates,
+                        v.plates || '-' || v.vehicle_type as vehicle_name,
+                        t.trailer_name as trailer_name,
+                        d.driver_name as driver_name,
+                        c.customer_name as customer_name,
+                        m.material_name as material_name,
+                        u.user_name as user_name,
+                        uc.user_name as user_name_closed
+"""
+
 class SearchOperations:
+    """
+    Consultas de folios para las tablas de la interfaz.
+
+    Las listas y búsquedas aceptan page_size y page_cursor (paginación por llave,
+    sin OFFSET): page_cursor es el valor que devuelve next_page_cursor() con la
+    página anterior, y cada página cuesta lo mismo sin importar qué tan atrás
+    esté en el historial.
+    """
+
     def __init__(self):
         self.db_manager = DatabaseManager()
 
-    def search_folio_for_text(self, text):
-        """Buscar folios por texto en entry"""
+    @staticmethod
+    def next_page_cursor(rows):
+        """
+        Cursor para pedir la página que sigue a 'rows': id_weighing de la última
+        fila, o (search_rank, id_weighing) en las búsquedas por relevancia.
+        None si no hay filas.
+        """
+        if not rows:
+            return None
+        last = rows[-1]
+        if 'search_rank' in last:
+            return last['search_rank'], last['id_weighing']
+        return last['id_weighing']
+
+    def _page_clauses(self, page_size, page_cursor, ranked=False):
+        """Condición de llave y LIMIT de una página, con sus parámetros"""
+        if page_cursor is None and (ranked or page_size is None):
+            keyset, keyset_params = "1 = 1", ()
+        elif page_cursor is None:
+            # Primera página: el mismo rango por llave que las siguientes, para que
+            # el plan recorra la llave primaria desde el final y pare en el LIMIT
+            keyset, keyset_params = "wr.id_weighing <= ?", (MAX_ROWID,)
+        elif ranked:
+            rank, id_weighing = page_cursor
+            keyset = "(ws.rank > ? OR (ws.rank = ? AND wr.id_weighing < ?))"
+            keyset_params = (rank, rank, id_weighing)
+        else:
+            keyset, keyset_params = "wr.id_weighing < ?", (page_cursor,)
+        # LIMIT -1 = sin límite
+        limit = page_size if page_size is not None else -1
+        return keyset, keyset_params, limit
+
+    def _fetch_folios(self, query, params):
+        """Ejecutar una consulta de folios y devolver las filas como diccionarios"""
+        conn = None
+        try:
+            conn = self.db_manager.connect_db()
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        except Exception as e:
+            print(f"Error al buscar folios: {e}")
+            return []
+        finally:
+            self.db_manager.close_db(conn)
+
+    def iter_folio_pages(self, page_method, *args, fetch_size=STREAM_FETCH_SIZE):
+        """
+        Recorrer por páginas cualquier método de lista o búsqueda de esta clase.
+        Cada página es una consulta corta, así que no queda una lectura abierta
+        entre página y página.
+
+        Ejemplo:
+            for page in search.iter_folio_pages(search.get_all_folios_weighings_closed):
+                ...
+        """
+        page_cursor = None
+        while True:
+            rows = page_method(*args, page_size=fetch_size, page_cursor=page_cursor)
+            if not rows:
+                return
+            yield rows
+            if len(rows) < fetch_size:
+                return
+            page_cursor = self.next_page_cursor(rows)
+
+    def iter_folios(self, page_method, *args, fetch_size=STREAM_FETCH_SIZE):
+        """Como iter_folio_pages(), pero entrega fila por fila"""
+        for rows in self.iter_folio_pages(page_method, *args, fetch_size=fetch_size):
+            yield from rows
+
+    @cached_query(*FOLIO_TABLES)
+    def search_folio_for_text(self, text, page_size=SEARCH_RESULT_LIMIT, page_cursor=None):
+        """
+        Buscar folios cerrados por texto en entry, en el índice de texto completo
+        (sin acentos, por prefijo de palabra, los más relevantes primero)
+        """
         #print(f"En update texto:{text}")
+        match_query = build_match_query(text)
+        if match_query is None:
+            return []
 
-        conn = self.db_manager.connect_db()
-        if conn:
-            try:
-                cursor = conn.cursor()
-                cursor.execute("""
+        keyset, keyset_params, limit = self._page_clauses(page_size, page_cursor, ranked=True)
+        return self._fetch_folios(f"""
                     SELECT 
+                        ws.rank AS search_rank,
                         wr.id_weighing,
                         wr.folio_number,
                         wr.date_start,
@@ -35,7 +159,13 @@ class SearchOperations:
                         m.material_name as material_name,
                         u.user_name as user_name,
                         uc.user_name as user_name_closed
-                    FROM weighing_records wr
+                    FROM (
+                        SELECT rowid AS id_weighing, rank FROM weighing_search
+                        WHERE weighing_search MATCH ?
+                        ORDER BY rowid DESC
+                        LIMIT ?
+                    ) ws
+                    JOIN weighing_records wr ON wr.id_weighing = ws.id_weighing
                     LEFT JOIN vehicles v ON wr.id_vehicle = v.id_vehicle
                     LEFT JOIN trailers t ON wr.id_trailer = t.id_trailer  
                     LEFT JOIN drivers d ON wr.id_driver = d.id_driver   
@@ -44,43 +174,83 @@ class SearchOperations:
                     LEFT JOIN users u ON wr.id_user = u.id_user
                     LEFT JOIN users uc ON wr.id_user_closed = uc.id_user
                     WHERE wr.scale_record_status = 'Cerrado'
-                    AND wr.folio_number NOT LIKE '%A'
-                    AND (wr.folio_number LIKE ?
-                        OR wr.weighing_type LIKE ?
-                        OR u.user_name LIKE ?
-                        OR uc.user_name LIKE ? 
-                        OR v.plates LIKE ?
-                        OR v.vehicle_type  LIKE ?
-                        OR t.trailer_name LIKE ? 
-                        OR d.driver_name LIKE ? 
-                        OR c.customer_name LIKE ?
-                        OR m.material_name LIKE ?
-                        OR wr.notes LIKE ?)
-                    ORDER BY wr.id_weighing DESC
-                """, (f'%{text}%', f'%{text}%', f'%{text}%', f'%{text}%', f'%{text}%', f'%{text}%', f'%{text}%', f'%{text}%', f'%{text}%', f'%{text}%', f'%{text}%'))
-                
-                columns = [column[0] for column in cursor.description]
-                results = []
-                
-                for row in cursor.fetchall():
-                    results.append(dict(zip(columns, row)))
-                return results
-                
-            except Exception as e:
-                print(f"Error en la búsqueda:{str(e)} ")
-                return []
-            finally:
-                self.db_manager.close_db(conn)
+                    AND wr.companion_of IS NULL
+                    AND {keyset}
+                    ORDER BY ws.rank, wr.id_weighing DESC
+                    LIMIT ?
+                """, (match_query, SEARCH_RANK_WINDOW) + keyset_params + (limit,))
             
 
-    def get_folios_weighings_closed(self) -> List[Dict]:
-            """Obtener pesajes pendientes de la base de datos"""
-            conn = None
-            try:
-                conn = self.db_manager.connect_db()
-                cursor = conn.cursor()
+    def search_folio_history(self, text, page_size=SEARCH_RESULT_LIMIT, page_cursor=None):
+        """
+        Buscar folios cerrados en la base viva y en los archivos anuales
+        (db_archive), solo cuando el usuario pide el historial: los archivos se
+        adjuntan con ATTACH y se unen con UNION ALL, del más reciente al más
+        antiguo. La base viva y cada archivo tienen el mismo índice de texto
+        completo (sin acentos, por prefijo de palabra) y se buscan con la misma
+        consulta MATCH.
+        """
+        match_query = build_match_query(text)
+        if match_query is None:
+            return []
 
-                query = """
+        keyset, keyset_params, limit = self._page_clauses(page_size, page_cursor)
+        joins = """
+                    LEFT JOIN main.vehicles v ON wr.id_vehicle = v.id_vehicle
+                    LEFT JOIN main.trailers t ON wr.id_trailer = t.id_trailer
+                    LEFT JOIN main.drivers d ON wr.id_driver = d.id_driver
+                    LEFT JOIN main.customers c ON wr.id_customer = c.external_id_customer
+                    LEFT JOIN main.materials m ON wr.id_material = m.id_material
+                    LEFT JOIN main.users u ON wr.id_user = u.id_user
+                    LEFT JOIN main.users uc ON wr.id_user_closed = uc.id_user
+        """
+        parts = [f"""
+                    SELECT {HISTORY_COLUMNS}
+                    FROM main.weighing_records wr {joins}
+                    WHERE wr.id_weighing IN (SELECT rowid FROM weighing_search WHERE weighing_search MATCH ?)
+                    AND wr.scale_record_status = 'Cerrado'
+                    AND wr.companion_of IS NULL
+                    AND {keyset}
+        """]
+        params = (match_query,) + keyset_params
+
+        archives = list_archives(self.db_manager.db_path)
+        for index, _ in enumerate(archives):
+            parts.append(f"""
+                    SELECT {HISTORY_COLUMNS}
+                    FROM archive_{index}.weighing_records wr {joins}
+                    WHERE wr.id_weighing IN (SELECT rowid FROM archive_{index}.weighing_search WHERE weighing_search MATCH ?)
+                    AND wr.companion_of IS NULL
+                    AND {keyset}
+            """)
+            params += (match_query,) + keyset_params
+
+        query = f"""
+                    SELECT * FROM ({' UNION ALL '.join(parts)})
+                    ORDER BY id_weighing DESC
+                    LIMIT ?
+        """
+        conn = self.db_manager.connect_db()
+        attached = []
+        try:
+            for index, (year, path) in enumerate(archives):
+                conn.execute(f"ATTACH DATABASE ? AS archive_{index}", (path,))
+                attached.append(index)
+                # Archivo de antes del índice que el trabajo de archivado aún no indexó
+                if ensure_archive_search_index(conn.cursor(), f"archive_{index}"):
+                    conn.commit()
+            return self._fetch_folios(query, params + (limit,))
+        except Exception as e:
+            print(f"Error al buscar folios en el historial: {e}")
+            return []
+        finally:
+            for index in attached:
+                conn.execute(f"DETACH DATABASE archive_{index}")
+
+    def get_folios_weighings_closed(self, page_size=None, page_cursor=None) -> List[Dict]:
+            """Obtener pesajes pendientes de la base de datos"""
+            keyset, keyset_params, limit = self._page_clauses(page_size, page_cursor)
+            query = f"""
                     SELECT 
                         wr.id_weighing,
                         wr.folio_number,
@@ -111,30 +281,17 @@ class SearchOperations:
                     LEFT JOIN users u ON wr.id_user = u.id_user
                     LEFT JOIN users uc ON wr.id_user_closed = uc.id_user
                     WHERE wr.scale_record_status = 'Cerrado'
-                    AND wr.folio_number NOT LIKE '%A'
+                    AND wr.companion_of IS NULL
+                    AND {keyset}
                     ORDER BY wr.id_weighing DESC
+                    LIMIT ?
                 """
-                    
-                cursor.execute(query)
-                columns = [column[0] for column in cursor.description]
-                results = []
-                for row in cursor.fetchall():
-                    results.append(dict(zip(columns, row)))                    
-                return results
-                
-            except Exception as e:
-                    return False, f"Error al buscar folios: {e}"
-            finally:
-                    self.db_manager.close_db(conn)
+            return self._fetch_folios(query, keyset_params + (limit,))
 
-    def get_all_folios_weighings_closed(self) -> List[Dict]:
+    def get_all_folios_weighings_closed(self, page_size=None, page_cursor=None) -> List[Dict]:
             """Obtener pesajes pendientes de la base de datos"""
-            conn = None
-            try:
-                conn = self.db_manager.connect_db()
-                cursor = conn.cursor()
-
-                query = """
+            keyset, keyset_params, limit = self._page_clauses(page_size, page_cursor)
+            query = f"""
                     SELECT 
                         wr.id_weighing,
                         wr.folio_number,
@@ -167,30 +324,18 @@ class SearchOperations:
                     LEFT JOIN users u ON wr.id_user = u.id_user
                     LEFT JOIN users uc ON wr.id_user_closed = uc.id_user
                     -- WHERE wr.scale_record_status = 'Cerrado'
-                    -- AND wr.folio_number NOT LIKE '%A'
+                    -- AND wr.companion_of IS NULL
+                    WHERE {keyset}
                     ORDER BY wr.id_weighing DESC
+                    LIMIT ?
                 """
-                    
-                cursor.execute(query)
-                columns = [column[0] for column in cursor.description]
-                results = []
-                for row in cursor.fetchall():
-                    results.append(dict(zip(columns, row)))                    
-                return results
-                
-            except Exception as e:
-                    return False, f"Error al buscar folios: {e}"
-            finally:
-                    self.db_manager.close_db(conn)
+            return self._fetch_folios(query, keyset_params + (limit,))
 
-    def get_last_folios_weighings_closed(self) -> List[Dict]:
+    @cached_query(*FOLIO_TABLES)
+    def get_last_folios_weighings_closed(self, page_size=30, page_cursor=None) -> List[Dict]:
             """Obtener los ultimos 30 pesajes pendientes de la base de datos"""
-            conn = None
-            try:
-                conn = self.db_manager.connect_db()
-                cursor = conn.cursor()
-
-                query = """
+            keyset, keyset_params, limit = self._page_clauses(page_size, page_cursor)
+            query = f"""
                     SELECT 
                         wr.id_weighing,
                         wr.folio_number,
@@ -221,33 +366,25 @@ class SearchOperations:
                     LEFT JOIN users u ON wr.id_user = u.id_user
                     LEFT JOIN users uc ON wr.id_user_closed = uc.id_user
                     WHERE wr.scale_record_status = 'Cerrado'
-                    AND wr.folio_number NOT LIKE '%A'
+                    AND wr.companion_of IS NULL
+                    AND {keyset}
                     ORDER BY wr.id_weighing DESC
-                    LIMIT 30
+                    LIMIT ?
                 """
-                    
-                cursor.execute(query)
-                columns = [column[0] for column in cursor.description]
-                results = []
-                for row in cursor.fetchall():
-                    results.append(dict(zip(columns, row)))                    
-                return results
-                
-            except Exception as e:
-                    return False, f"Error al buscar folios: {e}"
-            finally:
-                    self.db_manager.close_db(conn)
+            return self._fetch_folios(query, keyset_params + (limit,))
 
 
-    def search_folio_for_text_manual(self, text):
-        """Buscar folios por texto en entry"""
+    @cached_query(*FOLIO_TABLES)
+    def search_folio_for_text_manual(self, text, page_size=SEARCH_RESULT_LIMIT, page_cursor=None):
+        """Buscar folios de cualquier estado por texto en entry, en el índice de texto completo"""
+        match_query = build_match_query(text)
+        if match_query is None:
+            return []
 
-        conn = self.db_manager.connect_db()
-        if conn:
-            try:
-                cursor = conn.cursor()
-                cursor.execute("""
+        keyset, keyset_params, limit = self._page_clauses(page_size, page_cursor, ranked=True)
+        return self._fetch_folios(f"""
                     SELECT 
+                        ws.rank AS search_rank,
                         wr.id_weighing,
                         wr.folio_number,
                         wr.date_start,
@@ -270,7 +407,13 @@ class SearchOperations:
                         m.material_name as material_name,
                         u.user_name as user_name,
                         uc.user_name as user_name_closed
-                    FROM weighing_records wr
+                    FROM (
+                        SELECT rowid AS id_weighing, rank FROM weighing_search
+                        WHERE weighing_search MATCH ?
+                        ORDER BY rowid DESC
+                        LIMIT ?
+                    ) ws
+                    JOIN weighing_records wr ON wr.id_weighing = ws.id_weighing
                     LEFT JOIN vehicles v ON wr.id_vehicle = v.id_vehicle
                     LEFT JOIN trailers t ON wr.id_trailer = t.id_trailer  
                     LEFT JOIN drivers d ON wr.id_driver = d.id_driver   
@@ -279,43 +422,18 @@ class SearchOperations:
                     LEFT JOIN users u ON wr.id_user = u.id_user
                     LEFT JOIN users uc ON wr.id_user_closed = uc.id_user
                     -- WHERE wr.scale_record_status = 'Cerrado'
-                    -- WHERE wr.folio_number NOT LIKE '%A'
-                    WHERE (wr.folio_number LIKE ?
-                        OR wr.weighing_type LIKE ?
-                        OR u.user_name LIKE ?
-                        OR uc.user_name LIKE ? 
-                        OR v.plates LIKE ?
-                        OR v.vehicle_type  LIKE ?
-                        OR t.trailer_name LIKE ? 
-                        OR d.driver_name LIKE ? 
-                        OR c.customer_name LIKE ?
-                        OR m.material_name LIKE ?
-                        OR wr.notes LIKE ?)
-                    ORDER BY wr.id_weighing DESC
-                """, (f'%{text}%', f'%{text}%', f'%{text}%', f'%{text}%', f'%{text}%', f'%{text}%', f'%{text}%', f'%{text}%', f'%{text}%', f'%{text}%', f'%{text}%'))
-                
-                columns = [column[0] for column in cursor.description]
-                results = []
-                
-                for row in cursor.fetchall():
-                    results.append(dict(zip(columns, row)))
-                return results
-                
-            except Exception as e:
-                print(f"Error en la búsqueda:{str(e)} ")
-                return []
-            finally:
-                self.db_manager.close_db(conn)
+                    -- WHERE wr.companion_of IS NULL
+                    WHERE {keyset}
+                    ORDER BY ws.rank, wr.id_weighing DESC
+                    LIMIT ?
+                """, (match_query, SEARCH_RANK_WINDOW) + keyset_params + (limit,))
     
 
-    def get_last_folios_weighings_manual(self) -> List[Dict]:
+    @cached_query(*FOLIO_TABLES)
+    def get_last_folios_weighings_manual(self, page_size=30, page_cursor=None) -> List[Dict]:
             """Obtener los ultimos 30 pesajes pendientes de la base de datos"""
-            conn = None
-            try:
-                conn = self.db_manager.connect_db()
-                cursor = conn.cursor()
-
-                query = """
+            keyset, keyset_params, limit = self._page_clauses(page_size, page_cursor)
+            query = f"""
                     SELECT 
                         wr.id_weighing,
                         wr.folio_number,
@@ -348,19 +466,9 @@ class SearchOperations:
                     LEFT JOIN users u ON wr.id_user = u.id_user
                     LEFT JOIN users uc ON wr.id_user_closed = uc.id_user
                     -- WHERE wr.scale_record_status = 'Cerrado'
-                    -- AND wr.folio_number NOT LIKE '%A'
+                    -- AND wr.companion_of IS NULL
+                    WHERE {keyset}
                     ORDER BY wr.id_weighing DESC
-                    LIMIT 30
+                    LIMIT ?
                 """
-                    
-                cursor.execute(query)
-                columns = [column[0] for column in cursor.description]
-                results = []
-                for row in cursor.fetchall():
-                    results.append(dict(zip(columns, row)))                    
-                return results
-                
-            except Exception as e:
-                    return False, f"Error al buscar folios: {e}"
-            finally:
-                    self.db_manager.close_db(conn)
\ No newline at end of file
+            return self._fetch_folios(query, keyset_params + (limit,))
\ No newline at end of file
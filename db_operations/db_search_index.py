@@ -0,0 +1,241 @@
+# db_search_index.py
+
+import re
+
+# Índice de texto completo de los pesajes: una fila por pesaje (rowid = id_weighing)
+# con el texto ya resuelto de los catálogos. unicode61 con remove_diacritics 2 hace
+# que "Jose" encuentre "José"; prefix guarda los prefijos de 2 a 6 letras para
+# que la palabra que se está escribiendo no tenga que combinar listas completas.
+SEARCH_TABLE = 'weighing_search'
+
+SEARCH_COLUMNS = (
+    'folio_number', 'weighing_type', 'plates', 'vehicle_type', 'trailer_name',
+    'driver_name', 'customer_name', 'material_name', 'user_name', 'user_name_closed', 'notes',
+)
+
+# Peso de cada columna en bm25(): el folio y las placas pesan más que las notas
+RANK_WEIGHTS = (10.0, 1.0, 5.0, 1.0, 2.0, 2.0, 2.0, 2.0, 1.0, 1.0, 0.5)
+
+# Texto de cada pesaje. El folio también se indexa sin ceros a la izquierda para
+# que "123" encuentre "000123". {records} es la tabla de pesajes y {catalogs} el
+# esquema de los catálogos (los archivos anuales usan los de la base viva).
+SOURCE_SELECT = '''
+    SELECT
+        wr.id_weighing,
+        wr.folio_number || ' ' || ltrim(wr.folio_number, '0') AS folio_number,
+        wr.weighing_type,
+        v.plates,
+        v.vehicle_type,
+        t.trailer_name,
+        d.driver_name,
+        c.customer_name,
+        m.material_name,
+        u.user_name,
+        uc.user_name AS user_name_closed,
+        wr.notes
+    FROM {records} wr
+    LEFT JOIN {catalogs}vehicles v ON wr.id_vehicle = v.id_vehicle
+    LEFT JOIN {catalogs}trailers t ON wr.id_trailer = t.id_trailer
+    LEFT JOIN {catalogs}drivers d ON wr.id_driver = d.id_driver
+    LEFT JOIN {catalogs}customers c ON wr.id_customer = c.external_id_customer
+    LEFT JOIN {catalogs}materials m ON wr.id_material = m.id_material
+    LEFT JOIN {catalogs}users u ON wr.id_user = u.id_user
+    LEFT JOIN {catalogs}users uc ON wr.id_user_closed = uc.id_user
+'''
+
+SOURCE_VIEW = (
+    "CREATE VIEW IF NOT EXISTS weighing_search_source AS"
+    + SOURCE_SELECT.format(records='weighing_records', catalogs='')
+)
+
+# Catálogos cuyo texto entra al índice:
+# (tabla, llave del catálogo, condición sobre weighing_records, columnas de texto)
+CATALOG_SOURCES = (
+    ('vehicles', 'id_vehicle', 'id_vehicle = {ref}', ('plates', 'vehicle_type')),
+    ('trailers', 'id_trailer', 'id_trailer = {ref}', ('trailer_name',)),
+    ('drivers', 'id_driver', 'id_driver = {ref}', ('driver_name',)),
+    ('customers', 'external_id_customer', 'id_customer = {ref}', ('customer_name',)),
+    ('materials', 'id_material', 'id_material = {ref}', ('material_name',)),
+    ('users', 'id_user', 'id_user = {ref} OR id_user_closed = {ref}', ('user_name',)),
+)
+
+# Columnas de weighing_records que cambian el texto indexado de un pesaje
+WEIGHING_TEXT_COLUMNS = (
+    'folio_number', 'weighing_type', 'notes', 'id_vehicle', 'id_trailer',
+    'id_driver', 'id_customer', 'id_material', 'id_user', 'id_user_closed',
+)
+
+# Llaves de catálogo en weighing_records: los triggers de catálogo buscan por ellas
+CATALOG_KEY_INDEXES = [
+    'CREATE INDEX IF NOT EXISTS idx_weighing_records_vehicle ON weighing_records (id_vehicle)',
+    'CREATE INDEX IF NOT EXISTS idx_weighing_records_trailer ON weighing_records (id_trailer)',
+    'CREATE INDEX IF NOT EXISTS idx_weighing_records_driver ON weighing_records (id_driver)',
+    'CREATE INDEX IF NOT EXISTS idx_weighing_records_customer ON weighing_records (id_customer)',
+    'CREATE INDEX IF NOT EXISTS idx_weighing_records_material ON weighing_records (id_material)',
+]
+
+_COLUMN_LIST = ', '.join(SEARCH_COLUMNS)
+
+
+def _delete_rows(condition):
+    return f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN (SELECT id_weighing FROM weighing_records WHERE {condition});"
+
+
+def _insert_rows(condition):
+    return (
+        f"INSERT INTO {SEARCH_TABLE} (rowid, {_COLUMN_LIST}) "
+        f"SELECT id_weighing, {_COLUMN_LIST} FROM weighing_search_source "
+        f"WHERE id_weighing IN (SELECT id_weighing FROM weighing_records WHERE {condition});"
+    )
+
+
+def _trigger_statements():
+    """Triggers que mantienen el índice al día con weighing_records y los catálogos"""
+    statements = [
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_weighing_search_insert
+        AFTER INSERT ON weighing_records BEGIN
+            {_insert_rows('id_weighing = NEW.id_weighing')}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_weighing_search_update
+        AFTER UPDATE OF {', '.join(WEIGHING_TEXT_COLUMNS)} ON weighing_records BEGIN
+            DELETE FROM {SEARCH_TABLE} WHERE rowid = OLD.id_weighing;
+            {_insert_rows('id_weighing = NEW.id_weighing')}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_weighing_search_delete
+        AFTER DELETE ON weighing_records BEGIN
+            DELETE FROM {SEARCH_TABLE} WHERE rowid = OLD.id_weighing;
+        END
+        ''',
+    ]
+
+    for table, key, condition, text_columns in CATALOG_SOURCES:
+        new_rows = condition.format(ref=f'NEW.{key}')
+        old_rows = condition.format(ref=f'OLD.{key}')
+        changed = ' OR '.join(f'OLD.{column} IS NOT NEW.{column}' for column in (key,) + text_columns)
+        statements += [
+            f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_search_insert
+            AFTER INSERT ON {table} BEGIN
+                {_delete_rows(new_rows)}
+                {_insert_rows(new_rows)}
+            END
+            ''',
+            # Solo cuando cambia el texto: la sincronización con Odoo reescribe
+            # los catálogos completos y casi nunca cambia un nombre
+            f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_search_update
+            AFTER UPDATE OF {', '.join((key,) + text_columns)} ON {table}
+            WHEN {changed} BEGIN
+                {_delete_rows(old_rows)}
+                {_insert_rows(old_rows)}
+                {_delete_rows(new_rows)}
+                {_insert_rows(new_rows)}
+            END
+            ''',
+            f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_search_delete
+            AFTER DELETE ON {table} BEGIN
+                {_delete_rows(old_rows)}
+                {_insert_rows(old_rows)}
+            END
+            ''',
+        ]
+    return statements
+
+
+def _create_search_table(cursor, schema='main'):
+    """Tabla FTS5 (mismo tokenizador, prefijos y ranking en la base viva y en los archivos)"""
+    cursor.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS {schema}.{SEARCH_TABLE} USING fts5(
+            {_COLUMN_LIST},
+            tokenize = "unicode61 remove_diacritics 2",
+            prefix = '2 3 4 5 6'
+        )
+    ''')
+    weights = ', '.join(str(weight) for weight in RANK_WEIGHTS)
+    cursor.execute(f"INSERT INTO {schema}.{SEARCH_TABLE} ({SEARCH_TABLE}, rank) VALUES ('rank', 'bm25({weights})')")
+
+
+def create_search_index(cursor):
+    """
+    Crear el índice FTS5, su vista de origen, los triggers y llenarlo con los
+    pesajes existentes (paso de migración).
+    """
+    _create_search_table(cursor)
+    cursor.execute(SOURCE_VIEW)
+    for statement in CATALOG_KEY_INDEXES + _trigger_statements():
+        cursor.execute(statement)
+    rebuild_search_index(cursor)
+
+
+def index_archived_weighings(cursor, schema, condition='1 = 1'):
+    """
+    Indexar en {schema}.weighing_search (archivo anual adjunto) los pesajes del
+    archivo que cumplen 'condition' (sobre wr).
+
+    Un archivo no puede tener triggers sobre los catálogos de la base viva: su
+    índice se llena al archivar y guarda el texto de ese momento.
+    """
+    cursor.execute(
+        f"DELETE FROM {schema}.{SEARCH_TABLE} WHERE rowid IN "
+        f"(SELECT wr.id_weighing FROM {schema}.weighing_records wr WHERE {condition})"
+    )
+    cursor.execute(
+        f"INSERT INTO {schema}.{SEARCH_TABLE} (rowid, {_COLUMN_LIST}) "
+        + SOURCE_SELECT.format(records=f'{schema}.weighing_records', catalogs='main.')
+        + f" WHERE {condition}"
+    )
+
+
+def ensure_archive_search_index(cursor, schema):
+    """
+    Crear y llenar el índice de texto completo de un archivo anual adjunto que
+    aún no lo tiene (archivos de antes del índice). No hace commit.
+
+    Returns:
+        bool: True si se creó
+    """
+    exists = cursor.execute(
+        f"SELECT 1 FROM {schema}.sqlite_master WHERE type = 'table' AND name = ?", (SEARCH_TABLE,)
+    ).fetchone()
+    if exists:
+        return False
+    _create_search_table(cursor, schema)
+    index_archived_weighings(cursor, schema)
+    return True
+
+
+def rebuild_search_index(cursor):
+    """Volver a llenar el índice desde weighing_records (p. ej. tras una importación masiva)"""
+    cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+    cursor.execute(
+        f"INSERT INTO {SEARCH_TABLE} (rowid, {_COLUMN_LIST}) "
+        f"SELECT id_weighing, {_COLUMN_LIST} FROM weighing_search_source"
+    )
+
+
+def search_words(text):
+    """Palabras del texto del buscador"""
+    return re.findall(r'\w+', text or '')
+
+
+def build_match_query(text):
+    """
+    Convertir el texto del buscador en una consulta MATCH: todas las palabras
+    deben aparecer y la última, que puede estar a medio escribir, se busca como
+    prefijo ("abc 12" -> "abc" "12"*).
+
+    Returns:
+        str: consulta FTS5, o None si el texto no tiene palabras
+    """
+    words = search_words(text)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
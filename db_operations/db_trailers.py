@@ -1,72 +1,46 @@
 # db_trailers.py
 
 from db_operations.db_connect import DatabaseManager
+from db_operations.db_query_cache import cached_query
+from db_operations.db_catalog_sync import CatalogSync
 from typing import List, Dict, Optional
 
 class Trailers:
     def __init__(self):
         self.db_manager = DatabaseManager()
+        self.catalog_sync = CatalogSync(
+            'trailers', 'external_id_trailer', 'active_trailer',
+            ('trailer_name', 'category_trailer', 'equipo_tara', 'active_trailer'),
+            db_manager=self.db_manager
+        )
 
 
     def save_trailers_from_odoo(self,trailers):
         """
-        Guarda o actualiza los remolques obtenidos de Odoo en la base de datos local.
+        Guarda o actualiza los remolques obtenidos de Odoo en la base de datos local
+        y desactiva los que ya no vienen de Odoo, en una sola transacción.
         """
-        conn = self.db_manager.connect_db()
-        records_processed = 0
-        if conn:
-            try:
-                cursor = conn.cursor()
-                external_trailersIds_from_odoo = [trailer.get('id') for trailer in trailers]
-
-                for trailer in trailers:
-                    external_id = trailer.get('id')
-                    trailer_name = trailer.get('name')
-                    trailer_category_tuple = trailer.get('category_id')
-                    trailer_category = trailer_category_tuple[1] if isinstance(trailer_category_tuple, list) else 'N/A'
-                    equipo_tara = int(trailer.get('x_studio_equipo_tara'))
-                    active = trailer.get('active', False)
-                    active_status = 1 if active else 0
-
-                    cursor.execute("SELECT id_trailer FROM trailers WHERE external_id_trailer = ?", (external_id,))
-                    existing_traile = cursor.fetchone()
+        try:
+            rows = []
+            for trailer in trailers:
+                trailer_category_tuple = trailer.get('category_id')
+                rows.append((
+                    trailer.get('id'),
+                    trailer.get('name'),
+                    trailer_category_tuple[1] if isinstance(trailer_category_tuple, list) else 'N/A',
+                    int(trailer.get('x_studio_equipo_tara')),
+                    1 if trailer.get('active', False) else 0,
+                ))
 
-                    if existing_traile:
-                        cursor.execute('''
-                            UPDATE trailers
-                            SET trailer_name = ?, category_trailer = ?, equipo_tara = ?, active_trailer = ?
-                            WHERE external_id_trailer = ?;
-                        ''', ( trailer_name, trailer_category, equipo_tara, active_status, external_id))
-                    else:
-                        cursor.execute('''
-                            INSERT INTO trailers (external_id_trailer, trailer_name, category_trailer, equipo_tara, active_trailer)
-                            VALUES (?, ?, ?, ?, ?);
-                        ''', (external_id, trailer_name, trailer_category, equipo_tara, active_status))
-                    
-                    records_processed += 1
-
-                if external_trailersIds_from_odoo:
-                    placeholders = ','.join(['?' for _ in external_trailersIds_from_odoo])
-                    
-                    cursor.execute(f'''
-                        UPDATE trailers 
-                        SET active_trailer = 0 
-                        WHERE external_id_trailer NOT IN ({placeholders})
-                        AND external_id_trailer != 0
-                        ''', external_trailersIds_from_odoo)
-                    
-                    records_updated = cursor.rowcount
-                    print(f"Remolques desactivados: {records_updated}")
-                    
-                conn.commit()
-                return records_processed
-                
-            except Exception as e:
-                print(f"Error al guardar materiales de Odoo: {e}")
-                return 0
-            finally:
-                self.db_manager.close_db(conn)
+            records_processed, records_updated = self.catalog_sync.sync(rows)
+            print(f"Remolques desactivados: {records_updated}")
+            return records_processed
+            
+        except Exception as e:
+            print(f"Error al guardar remolques de Odoo: {e}")
+            return 0
 
+    @cached_query('trailers')
     def get_active_trailers(self):
         """
         Se conecta a la base de datos aplicacion_bascula.db y obtiene los datos
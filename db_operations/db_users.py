@@ -2,6 +2,7 @@
 import datetime
 import bcrypt
 from  db_operations.db_connect import DatabaseManager
+from db_operations.db_query_cache import cached_query
 from typing import List, Dict, Optional
 
 class Users:
@@ -33,6 +34,7 @@ class Users:
       return False
 
 
+    @cached_query('users')
     def get_active_users(self):
         """
         Se conecta a la base de datos y obtiene los datos
@@ -1,73 +1,46 @@
 # db_materials.py
 
 from db_operations.db_connect import DatabaseManager
+from db_operations.db_query_cache import cached_query
+from db_operations.db_catalog_sync import CatalogSync
 from typing import List, Dict, Optional
 
 class Vehicles:
     def __init__(self):
         self.db_manager = DatabaseManager()
+        self.catalog_sync = CatalogSync(
+            'vehicles', 'external_id_vehicle', 'active_vehicle',
+            ('plates', 'vehicle_type', 'vehicle_tara', 'active_vehicle'),
+            db_manager=self.db_manager
+        )
 
 
     def save_vehicles_from_odoo(self, vehicles):
         """
-        Guarda o actualiza los vehículos obtenidos de Odoo en la base de datos local.
+        Guarda o actualiza los vehículos obtenidos de Odoo en la base de datos local
+        y desactiva los que ya no vienen de Odoo, en una sola transacción.
         """
-        conn = self.db_manager.connect_db()
-        records_processed = 0
-        
-        if conn:
-            try:
-                cursor = conn.cursor()
-                external_vehiclesIds_from_odoo = [vehicle.get('id') for vehicle in vehicles]
-
-                for vehicle in vehicles:
-                    external_id = vehicle.get('id')
-                    plates = vehicle.get('license_plate', 'N/A')
-                    vehicle_type_tuple = vehicle.get('model_id')
-                    vehicle_type = vehicle_type_tuple[1] if isinstance(vehicle_type_tuple, list) else 'N/A'
-                    vehicle_tara = int(vehicle.get('x_studio_tara'))
-                    active = vehicle.get('active', False)
-                    active_status = 1 if active else 0
+        try:
+            rows = []
+            for vehicle in vehicles:
+                vehicle_type_tuple = vehicle.get('model_id')
+                rows.append((
+                    vehicle.get('id'),
+                    vehicle.get('license_plate', 'N/A'),
+                    vehicle_type_tuple[1] if isinstance(vehicle_type_tuple, list) else 'N/A',
+                    int(vehicle.get('x_studio_tara')),
+                    1 if vehicle.get('active', False) else 0,
+                ))
 
-                    cursor.execute("SELECT id_vehicle FROM vehicles WHERE external_id_vehicle = ?", (external_id,))
-                    existing_vehicle = cursor.fetchone()
-
-                    if existing_vehicle:
-                        cursor.execute('''
-                            UPDATE vehicles
-                            SET plates = ?, vehicle_type = ?, vehicle_tara =?, active_vehicle = ?
-                            WHERE external_id_vehicle = ?;
-                        ''', (plates, vehicle_type, vehicle_tara, active_status, external_id))
-                    else:
-                        cursor.execute('''
-                            INSERT INTO vehicles (external_id_vehicle, plates, vehicle_type, vehicle_tara, active_vehicle)
-                            VALUES (?, ?, ?, ?, ?);
-                        ''', (external_id, plates, vehicle_type, vehicle_tara, active_status))
-                    
-                    records_processed += 1
-
-                if external_vehiclesIds_from_odoo:
-                    placeholders = ','.join(['?' for _ in external_vehiclesIds_from_odoo])
-                    
-                    cursor.execute(f'''
-                        UPDATE vehicles 
-                        SET active_vehicle = 0 
-                        WHERE external_id_vehicle NOT IN ({placeholders})
-                        AND external_id_vehicle != 0
-                        ''', external_vehiclesIds_from_odoo)
-                    
-                    records_updated = cursor.rowcount
-                    print(f"Vehículos desactivados: {records_updated}")
-                    
-                conn.commit()
-                return records_processed
-                
-            except Exception as e:
-                print(f"Error al guardar materiales de Odoo: {e}")
-                return 0
-            finally:
-                self.db_manager.close_db(conn)
+            records_processed, records_updated = self.catalog_sync.sync(rows)
+            print(f"Vehículos desactivados: {records_updated}")
+            return records_processed
+            
+        except Exception as e:
+            print(f"Error al guardar vehículos de Odoo: {e}")
+            return 0
 
+    @cached_query('vehicles')
     def get_active_vehicles(self):
         """
         Se conecta a la base de datos aplicacion_bascula.db y obtiene los datos
@@ -6,6 +6,11 @@ from db_operations.db_trailers import Trailers
 from db_operations.db_drivers import Drivers
 from logic.logic_autocomplete_widget import CustomAutocompleteEntry
 from logic.logic_odoo_api import get_odoo_materials, get_odoo_customers, get_odoo_drivers, get_odoo_vehicles, get_odoo_trailers
+from db_operations.db_change_notifier import get_change_notifier
+
+# Catálogos que alimentan los autocompletados
+AUTOCOMPLETE_TABLES = ('vehicles', 'trailers', 'drivers', 'customers', 'materials')
+
 class AutocompleteHandler:
     def __init__(self):
         self.entries = {}
@@ -15,11 +20,26 @@ class AutocompleteHandler:
         self.vehicles_class = Vehicles()
         self.trailers_class = Trailers()
         self.drivers_class = Drivers()
+        self.catalog_loaders = {
+            'vehicles': self._load_vehicles,
+            'trailers': self._load_trailers,
+            'drivers': self._load_drivers,
+            'customers': self._load_customers,
+            'materials': self._load_materials,
+        }
+        self.change_notifier = get_change_notifier()
         self.load_initial_data()
+        self.change_notifier.subscribe(AUTOCOMPLETE_TABLES, self._on_catalogs_changed)
     
     def load_initial_data(self):
         """Cargar datos para autocomplete"""
-        # Vehículos
+        # La versión se toma antes de consultar: un cambio durante la carga no se pierde
+        self._loaded_versions = dict(zip(AUTOCOMPLETE_TABLES, self.change_notifier.versions(AUTOCOMPLETE_TABLES)))
+        for table in AUTOCOMPLETE_TABLES:
+            self.catalog_loaders[table]()
+
+    def _load_vehicles(self):
+        """Cargar vehículos activos para autocomplete"""
         #vehicles = get_odoo_vehicles()
         #if vehicles is not None:
         #    result = self.vehicles_class.save_vehicles_from_odoo(vehicles)
@@ -31,7 +51,8 @@ class AutocompleteHandler:
             self.mappings['vehicles'] = vehicles_mapping
             self.mappings['vehicles_names'] = vehicles_name
 
-    # Remolques
+    def _load_trailers(self):
+        """Cargar remolques activos para autocomplete"""
         #trailers = get_odoo_trailers()
         #if trailers is not None:
         #    result = self.trailers_class.save_trailers_from_odoo(trailers)
@@ -42,8 +63,9 @@ class AutocompleteHandler:
             trailers_mapping = {trailer[2]: trailer[0] for trailer in trailers_data}
             self.mappings['trailers'] = trailers_mapping
             self.mappings['trailers_names'] = trailers_name
-        
-        # Choferes
+
+    def _load_drivers(self):
+        """Cargar choferes activos para autocomplete"""
         #drivers = get_odoo_drivers()
         #if drivers is not None:
          #   result = self.drivers_class.save_drivers_from_odoo(drivers)
@@ -54,8 +76,9 @@ class AutocompleteHandler:
             drivers_mapping = {driver[2]: driver[0] for driver in drivers_data}
             self.mappings['drivers'] = drivers_mapping
             self.mappings['drivers_names'] = drivers_name
-        
-        # Clientes
+
+    def _load_customers(self):
+        """Cargar clientes activos para autocomplete"""
         #customers = get_odoo_customers()
         #if customers is not None:
         #    result = self.customers_class.save_customers_from_odoo(customers)
@@ -71,7 +94,8 @@ class AutocompleteHandler:
             self.mappings['customers_discount'] = customers_discount
             self.mappings['customers_id_alm2'] = customers_id_alm2
 
-        # Materiales    
+    def _load_materials(self):
+        """Cargar materiales activos para autocomplete"""
         #materials = get_odoo_materials()
         #if materials is not None:
         #    result = self.materials_class.save_materials_from_odoo(materials)
@@ -85,7 +109,23 @@ class AutocompleteHandler:
             self.mappings['materials_names'] = materials_name
             self.mappings['material_spd'] = material_spd
         else: print("Sin coneccion a datos")
-    
+
+    def _on_catalogs_changed(self, tables):
+        """
+        Aviso del ChangeNotifier: volver a cargar solo los catálogos que cambiaron
+        y pasar los nuevos datos a sus entradas (normal y manual).
+        """
+        current = dict(zip(AUTOCOMPLETE_TABLES, self.change_notifier.versions(AUTOCOMPLETE_TABLES)))
+        for table in AUTOCOMPLETE_TABLES:
+            if current[table] == self._loaded_versions.get(table):
+                continue
+            self._loaded_versions[table] = current[table]
+            self.catalog_loaders[table]()
+            for key in (table, f"{table}_manual"):
+                entry = self.entries.get(key)
+                if entry is not None:
+                    entry.items = self.mappings.get(f'{table}_names', [])
+                    entry.mapping_dict = self.mappings.get(table, {})
     
     def create_vehicle_entry(self, parent):
         entry = CustomAutocompleteEntry(
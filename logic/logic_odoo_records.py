@@ -11,12 +11,20 @@ import socket
 import urllib.parse
 
 class OdooAPI:
-    def __init__(self, folio_id):
+    def __init__(self, folio_id, interactive=True):
+        """
+        Args:
+            folio_id: id_weighing del pesaje
+            interactive: False desde hilos de fondo (cola de Odoo): los errores
+                         solo se registran en el log, sin ventanas de Tk
+        """
         self.logger = app_logger.getChild('OdooAPI')
         self.logger.info(f"🚀 Inicializando OdooAPI para folio_id: {folio_id}")
         
         self.folio_id = folio_id
         self.odoo_id = None
+        self.interactive = interactive
+        self.configured = False
         self.db_manager = OdooDBManager(self.folio_id)
         self.odoo_config = OdooConfig()
         
@@ -26,15 +34,21 @@ class OdooAPI:
             self.logger.error(error_msg)
             status = 0
             self.db_manager.saved_in_Odoo_status(status)
-            messagebox.showerror("Error de Configuración", error_msg)
-            return False
+            self._show_error("Error de Configuración", error_msg)
+            return
         
         self.url = config['odoo_url']
         self.db_name = config['odoo_db_name']
         self.email = config['odoo_api_user_email']
         self.api_key = config['odoo_api_key']
+        self.configured = True
         
         self.logger.debug("Configuración de Odoo cargada correctamente")
+
+    def _show_error(self, title, message):
+        """Mostrar el error al operador solo en modo interactivo (hilo de la interfaz)"""
+        if self.interactive:
+            messagebox.showerror(title, message)
     
     def _test_internet_connection(self, timeout=5):
         """
@@ -192,7 +206,7 @@ class OdooAPI:
             self.logger.error(error_msg)
             status = 0
             self.db_manager.saved_in_Odoo_status(status)
-            messagebox.showerror("Error de Conexión", error_msg)
+            self._show_error("Error de Conexión", error_msg)
             return False
         
         # Verificar si el servidor Odoo está accesible
@@ -201,7 +215,7 @@ class OdooAPI:
             self.logger.error(error_msg)
             status = 0
             self.db_manager.saved_in_Odoo_status(status)
-            messagebox.showerror("Error de Conexión", error_msg)
+            self._show_error("Error de Conexión", error_msg)
             return False
         
         # Probar autenticación con una consulta simple
@@ -224,7 +238,7 @@ class OdooAPI:
                 self.logger.warning(error_msg)
                 status = 0
                 self.db_manager.saved_in_Odoo_status(status)
-                messagebox.showerror("Error de Autenticación", 
+                self._show_error("Error de Autenticación", 
                                    "Credenciales incorrectas. Verifique:\n"
                                    "- API Key\n"
                                    "- Usuario tiene permisos API\n"
@@ -239,7 +253,7 @@ class OdooAPI:
                 self.logger.error(error_msg)
                 status = 0
                 self.db_manager.saved_in_Odoo_status(status)
-                messagebox.showerror("Error de Credenciales", 
+                self._show_error("Error de Credenciales", 
                                    "Credenciales incorrectas. Verifique:\n"
                                    "- API Key\n"
                                    "- Permisos de usuario")
@@ -248,7 +262,7 @@ class OdooAPI:
                 self.logger.error(error_msg)
                 status = 0
                 self.db_manager.saved_in_Odoo_status(status)
-                messagebox.showerror("Error de Conexión", 
+                self._show_error("Error de Conexión", 
                                    "No se puede conectar al servidor Odoo.\n"
                                    "Verifique:\n"
                                    "- Su conexión a internet\n"
@@ -259,7 +273,7 @@ class OdooAPI:
                 self.logger.error(error_msg, exc_info=True)
                 status = 0
                 self.db_manager.saved_in_Odoo_status(status)
-                messagebox.showerror("Error de Autenticación", error_msg)
+                self._show_error("Error de Autenticación", error_msg)
             
             return False
     
@@ -332,48 +346,68 @@ class OdooAPI:
         for record in weighing_data:
             self.logger.debug(f"Procesando registro: {record}")
 
-            date_start_adjusted = self._adjust_single_date(record['date_start'])
-            date_end_adjusted = self._adjust_single_date(record['date_end'])
-            date_adjustedTime = self._adjust_single_date(record['date_start'])
-            date_adjusted = self._adjust_dateTime(date_adjustedTime)
-
-            odoo_data = {
-                'x_studio_weighing_type': record['weighing_type'],
-                'x_studio_folio_number': record['folio_number'],
-                'x_studio_partner_id': record['external_id_customer'],
-                'x_studio_scale_record_status': record['scale_record_status'],
-                'x_studio_stage_id': self._stage_id(record['scale_record_status']),
-                'x_studio_id_vehicle': record['external_id_vehicle'],
-                'x_studio_id_trailer': record['external_id_trailer'] or "",
-                'x_studio_id_material': record['external_id_material'],
-                'x_studio_date': date_adjusted,
-                'x_studio_date_start': date_start_adjusted,
-                'x_studio_gross_weight': record['gross_weight'],
-                'x_studio_tare_weight': record['tare_weight'],
-                'x_studio_net_weight': record['net_weight'],
-                'x_studio_date_end': date_end_adjusted,
-                'x_studio_days_open_folio': record['days_open_folio'],
-                'x_studio_id_driver': record['external_id_driver'],
-                'x_studio_company_id': 1,
-                'x_studio_scale_user_start': record['user_name_open'],
-                'x_studio_scale_user_end': record['user_name_closed'] or "",
-                'x_studio_notas': record['notes'],
-                'x_studio_weight_original': record['weight_original'] or 0,
-                'x_studio_kanban_state': "normal"
-            }
-            
-            #self.logger.debug(f"Datos preparados para Odoo: {odoo_data}")
-            
             odoo_weighing_id = record['id_status_odoo']
-            self.logger.debug(f"ID de Odoo encontrado: {odoo_weighing_id}")
-            
+            self.push_weighing(record)
             if odoo_weighing_id is None or odoo_weighing_id == "":
-                self.logger.info("Creando nuevo registro en Odoo")
-                self.odoo_id = self._create_new_record_scale_odoo(odoo_data)
                 return self.odoo_id
-            else:
-                self.logger.info(f"Actualizando registro existente en Odoo: {odoo_weighing_id}")
-                self._update_record_scale_odoo(odoo_weighing_id, odoo_data)
+
+    def _odoo_data(self, record):
+        """Campos de x_scale_records a partir de una fila de OdooDBManager.get_folios_weighings"""
+        date_start_adjusted = self._adjust_single_date(record['date_start'])
+        date_end_adjusted = self._adjust_single_date(record['date_end'])
+        date_adjustedTime = self._adjust_single_date(record['date_start'])
+        date_adjusted = self._adjust_dateTime(date_adjustedTime)
+
+        odoo_data = {
+            'x_studio_weighing_type': record['weighing_type'],
+            'x_studio_folio_number': record['folio_number'],
+            'x_studio_partner_id': record['external_id_customer'],
+            'x_studio_scale_record_status': record['scale_record_status'],
+            'x_studio_stage_id': self._stage_id(record['scale_record_status']),
+            'x_studio_id_vehicle': record['external_id_vehicle'],
+            'x_studio_id_trailer': record['external_id_trailer'] or "",
+            'x_studio_id_material': record['external_id_material'],
+            'x_studio_date': date_adjusted,
+            'x_studio_date_start': date_start_adjusted,
+            'x_studio_gross_weight': record['gross_weight'],
+            'x_studio_tare_weight': record['tare_weight'],
+            'x_studio_net_weight': record['net_weight'],
+            'x_studio_date_end': date_end_adjusted,
+            'x_studio_days_open_folio': record['days_open_folio'],
+            'x_studio_id_driver': record['external_id_driver'],
+            'x_studio_company_id': 1,
+            'x_studio_scale_user_start': record['user_name_open'],
+            'x_studio_scale_user_end': record['user_name_closed'] or "",
+            'x_studio_notas': record['notes'],
+            'x_studio_weight_original': record['weight_original'] or 0,
+            'x_studio_kanban_state': "normal"
+        }
+        return odoo_data
+
+    def push_weighing(self, record):
+        """
+        Crear en Odoo el pesaje (si aún no tiene id_status_odoo) o actualizarlo.
+
+        Args:
+            record: fila de OdooDBManager.get_folios_weighings (o su copia en la cola de Odoo)
+
+        Returns:
+            bool: True si Odoo aceptó el registro
+        """
+        odoo_data = self._odoo_data(record)
+        #self.logger.debug(f"Datos preparados para Odoo: {odoo_data}")
+        
+        odoo_weighing_id = record['id_status_odoo']
+        self.logger.debug(f"ID de Odoo encontrado: {odoo_weighing_id}")
+        
+        if odoo_weighing_id is None or odoo_weighing_id == "":
+            self.logger.info("Creando nuevo registro en Odoo")
+            self.odoo_id = self._create_new_record_scale_odoo(odoo_data)
+            return self.odoo_id is not None
+        else:
+            self.logger.info(f"Actualizando registro existente en Odoo: {odoo_weighing_id}")
+            result = self._update_record_scale_odoo(odoo_weighing_id, odoo_data)
+            return result is not None and result is not False
 
 
     
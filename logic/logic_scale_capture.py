@@ -0,0 +1,176 @@
+# logic_scale_capture.py
+
+import os
+import struct
+import sys
+import threading
+import time
+from utils.logger_config import app_logger
+
+# Formato del archivo de captura:
+#   encabezado: CAPTURE_MAGIC
+#   registros:  <segundos desde el inicio (float64)><longitud (uint16)><bytes crudos>
+CAPTURE_MAGIC = b'BSCAP1\n'
+RECORD_HEADER = struct.Struct('<dH')
+MAX_RECORD_BYTES = 0xFFFF
+
+
+class CaptureWriter:
+    """Grabar los bytes crudos del puerto serial en un archivo de captura con marca de tiempo"""
+
+    def __init__(self, path):
+        self.logger = app_logger.getChild('CaptureWriter')
+        self.path = path
+        self.records = 0
+        self.bytes_written = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'wb')
+        self._file.write(CAPTURE_MAGIC)
+        self._start = time.monotonic()
+        self.logger.info(f"🎙️ Grabando captura serial en: {path}")
+
+    def write(self, data):
+        """Agregar un bloque de bytes leído del puerto"""
+        if not data:
+            return
+        offset = time.monotonic() - self._start
+        with self._lock:
+            if self._file is None:
+                return
+            for start in range(0, len(data), MAX_RECORD_BYTES):
+                chunk = data[start:start + MAX_RECORD_BYTES]
+                self._file.write(RECORD_HEADER.pack(offset, len(chunk)))
+                self._file.write(chunk)
+                self.records += 1
+            self.bytes_written += len(data)
+
+    def close(self):
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.close()
+            self._file = None
+        self.logger.info(f"💾 Captura cerrada: {self.records} bloques, {self.bytes_written} bytes")
+
+
+def read_capture(path):
+    """
+    Leer un archivo de captura.
+
+    Yields:
+        tuple: (segundos desde el inicio, bytes)
+    """
+    with open(path, 'rb') as capture_file:
+        if capture_file.read(len(CAPTURE_MAGIC)) != CAPTURE_MAGIC:
+            raise ValueError(f"Archivo de captura inválido: {path}")
+        while True:
+            header = capture_file.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+            offset, length = RECORD_HEADER.unpack(header)
+            data = capture_file.read(length)
+            if len(data) < length:
+                return
+            yield offset, data
+
+
+class CaptureReplaySource:
+    """
+    Fuente de bytes con la misma interfaz mínima que serial.Serial
+    (is_open, in_waiting, read, close) que reproduce una captura.
+
+    Con realtime=True respeta los tiempos originales (divididos entre speed);
+    con realtime=False entrega los bytes tan rápido como se consuman.
+    """
+
+    def __init__(self, path, realtime=True, speed=1.0, timeout=0.05):
+        self.path = path
+        self.realtime = realtime
+        self.speed = speed if speed > 0 else 1.0
+        self.timeout = timeout
+        self.finished = False
+        self.is_open = True
+
+        self._records = read_capture(path)
+        self._pending = b''
+        self._next = None
+        self._start = time.monotonic()
+
+    @property
+    def in_waiting(self):
+        if not self._pending:
+            self._load_next(block=False)
+        return len(self._pending)
+
+    def read(self, size=1):
+        if not self._pending:
+            self._load_next(block=True)
+        data = self._pending[:size]
+        self._pending = self._pending[size:]
+        return data
+
+    def _load_next(self, block):
+        """Cargar el siguiente registro si ya le toca según el reloj de reproducción"""
+        if self._next is None:
+            self._next = next(self._records, None)
+            if self._next is None:
+                self.finished = True
+                return
+
+        offset, data = self._next
+        if self.realtime:
+            wait = offset / self.speed - (time.monotonic() - self._start)
+            if wait > 0:
+                if not block:
+                    return
+                time.sleep(min(wait, self.timeout))
+                if wait > self.timeout:
+                    return
+
+        self._pending = data
+        self._next = None
+
+    def close(self):
+        self.is_open = False
+        self._records.close()
+
+
+def benchmark_replay(path, protocol=None):
+    """
+    Reproducir una captura lo más rápido posible por la ruta completa de
+    ensamblado y decodificación de ScaleReader y medir las tramas por segundo.
+    """
+    from logic.logic_scale_reader import ReplayScaleReader
+
+    reader = ReplayScaleReader(path, realtime=False, protocol=protocol)
+    if not reader.connect():
+        return None
+
+    reader.reading = True
+    start = time.perf_counter()
+    reader._read_loop()
+    elapsed = time.perf_counter() - start
+
+    state = reader.assembler.get_state()
+    frames = state['frames']
+    return {
+        'frames': frames,
+        'bytes': reader.bytes_received,
+        'seconds': elapsed,
+        'frames_per_second': frames / elapsed if elapsed > 0 else float('inf'),
+        'discarded_bytes': state['discarded_bytes']
+    }
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("Uso: python -m logic.logic_scale_capture <captura.bscap> [protocolo]")
+        sys.exit(1)
+
+    result = benchmark_replay(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    if result:
+        print(f"{result['frames']:,} tramas, {result['bytes']:,} bytes en {result['seconds']:.3f}s "
+              f"-> {result['frames_per_second']:,.0f} tramas/s (descartados: {result['discarded_bytes']})")
@@ -0,0 +1,250 @@
+# logic_scale_decoders.py
+
+import re
+import time
+from typing import NamedTuple, Optional
+
+
+class ScaleFrame(NamedTuple):
+    """Resultado de decodificar una trama del indicador"""
+    weight: int
+    unit: str = "kg"
+    motion: Optional[bool] = None  # None si el protocolo no reporta movimiento
+    overload: bool = False
+
+
+# Normalización de unidades (los indicadores que envían 'G' reportan kg truncado)
+UNIT_MAPPING = {
+    b'kg': 'kg', b'kgs': 'kg', b'kilo': 'kg', b'kilos': 'kg', b'g': 'kg',
+    b'lb': 'lb', b'lbs': 'lb',
+    b't': 't', b'tn': 't', b'ton': 't',
+    b'': 'kg'
+}
+
+DECODERS = {}
+
+
+def register_decoder(decoder_class):
+    """Decorador para registrar un decodificador por su nombre de protocolo"""
+    DECODERS[decoder_class.name] = decoder_class
+    return decoder_class
+
+
+def get_decoder(name):
+    """Obtener una instancia del decodificador configurado (generic si no existe)"""
+    decoder_class = DECODERS.get((name or '').strip().lower(), DECODERS['generic'])
+    return decoder_class()
+
+
+def _parse_digits(frame, start, end):
+    """
+    Convertir un campo numérico de ancho fijo a (entero, decimales) en una sola pasada,
+    sin crear cadenas intermedias. Acepta espacios de relleno y un punto decimal.
+    Retorna None si encuentra un carácter inválido.
+    """
+    value = 0
+    decimals = -1
+    digits = 0
+    for index in range(start, end):
+        char = frame[index]
+        if 48 <= char <= 57:
+            value = value * 10 + (char - 48)
+            digits += 1
+            if decimals >= 0:
+                decimals += 1
+        elif char == 46 and decimals < 0:  # '.'
+            decimals = 0
+        elif char != 32:  # ' '
+            return None
+    if not digits:
+        return None
+    return value, max(decimals, 0)
+
+
+def _to_integer_weight(value, decimals):
+    """Redondear un valor con decimales implícitos a entero"""
+    if decimals <= 0:
+        return value
+    divisor = 10 ** decimals
+    return (value + divisor // 2) // divisor
+
+
+class ScaleDecoder:
+    """Base para los decodificadores de protocolo de indicador"""
+    name = None
+    description = ""
+    terminator = b'\r'   # Fin de trama
+    start_byte = None    # Byte de inicio (para resincronizar), None si no aplica
+    sample_frame = b''   # Trama de ejemplo para el benchmark
+
+    def decode(self, frame):
+        """Decodificar una trama (bytes/bytearray/memoryview) a ScaleFrame o None"""
+        raise NotImplementedError
+
+    def encode(self, weight, motion=False, overload=False):
+        """Generar una trama completa (con terminador) como la enviaría el indicador"""
+        raise NotImplementedError
+
+
+@register_decoder
+class GenericRegexDecoder(ScaleDecoder):
+    """
+    Decodificador genérico: toma el último número de la trama, prefiriendo los que
+    van seguidos de unidad (KG, KGS, KILO, G, LB, T). Una sola expresión precompilada.
+    """
+    name = 'generic'
+    description = "Texto libre con número y unidad opcional"
+    sample_frame = b'  +  23550 KG '
+
+    _pattern = re.compile(rb'([-+]?)[ \t]*(\d+)(?:\.\d+)?[ \t]*(kgs|kg|kilos|kilo|lbs|lb|g|tn|t)?', re.IGNORECASE)
+
+    def decode(self, frame):
+        last_match = None
+        last_unit_match = None
+        for match in self._pattern.finditer(frame):
+            last_match = match
+            if match.lastindex == 3:
+                last_unit_match = match
+
+        match = last_unit_match or last_match
+        if match is None:
+            return None
+
+        weight = int(match.group(2))
+        if match.group(1) == b'-':
+            weight = -weight
+        unit = UNIT_MAPPING.get((match.group(3) or b'').lower(), 'kg')
+        return ScaleFrame(weight, unit)
+
+    def encode(self, weight, motion=False, overload=False):
+        sign = b'-' if weight < 0 else b'+'
+        return b'  %s %6d KG \r\n' % (sign, abs(weight))
+
+
+@register_decoder
+class ToledoContinuousDecoder(ScaleDecoder):
+    """
+    Salida continua estándar Mettler Toledo:
+        STX SWA SWB SWC PPPPPP TTTTTT CR [CKS]
+    SWA bits 0-2: posición del punto decimal.
+    SWB bit1: signo negativo, bit2: fuera de rango, bit3: movimiento, bit4: 1=kg / 0=lb.
+    """
+    name = 'toledo'
+    description = "Mettler Toledo continuo (STX + 3 bytes de estado + peso/tara)"
+    start_byte = b'\x02'
+    sample_frame = b'\x02*0 023550000000'
+
+    FRAME_LENGTH = 15  # SWA SWB SWC + 6 peso + 6 tara
+
+    # Código de SWA -> multiplicador (exponente) aplicado al valor entero
+    _DECIMAL_EXPONENT = {0: 2, 1: 1, 2: 0, 3: -1, 4: -2, 5: -3, 6: -4, 7: -5}
+
+    def decode(self, frame):
+        length = len(frame)
+        start = 0
+        # Saltar el checksum de la trama anterior o basura hasta el STX
+        while start < length and frame[start] != 2:
+            start += 1
+        start = start + 1 if start < length else 0
+        if length - start < self.FRAME_LENGTH:
+            return None
+
+        swa = frame[start]
+        swb = frame[start + 1]
+        parsed = _parse_digits(frame, start + 3, start + 9)
+        if parsed is None:
+            return None
+
+        value = parsed[0]
+        exponent = self._DECIMAL_EXPONENT[swa & 0x07]
+        if exponent > 0:
+            weight = value * (10 ** exponent)
+        else:
+            weight = _to_integer_weight(value, -exponent)
+
+        if swb & 0x02:
+            weight = -weight
+        return ScaleFrame(
+            weight,
+            'kg' if swb & 0x10 else 'lb',
+            motion=bool(swb & 0x08),
+            overload=bool(swb & 0x04)
+        )
+
+    def encode(self, weight, motion=False, overload=False):
+        swa = 0x20 | 0x08 | 0x02  # incremento x1, sin decimales
+        swb = 0x20 | 0x10 | (0x02 if weight < 0 else 0) | (0x04 if overload else 0) | (0x08 if motion else 0)
+        body = bytes((swa, swb, 0x20)) + b'%06d000000' % min(abs(weight), 999999)
+        checksum = (-(2 + sum(body) + 13)) & 0x7F
+        return b'\x02' + body + b'\r' + bytes((checksum,))
+
+
+@register_decoder
+class AsciiStatusDecoder(ScaleDecoder):
+    """
+    Formato ASCII con encabezados de estado, común en indicadores A&D y compatibles:
+        ST,GS,+00235.5kg   (ST=estable, US=inestable, OL=sobrecarga; GS/NT/TR)
+    """
+    name = 'ascii_st_gs'
+    description = "ASCII 'ST,GS,+0000000kg' (A&D y compatibles)"
+    sample_frame = b'ST,GS,+0023550kg'
+
+    def decode(self, frame):
+        length = len(frame)
+        if length < 9 or frame[2] != 44 or frame[5] != 44:  # ','
+            return None
+
+        status_0, status_1 = frame[0], frame[1]
+        overload = status_0 == 79 and status_1 == 76      # 'OL'
+        motion = status_0 == 85 and status_1 == 83        # 'US'
+        if overload:
+            return ScaleFrame(0, 'kg', motion=motion, overload=True)
+
+        sign_char = frame[6]
+        digits_start = 7 if sign_char in (43, 45, 32) else 6  # '+', '-', ' '
+
+        unit_start = digits_start
+        while unit_start < length and (48 <= frame[unit_start] <= 57 or frame[unit_start] in (32, 46)):
+            unit_start += 1
+
+        parsed = _parse_digits(frame, digits_start, unit_start)
+        if parsed is None:
+            return None
+
+        weight = _to_integer_weight(parsed[0], parsed[1])
+        if sign_char == 45:
+            weight = -weight
+
+        unit_end = length
+        while unit_end > unit_start and frame[unit_end - 1] == 32:
+            unit_end -= 1
+        unit = UNIT_MAPPING.get(bytes(frame[unit_start:unit_end]).lower(), 'kg') if unit_end > unit_start else 'kg'
+        return ScaleFrame(weight, unit, motion=motion)
+
+    def encode(self, weight, motion=False, overload=False):
+        status = b'OL' if overload else (b'US' if motion else b'ST')
+        sign = b'-' if weight < 0 else b'+'
+        return b'%s,GS,%s%07dkg\r\n' % (status, sign, min(abs(weight), 9999999))
+
+
+def benchmark_decoders(frames=200000):
+    """
+    Micro-benchmark: tramas por segundo que decodifica cada protocolo registrado
+    usando su trama de ejemplo.
+    """
+    results = {}
+    for name, decoder_class in DECODERS.items():
+        decoder = decoder_class()
+        frame = decoder_class.sample_frame
+        decode = decoder.decode
+        start = time.perf_counter()
+        for _ in range(frames):
+            decode(frame)
+        elapsed = time.perf_counter() - start
+        results[name] = frames / elapsed if elapsed > 0 else float('inf')
+    return results
+
+
+if __name__ == '__main__':
+    for protocol, frames_per_second in benchmark_decoders().items():
+        print(f"{protocol:<12} {frames_per_second:>12,.0f} tramas/s")
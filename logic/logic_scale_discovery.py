@@ -0,0 +1,150 @@
+# logic_scale_discovery.py
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import serial
+from serial.tools import list_ports
+from logic.logic_scale_decoders import DECODERS
+from logic.logic_scale_framing import FrameAssembler
+from logic.logic_scale_reader import SERIAL_FRAMINGS
+from utils.logger_config import app_logger
+
+logger = app_logger.getChild('ScaleDiscovery')
+
+# Velocidades más comunes en indicadores, en orden de probabilidad
+COMMON_BAUDRATES = (9600, 4800, 19200, 2400, 38400, 115200)
+
+# Tramas mínimas para considerar confiable una combinación y dejar de probar ese puerto
+CONFIDENT_FRAMES = 3
+
+
+def list_serial_ports():
+    """Puertos seriales disponibles en el equipo"""
+    return [port_info.device for port_info in list_ports.comports()]
+
+
+def _parity_of(data):
+    """'E' si la mayoría de los bytes tienen paridad par en 8 bits, 'O' si impar"""
+    even = sum(1 for byte in data if bin(byte).count('1') % 2 == 0)
+    return 'E' if even * 2 >= len(data) else 'O'
+
+
+def score_capture(data):
+    """
+    Calificar un bloque de bytes crudos contra todos los decodificadores.
+
+    Un indicador 7E1/7O1 leído como 8N1 a la misma velocidad entrega el bit de
+    paridad como bit 7, así que la misma captura se evalúa también con ese bit
+    enmascarado sin volver a abrir el puerto.
+
+    Returns:
+        dict | None: mejor combinación {'protocol', 'framing', 'frames', 'errors', 'score'}
+    """
+    interpretations = [('8N1', data)]
+    if any(byte & 0x80 for byte in data):
+        interpretations.append((f"7{_parity_of(data)}1", bytes(byte & 0x7F for byte in data)))
+
+    best = None
+    # El decodificador genérico acepta casi cualquier número: se evalúa al final para desempatar
+    names = sorted(DECODERS, key=lambda name: name == 'generic')
+    for framing, payload in interpretations:
+        for name in names:
+            decoder = DECODERS[name]()
+            counts = {'frames': 0, 'errors': 0}
+
+            def _on_frame(frame, decoder=decoder, counts=counts):
+                if decoder.decode(frame) is None:
+                    counts['errors'] += 1
+                else:
+                    counts['frames'] += 1
+
+            FrameAssembler.for_decoder(decoder).feed(payload, _on_frame)
+            frames, errors = counts['frames'], counts['errors']
+            if not frames:
+                continue
+            # Tramas válidas ponderadas por la proporción de aciertos
+            score = frames * frames / (frames + errors)
+            if best is None or score > best['score']:
+                best = {'protocol': name, 'framing': framing, 'frames': frames, 'errors': errors, 'score': score}
+    return best
+
+
+def probe_port(port, baudrates=COMMON_BAUDRATES, listen_time=0.4):
+    """
+    Probar un puerto con cada velocidad (el formato 7E1/7O1 se deduce de la misma lectura).
+    Si a la primera velocidad no llega ningún byte, el puerto está callado y se descarta:
+    a cualquier velocidad llegarían bytes (aunque fueran basura) si el indicador transmitiera.
+
+    Returns:
+        list: candidatos {'port', 'baudrate', 'framing', 'protocol', 'frames', 'errors', 'score', 'bytes'}
+    """
+    candidates = []
+    try:
+        bytesize, parity, stopbits = SERIAL_FRAMINGS['8N1']
+        conn = serial.Serial(port=port, baudrate=baudrates[0], bytesize=bytesize,
+                             parity=parity, stopbits=stopbits, timeout=0.05)
+    except (serial.SerialException, OSError, ValueError) as e:
+        logger.debug(f"Puerto {port} no disponible: {e}")
+        return candidates
+
+    try:
+        for baudrate in baudrates:
+            conn.baudrate = baudrate
+            conn.reset_input_buffer()
+
+            data = bytearray()
+            deadline = time.monotonic() + listen_time
+            while time.monotonic() < deadline:
+                data += conn.read(conn.in_waiting or 1)
+
+            if not data:
+                logger.debug(f"Puerto {port} sin datos, se descarta")
+                break
+
+            best = score_capture(bytes(data))
+            if best:
+                best.update({'port': port, 'baudrate': baudrate, 'bytes': len(data)})
+                candidates.append(best)
+                if best['frames'] >= CONFIDENT_FRAMES and not best['errors']:
+                    break
+    except (serial.SerialException, OSError) as e:
+        logger.warning(f"⚠️ Error probando el puerto {port}: {e}")
+    finally:
+        conn.close()
+    return candidates
+
+
+def discover_scales(ports=None, baudrates=COMMON_BAUDRATES, listen_time=0.4):
+    """
+    Buscar indicadores en todos los puertos en paralelo (un hilo por puerto).
+
+    Returns:
+        list: candidatos ordenados de mejor a peor; el primero es la propuesta
+    """
+    ports = list(ports) if ports is not None else list_serial_ports()
+    if not ports:
+        logger.info("🔍 No hay puertos seriales disponibles")
+        return []
+
+    start = time.monotonic()
+    logger.info(f"🔍 Buscando báscula en {len(ports)} puerto(s): {', '.join(ports)}")
+    candidates = []
+    with ThreadPoolExecutor(max_workers=min(16, len(ports)), thread_name_prefix="ScaleDiscovery") as executor:
+        for port_candidates in executor.map(lambda port: probe_port(port, baudrates, listen_time), ports):
+            candidates.extend(port_candidates)
+
+    candidates.sort(key=lambda candidate: candidate['score'], reverse=True)
+    elapsed = time.monotonic() - start
+    if candidates:
+        best = candidates[0]
+        logger.info(f"✅ Báscula detectada en {best['port']} a {best['baudrate']} baud {best['framing']}, "
+                    f"protocolo {best['protocol']} ({best['frames']} tramas) en {elapsed:.1f}s")
+    else:
+        logger.info(f"🔍 No se detectó ninguna báscula ({elapsed:.1f}s)")
+    return candidates
+
+
+if __name__ == '__main__':
+    for candidate in discover_scales(sys.argv[1:] or None):
+        print(candidate)
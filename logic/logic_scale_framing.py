@@ -0,0 +1,128 @@
+# logic_scale_framing.py
+
+from utils.logger_config import app_logger
+
+
+class FrameAssembler:
+    """
+    Ensamblador de tramas para el flujo serial del indicador.
+
+    Acumula los bytes en un bytearray acotado, localiza los terminadores con
+    find() por desplazamiento (sin dividir todo el buffer) y entrega cada trama
+    al decodificador como un memoryview del propio buffer, sin copiarla.
+
+    Si llega basura sin terminador, el buffer nunca supera max_frame_size bytes:
+    se descarta lo acumulado y, si el protocolo tiene byte de inicio, se
+    resincroniza en el último byte de inicio recibido.
+    """
+
+    STRIP_BYTES = b'\r\n\x00 '
+
+    def __init__(self, terminator=b'\r', start_byte=None, max_frame_size=256, min_frame_size=4):
+        self.logger = app_logger.getChild('FrameAssembler')
+
+        self.terminator = terminator
+        self.start_byte = start_byte
+        self.max_frame_size = max(16, int(max_frame_size))
+        self.min_frame_size = max(1, int(min_frame_size))
+
+        self.buffer = bytearray()
+        self.frames = 0
+        self.discarded_bytes = 0
+        self.oversize_frames = 0
+
+    @classmethod
+    def for_decoder(cls, decoder, max_frame_size=256):
+        """Crear un ensamblador con el terminador y byte de inicio del decodificador"""
+        return cls(
+            terminator=decoder.terminator,
+            start_byte=decoder.start_byte,
+            max_frame_size=max_frame_size
+        )
+
+    def reset(self):
+        """Vaciar el buffer (reconexión o cambio de protocolo)"""
+        self.buffer.clear()
+
+    def feed(self, data, on_frame):
+        """
+        Agregar bytes recibidos y entregar las tramas completas.
+
+        Args:
+            data: Bytes leídos del puerto
+            on_frame: Función que recibe cada trama como memoryview. La vista solo
+                      es válida durante la llamada; si se necesita conservarla,
+                      debe copiarse con bytes().
+
+        Returns:
+            int: Número de tramas entregadas
+        """
+        buffer = self.buffer
+        buffer += data
+        terminator = self.terminator
+        delivered = 0
+        position = 0
+
+        end = buffer.find(terminator)
+        if end >= 0:
+            with memoryview(buffer) as view:
+                while end >= 0:
+                    start, stop = self._frame_bounds(buffer, position, end)
+                    if stop - start >= self.min_frame_size:
+                        with view[start:stop] as frame:
+                            on_frame(frame)
+                        delivered += 1
+                    position = end + len(terminator)
+                    end = buffer.find(terminator, position)
+
+            # Las vistas ya están liberadas: se puede compactar el buffer
+            del buffer[:position]
+
+        if len(buffer) > self.max_frame_size:
+            self._resync()
+
+        self.frames += delivered
+        return delivered
+
+    def _frame_bounds(self, buffer, start, stop):
+        """Recortar relleno y, si la trama excede el máximo, resincronizar en el byte de inicio"""
+        strip = self.STRIP_BYTES
+        while start < stop and buffer[start] in strip:
+            start += 1
+        while stop > start and buffer[stop - 1] in strip:
+            stop -= 1
+
+        if stop - start > self.max_frame_size:
+            self.oversize_frames += 1
+            resync = buffer.rfind(self.start_byte, start, stop) if self.start_byte else -1
+            if resync >= 0 and stop - resync <= self.max_frame_size:
+                self.discarded_bytes += resync - start
+                start = resync
+            else:
+                self.discarded_bytes += stop - start
+                self.logger.warning(f"⚠️ Trama de {stop - start} bytes descartada (máximo {self.max_frame_size})")
+                start = stop
+        return start, stop
+
+    def _resync(self):
+        """Acotar el buffer cuando no llega terminador (basura o terminador perdido)"""
+        buffer = self.buffer
+        keep_from = len(buffer)
+        if self.start_byte:
+            resync = buffer.rfind(self.start_byte)
+            if resync >= 0 and len(buffer) - resync <= self.max_frame_size:
+                keep_from = resync
+
+        self.discarded_bytes += keep_from
+        self.logger.warning(f"⚠️ {keep_from} bytes sin terminador descartados, resincronizando")
+        del buffer[:keep_from]
+
+    def get_state(self):
+        """Estadísticas del ensamblador para debug"""
+        return {
+            'buffered_bytes': len(self.buffer),
+            'frames': self.frames,
+            'discarded_bytes': self.discarded_bytes,
+            'oversize_frames': self.oversize_frames,
+            'max_frame_size': self.max_frame_size
+        }
@@ -0,0 +1,205 @@
+# logic_scale_io_loop.py
+
+import heapq
+import itertools
+import selectors
+import socket
+import threading
+import time
+from utils.logger_config import app_logger
+
+
+class ScaleIOLoop:
+    """
+    Un solo hilo de E/S para todas las básculas.
+
+    Los puertos con descriptor de archivo (Linux/macOS) se registran en un
+    selector y solo se leen cuando el sistema avisa que hay datos; los puertos
+    sin descriptor (Windows, reproducción de capturas) o en modo 'poll' se
+    revisan con temporizadores. Agregar plataformas no agrega hilos.
+
+    La conexión inicial y las reconexiones también ocurren en este hilo, con
+    el backoff del ConnectionSupervisor de cada lector, y una revisión de
+    salud periódica reconecta los puertos que quedan abiertos pero sin datos.
+    """
+
+    HEALTH_CHECK_INTERVAL = 1  # Segundos entre revisiones de puertos silenciosos
+
+    def __init__(self):
+        self.logger = app_logger.getChild('ScaleIOLoop')
+        self.selector = selectors.DefaultSelector()
+        self.readers = {}   # reader -> 'selector' | 'poll'
+        self.thread = None
+        self.running = False
+
+        self._lock = threading.Lock()
+        self._pending = []  # Operaciones solicitadas desde otros hilos
+        self._timers = []   # heap de (vencimiento, secuencia, callback)
+        self._sequence = itertools.count()
+
+        # Par de sockets para despertar al selector desde otros hilos (funciona también en Windows)
+        self._wake_recv, self._wake_send = socket.socketpair()
+        self._wake_recv.setblocking(False)
+        self.selector.register(self._wake_recv, selectors.EVENT_READ, None)
+
+    def start(self):
+        """Iniciar el hilo del loop (idempotente)"""
+        if self.running:
+            return
+        self.running = True
+        self._schedule(self.HEALTH_CHECK_INTERVAL, self._check_health)
+        self.thread = threading.Thread(target=self._run, name="ScaleIOLoopThread")
+        self.thread.daemon = True
+        self.thread.start()
+        self.logger.info("🔄 Loop de E/S de básculas iniciado")
+
+    def stop(self):
+        self.running = False
+        self._wake()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=2)
+
+    def add_reader(self, reader):
+        """Atender un lector: se registra si ya está conectado o se conecta desde el loop"""
+        self._submit(self._start_reader, reader)
+
+    def remove_reader(self, reader):
+        """Quitar un lector; espera a que el loop lo suelte antes de regresar"""
+        self._submit(self._unregister, reader, wait=True)
+
+    def call_later(self, delay, callback):
+        """Programar una función en el hilo del loop"""
+        self._submit(self._schedule, delay, callback)
+
+    def _submit(self, operation, *args, wait=False):
+        if not self.running or threading.current_thread() is self.thread:
+            operation(*args)
+            return
+        done = threading.Event()
+        with self._lock:
+            self._pending.append((operation, args, done))
+        self._wake()
+        if wait:
+            done.wait(timeout=2)
+
+    def _wake(self):
+        try:
+            self._wake_send.send(b'\0')
+        except OSError:
+            pass
+
+    def _schedule(self, delay, callback):
+        heapq.heappush(self._timers, (time.monotonic() + delay, next(self._sequence), callback))
+
+    def _start_reader(self, reader):
+        if reader.is_connected():
+            self._register(reader)
+        else:
+            self._reconnect(reader)
+
+    def _register(self, reader):
+        if reader in self.readers:
+            return
+        try:
+            fileno = reader.serial_conn.fileno() if reader.read_mode == 'event' else None
+        except (AttributeError, OSError, ValueError):
+            fileno = None
+
+        if fileno is not None:
+            self.selector.register(fileno, selectors.EVENT_READ, reader)
+            self.readers[reader] = 'selector'
+        else:
+            self.readers[reader] = 'poll'
+            self._schedule(0, lambda: self._poll(reader))
+        self.logger.info(f"➕ Báscula en {reader.port} registrada ({self.readers[reader]})")
+
+    def _unregister(self, reader):
+        mode = self.readers.pop(reader, None)
+        if mode == 'selector':
+            try:
+                self.selector.unregister(reader.serial_conn.fileno())
+            except (KeyError, ValueError, OSError, AttributeError):
+                # El descriptor ya estaba cerrado: buscar la llave por el lector
+                for key in list(self.selector.get_map().values()):
+                    if key.data is reader:
+                        self.selector.unregister(key.fileobj)
+
+    def _poll(self, reader):
+        """Revisión periódica de un lector sin descriptor o en modo 'poll'"""
+        if reader not in self.readers:
+            return
+        self._service(reader)
+        if reader in self.readers:
+            interval = reader.poll_interval if reader.read_mode == 'poll' else reader.read_timeout
+            self._schedule(interval, lambda: self._poll(reader))
+
+    def _service(self, reader, readable=False):
+        """Leer los datos disponibles de un lector y manejar sus errores"""
+        try:
+            reader._read_ready(readable)
+        except Exception as e:
+            self._unregister(reader)
+            reader._on_io_error(e)
+            self._schedule_reconnect(reader)
+            return
+
+        if not reader.reading:
+            self._unregister(reader)
+
+    def _schedule_reconnect(self, reader):
+        if reader.reading:
+            delay = reader.supervisor.next_delay()
+            self.logger.warning(f"⏳ Reintentando conexión a {reader.port} en {delay:.1f}s")
+            self._schedule(delay, lambda: self._reconnect(reader))
+
+    def _reconnect(self, reader):
+        if not reader.reading or reader in self.readers:
+            return
+        if reader.connect():
+            self._register(reader)
+        else:
+            self._schedule_reconnect(reader)
+
+    def _check_health(self):
+        """Reconectar los puertos abiertos que dejaron de enviar datos"""
+        now = time.monotonic()
+        for reader in list(self.readers):
+            if reader.supervisor.is_silent(now):
+                self._unregister(reader)
+                reader._on_silent_port()
+                self._schedule_reconnect(reader)
+        self._schedule(self.HEALTH_CHECK_INTERVAL, self._check_health)
+
+    def _run(self):
+        while self.running:
+            timeout = None
+            if self._timers:
+                timeout = max(0.0, self._timers[0][0] - time.monotonic())
+
+            for key, _ in self.selector.select(timeout):
+                if key.data is None:
+                    try:
+                        self._wake_recv.recv(4096)
+                    except OSError:
+                        pass
+                    continue
+                self._service(key.data, readable=True)
+
+            with self._lock:
+                pending, self._pending = self._pending, []
+            for operation, args, done in pending:
+                try:
+                    operation(*args)
+                except Exception as e:
+                    self.logger.error(f"❌ Error en operación del loop de E/S: {e}")
+                done.set()
+
+            now = time.monotonic()
+            while self._timers and self._timers[0][0] <= now:
+                _, _, callback = heapq.heappop(self._timers)
+                try:
+                    callback()
+                except Exception as e:
+                    self.logger.error(f"❌ Error en temporizador del loop de E/S: {e}")
+
+        self.logger.info("⏹️ Loop de E/S de básculas detenido")
@@ -1,15 +1,98 @@
 # logic_scale_manager.py
 
+from db_operations.db_config import get_scale_config, get_scale_platforms
+from logic.logic_scale_io_loop import ScaleIOLoop
+from logic.logic_scale_process import ScaleProcessHost
 from logic.logic_scale_reader import create_scale_reader
+from logic.logic_weight_broadcast import create_broadcast_server
+from utils.logger_config import app_logger
 
 class ScaleManager:
-    def __init__(self, update_callback=None):
+    """
+    Administra una o varias plataformas (básculas) con nombre.
+    Todas las plataformas se leen desde un solo ScaleIOLoop; la pestaña de
+    pesaje recibe el peso de la plataforma seleccionada.
+
+    connect() nunca bloquea la UI: la conexión ocurre en el loop de E/S y el
+    estado se refresca periódicamente desde el hilo principal de Tk.
+
+    Con 'scale_reader_process' activo, la lectura corre en un proceso aparte
+    (ScaleProcessHost) y las plataformas son vistas de su memoria compartida.
+
+    Si 'scale_broadcast_enabled' está activo, el peso de todas las plataformas
+    se difunde además por TCP a otros consumidores locales.
+    """
+
+    STATUS_REFRESH_MS = 1000
+
+    def __init__(self, update_callback=None, stable_callback=None):
+        self.logger = app_logger.getChild('ScaleManager')
         self.update_callback = update_callback
-        self.scale_reader = None
+        self.stable_callback = stable_callback
         self.use_simulator = False
+        self.replay_path = None
         self.status_label = None
-        self.scale_reader = create_scale_reader(use_simulator=self.use_simulator, update_callback=self.update_callback)
-    
+        self.connected = False
+        self._status_after_id = None
+        self.io_loop = ScaleIOLoop()
+        scale_config = get_scale_config()
+        self.broadcast = create_broadcast_server(scale_config)
+        self.use_process = str(scale_config.get('scale_reader_process', '0')).strip().lower() in ('1', 'true', 'si', 'sí')
+        self.process_host = None
+
+        self.platform_configs = get_scale_platforms()
+        self.platforms = {}          # nombre -> lector
+        self.platform_displays = {}  # nombre -> (texto, color) del último peso mostrado
+        self.selected_platform = self.platform_configs[0]['name']
+        self._create_readers()
+
+    @property
+    def scale_reader(self):
+        """Lector de la plataforma seleccionada"""
+        return self.platforms.get(self.selected_platform)
+
+    @property
+    def platform_names(self):
+        return [config['name'] for config in self.platform_configs]
+
+    def _create_readers(self):
+        """(Re)crear los lectores de todas las plataformas"""
+        for reader in self.platforms.values():
+            reader.stop_reading()
+        self.platforms = {}
+
+        if self.use_process:
+            self.process_host = ScaleProcessHost(
+                self.platform_configs,
+                update_callback=self._on_platform_update,
+                stable_callback=self._on_stable_weight,
+                use_simulator=self.use_simulator,
+                replay_path=self.replay_path,
+                selected_platform=self.selected_platform
+            )
+            self.platforms = dict(self.process_host.readers)
+            self.logger.info(f"⚖️ Plataformas configuradas en proceso aparte: {', '.join(self.platforms)}")
+            return
+
+        for config in self.platform_configs:
+            name = config['name']
+            kwargs = {
+                'update_callback': lambda text, color, platform=name: self._on_platform_update(platform, text, color),
+                'stable_callback': lambda weight, platform=name: self._on_stable_weight(weight, platform),
+                'baudrate': config['baudrate'],
+                'protocol': config['protocol']
+            }
+            if config['port']:
+                kwargs['port'] = config['port']
+
+            # La reproducción de capturas solo sustituye a la plataforma seleccionada
+            self.platforms[name] = create_scale_reader(
+                use_simulator=self.use_simulator,
+                replay_path=self.replay_path if name == self.selected_platform else None,
+                **kwargs
+            )
+        self.logger.info(f"⚖️ Plataformas configuradas: {', '.join(self.platforms)}")
+
     def set_status_label(self, status_label, btn_scale_control):
         self.status_label = status_label
         self.btn_scale_control = btn_scale_control
@@ -17,29 +100,121 @@ class ScaleManager:
     def set_use_simulator(self, use_simulator):
         """Actualizar el estado del simulador"""
         self.use_simulator = use_simulator
-        # Si ya existe un scale_reader, detenerlo y crear uno nuevo
-        if self.scale_reader:
-            self.scale_reader.stop_reading()
-            self.scale_reader = create_scale_reader(
-                use_simulator=self.use_simulator, 
-                update_callback=self.update_callback
+        # Detener los lectores actuales y crear nuevos
+        self._create_readers()
+
+    def set_replay_path(self, replay_path):
+        """Reproducir un archivo de captura en lugar de leer el puerto (None para volver al puerto)"""
+        self.replay_path = replay_path or None
+        self._create_readers()
+
+    def select_platform(self, name):
+        """Enviar a la pestaña de pesaje el peso de otra plataforma"""
+        if name not in self.platforms or name == self.selected_platform:
+            return
+        self.logger.info(f"🔀 Plataforma seleccionada: {name}")
+        self.selected_platform = name
+        display = self.platform_displays.get(name)
+        if display and self.update_callback:
+            self.update_callback(*display)
+
+    def set_stable_callback(self, stable_callback):
+        """Registrar el callback que recibe los eventos de peso estable"""
+        self.stable_callback = stable_callback
+
+    def _on_platform_update(self, platform, text, color):
+        self.platform_displays[platform] = (text, color)
+        if self.broadcast:
+            stability = self.platforms[platform].stability if platform in self.platforms else None
+            self.broadcast.publish_weight(
+                platform, text, color,
+                is_stable=stability.is_stable if stability else False,
+                stable_weight=stability.stable_weight if stability else None
             )
+        if platform == self.selected_platform and self.update_callback:
+            self.update_callback(text, color)
+
+    def _on_stable_weight(self, weight, platform=None):
+        if self.broadcast and platform is not None:
+            self.broadcast.publish_stable(platform, weight)
+        if platform not in (None, self.selected_platform):
+            return
+        if self.stable_callback:
+            self.stable_callback(weight)
+
+    @property
+    def is_stable(self):
+        """True si la última ventana de muestras del lector es estable"""
+        return self.scale_reader.stability.is_stable
+
+    @property
+    def stable_weight(self):
+        """Último peso estable (None mientras el camión está en movimiento)"""
+        return self.scale_reader.stability.stable_weight
+
+    def get_platform_weights(self):
+        """Peso actual y estable de cada plataforma"""
+        return {name: reader.get_weight_data() for name, reader in self.platforms.items()}
 
-    
     def connect(self):
-        if self.scale_reader.start_reading():
-            self._update_status("Conectada ✓", "green", "⏹ Desconectar", "Warning.TButton")
-        else:
-            self._update_status("Error de conexión", "red",  "▶ Conectar",  "TButton" )
-    
+        """Iniciar la lectura de todas las plataformas sin esperar a que conecten"""
+        if not self.process_host:
+            self.io_loop.start()
+        for reader in self.platforms.values():
+            reader.start_reading(io_loop=self.io_loop)
+
+        self.connected = True
+        self._update_status("Conectando...", "orange", "⏹ Desconectar", "Warning.TButton")
+        self._schedule_status_refresh()
+
     def disconnect(self):
-        self.scale_reader.stop_reading()
+        self.connected = False
+        self._cancel_status_refresh()
+        for reader in self.platforms.values():
+            reader.stop_reading()
         self._update_status("Desconectada", "orange", "▶ Conectar",  "TButton" )
-    
+
+    def _schedule_status_refresh(self):
+        self._cancel_status_refresh()
+        if self.status_label:
+            self._status_after_id = self.status_label.after(self.STATUS_REFRESH_MS, self._refresh_status)
+
+    def _cancel_status_refresh(self):
+        if self._status_after_id and self.status_label:
+            self.status_label.after_cancel(self._status_after_id)
+        self._status_after_id = None
+
+    def _refresh_status(self):
+        """Actualizar la etiqueta de estado con las plataformas conectadas (hilo principal)"""
+        self._status_after_id = None
+        if not self.connected:
+            return
+
+        total = len(self.platforms)
+        connected = sum(1 for reader in self.platforms.values() if reader.is_connected())
+        if connected == total:
+            self._update_status("Conectada ✓", "green", "⏹ Desconectar", "Warning.TButton")
+        elif connected:
+            self._update_status(f"Conectadas {connected}/{total}", "orange", "⏹ Desconectar", "Warning.TButton")
+        else:
+            self._update_status("Reconectando...", "red", "⏹ Desconectar", "Warning.TButton")
+        self._schedule_status_refresh()
+
+    def get_debug_info(self):
+        """Información de debug y salud de cada plataforma"""
+        info = {
+            name: reader.get_debug_info()
+            for name, reader in self.platforms.items()
+            if hasattr(reader, 'get_debug_info')
+        }
+        if self.broadcast:
+            info['broadcast'] = self.broadcast.get_stats()
+        return info
+
     def _update_status(self, text, color,  btn_text, btn_style):
         if self.status_label:
             self.status_label.config(text=text, foreground=color)
             self.btn_scale_control.configure(text=btn_text, style=btn_style,)
 
     def get_current_weight_data(self):
-        return self.scale_reader.get_weight_data()
\ No newline at end of file
+        return self.scale_reader.get_weight_data()
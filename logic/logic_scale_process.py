@@ -0,0 +1,468 @@
+# logic_scale_process.py
+
+import math
+import multiprocessing
+import struct
+import threading
+import time
+from multiprocessing import shared_memory
+from logic.logic_scale_supervisor import ConnectionSupervisor
+from utils.logger_config import app_logger
+
+
+# Encabezado: secuencia, latido (time.monotonic del proceso lector), pid, máscara de plataformas conectadas
+HEADER_FORMAT = '<QdIxxxxQ'
+# Ranura por plataforma: secuencia, peso, peso estable (NaN = sin peso estable), estable,
+# eventos estables, actualizaciones, unidad, color, texto mostrado
+SLOT_FORMAT = '<QddBxxxII8s8s32s'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+SLOT_SIZE = struct.calcsize(SLOT_FORMAT)
+SEQ_FORMAT = '<Q'
+# Al final: solicitud de paro escrita solo por la UI (sin Event: un hijo terminado
+# a la fuerza podría dejar tomado el candado interno de multiprocessing.Event)
+CONTROL_FORMAT = '<Q'
+CONTROL_SIZE = struct.calcsize(CONTROL_FORMAT)
+
+HEARTBEAT_INTERVAL = 0.5   # Segundos entre latidos del proceso lector
+HEARTBEAT_TIMEOUT = 5      # Segundos sin latido para considerar colgado al proceso
+STARTUP_TIMEOUT = 20       # Segundos para el primer latido (el proceso nuevo importa Tk, PIL, etc.)
+POLL_INTERVAL = 0.02       # Segundos entre lecturas de la memoria compartida en la UI
+STABLE_UPTIME = 30         # Segundos de vida para dar por sano al proceso y reiniciar el backoff
+
+
+class SharedWeightState:
+    """
+    Último peso de cada plataforma en memoria compartida, protegido con un seqlock.
+
+    Cada ranura tiene un solo escritor (el hilo del lector en el proceso hijo):
+    la secuencia se vuelve impar antes de escribir y par al terminar. El lector
+    (proceso de la UI) copia la ranura sin candados y la descarta si la
+    secuencia era impar o cambió durante la copia.
+    """
+
+    READ_RETRIES = 100
+
+    def __init__(self, buf, platform_count):
+        self.buf = buf
+        self.platform_count = platform_count
+        self._sequences = {}  # Secuencia local del escritor por posición
+
+    @staticmethod
+    def size_for(platform_count):
+        return HEADER_SIZE + SLOT_SIZE * platform_count + CONTROL_SIZE
+
+    @property
+    def _control_offset(self):
+        return HEADER_SIZE + SLOT_SIZE * self.platform_count
+
+    def request_stop(self):
+        struct.pack_into(CONTROL_FORMAT, self.buf, self._control_offset, 1)
+
+    def stop_requested(self):
+        return struct.unpack_from(CONTROL_FORMAT, self.buf, self._control_offset)[0] != 0
+
+    def _write(self, offset, fmt, values):
+        seq = self._sequences.get(offset, 0) + 1
+        struct.pack_into(SEQ_FORMAT, self.buf, offset, seq)
+        struct.pack_into(fmt, self.buf, offset, seq, *values)
+        struct.pack_into(SEQ_FORMAT, self.buf, offset, seq + 1)
+        self._sequences[offset] = seq + 1
+
+    def _read(self, offset, fmt):
+        for _ in range(self.READ_RETRIES):
+            seq = struct.unpack_from(SEQ_FORMAT, self.buf, offset)[0]
+            if seq & 1:
+                continue
+            values = struct.unpack_from(fmt, self.buf, offset)
+            if struct.unpack_from(SEQ_FORMAT, self.buf, offset)[0] == seq:
+                return values
+        return None
+
+    def write_header(self, pid, connected_mask):
+        self._write(0, HEADER_FORMAT, (time.monotonic(), pid, connected_mask))
+
+    def read_header(self):
+        """{'seq', 'heartbeat', 'pid', 'connected_mask'} o None si no se pudo leer"""
+        values = self._read(0, HEADER_FORMAT)
+        if values is None:
+            return None
+        seq, heartbeat, pid, connected_mask = values
+        return {'seq': seq, 'heartbeat': heartbeat, 'pid': pid, 'connected_mask': connected_mask}
+
+    def write_slot(self, index, weight, stable_weight, is_stable, stable_events, updates, unit, color, display):
+        self._write(HEADER_SIZE + SLOT_SIZE * index, SLOT_FORMAT, (
+            float(weight),
+            float('nan') if stable_weight is None else float(stable_weight),
+            1 if is_stable else 0,
+            stable_events,
+            updates,
+            unit.encode('utf-8')[:8],
+            color.encode('utf-8')[:8],
+            display.encode('utf-8')[:32]
+        ))
+
+    def read_slot(self, index):
+        """Copia consistente de una ranura o None si el escritor no la soltó a tiempo"""
+        values = self._read(HEADER_SIZE + SLOT_SIZE * index, SLOT_FORMAT)
+        if values is None:
+            return None
+        seq, weight, stable_weight, is_stable, stable_events, updates, unit, color, display = values
+        return {
+            'seq': seq,
+            'weight': weight,
+            'stable_weight': None if math.isnan(stable_weight) else int(stable_weight),
+            'is_stable': bool(is_stable),
+            'stable_events': stable_events,
+            'updates': updates,
+            'unit': unit.rstrip(b'\0').decode('utf-8', 'ignore'),
+            'color': color.rstrip(b'\0').decode('utf-8', 'ignore'),
+            'display_text': display.rstrip(b'\0').decode('utf-8', 'ignore')
+        }
+
+
+class _SlotWriter:
+    """Callbacks de un lector dentro del proceso hijo: escriben su ranura"""
+
+    def __init__(self, state, index):
+        self.state = state
+        self.index = index
+        self.reader = None
+        self.stable_events = 0
+        self.updates = 0
+        self.display = (0.0, 'kg', 'orange', '')
+
+    def on_update(self, text, color):
+        self.updates += 1
+        parts = text.split(maxsplit=1)
+        try:
+            weight = float(parts[0]) if color == 'green' else 0.0
+        except (IndexError, ValueError):
+            weight = 0.0
+        unit = parts[1] if len(parts) > 1 and color == 'green' else ''
+        self.display = (weight, unit, color, text)
+        self._write()
+
+    def on_stable(self, weight):
+        self.stable_events += 1
+        self._write(stable_weight=weight)
+
+    def _write(self, stable_weight=None):
+        stability = getattr(self.reader, 'stability', None)
+        if stable_weight is None and stability is not None:
+            stable_weight = stability.stable_weight
+        weight, unit, color, text = self.display
+        self.state.write_slot(
+            self.index, weight or 0.0, stable_weight,
+            stability.is_stable if stability is not None else False,
+            self.stable_events, self.updates, unit, color, text
+        )
+
+
+def _reader_process_main(shm_name, platform_configs, use_simulator, replay_path, selected_platform):
+    """Punto de entrada del proceso lector: todas las plataformas en un ScaleIOLoop propio"""
+    from logic.logic_scale_io_loop import ScaleIOLoop
+    from logic.logic_scale_reader import create_scale_reader
+
+    logger = app_logger.getChild('ScaleReaderProcess')
+    shm = shared_memory.SharedMemory(name=shm_name)
+    state = SharedWeightState(shm.buf, len(platform_configs))
+    io_loop = ScaleIOLoop()
+    io_loop.start()
+    readers = []
+    try:
+        for index, config in enumerate(platform_configs):
+            writer = _SlotWriter(state, index)
+            kwargs = {
+                'update_callback': writer.on_update,
+                'stable_callback': writer.on_stable,
+                'baudrate': config['baudrate'],
+                'protocol': config['protocol']
+            }
+            if config['port']:
+                kwargs['port'] = config['port']
+            writer.reader = create_scale_reader(
+                use_simulator=use_simulator,
+                replay_path=replay_path if config['name'] == selected_platform else None,
+                **kwargs
+            )
+            readers.append(writer.reader)
+            writer.reader.start_reading(io_loop=io_loop)
+
+        logger.info(f"🧩 Proceso lector iniciado con {len(readers)} plataforma(s)")
+        parent = multiprocessing.parent_process()
+        pid = multiprocessing.current_process().pid
+        while not state.stop_requested():
+            time.sleep(HEARTBEAT_INTERVAL)
+            if parent is not None and not parent.is_alive():
+                logger.warning("⚠️ El proceso de la UI terminó; deteniendo el proceso lector")
+                break
+            connected_mask = 0
+            for index, reader in enumerate(readers):
+                if reader.is_connected():
+                    connected_mask |= 1 << index
+            state.write_header(pid, connected_mask)
+    finally:
+        for reader in readers:
+            try:
+                reader.stop_reading()
+            except Exception as e:
+                logger.error(f"❌ Error deteniendo lector: {e}")
+        io_loop.stop()
+        state.buf = None
+        shm.close()
+        logger.info("⏹️ Proceso lector detenido")
+
+
+class RemoteStability:
+    """Vista de solo lectura de la estabilidad de una plataforma del proceso lector"""
+
+    def __init__(self, reader):
+        self._reader = reader
+
+    @property
+    def is_stable(self):
+        return self._reader.snapshot().get('is_stable', False)
+
+    @property
+    def stable_weight(self):
+        return self._reader.snapshot().get('stable_weight')
+
+
+class RemoteScaleReader:
+    """Sustituto de ScaleReader en la UI: lee su ranura de la memoria compartida"""
+
+    def __init__(self, host, index, name):
+        self.host = host
+        self.index = index
+        self.name = name
+        self.stability = RemoteStability(self)
+
+    @property
+    def reading(self):
+        return self.host.running
+
+    def snapshot(self):
+        return self.host.read_platform(self.index) or {}
+
+    def start_reading(self, io_loop=None):
+        # El proceso lector tiene su propio loop de E/S
+        return self.host.start()
+
+    def stop_reading(self):
+        self.host.stop()
+
+    def is_connected(self):
+        return self.host.is_platform_connected(self.index)
+
+    def get_current_weight(self):
+        return self.snapshot().get('display_text', '')
+
+    def get_weight_data(self):
+        snapshot = self.snapshot()
+        return {
+            'weight': snapshot.get('weight', 0),
+            'unit': snapshot.get('unit', 'kg'),
+            'display_text': snapshot.get('display_text', ''),
+            'is_stable': snapshot.get('is_stable', False),
+            'stable_weight': snapshot.get('stable_weight')
+        }
+
+    def get_debug_info(self):
+        info = self.get_weight_data()
+        info.update({
+            'connected': self.is_connected(),
+            'updates': self.snapshot().get('updates', 0),
+            'process': self.host.get_stats()
+        })
+        return info
+
+
+class ScaleProcessHost:
+    """
+    Ejecuta la lectura de todas las plataformas en un proceso aparte.
+
+    El proceso hijo no comparte el GIL con Tk, el video ni las llamadas a
+    Odoo; publica el último peso de cada plataforma en memoria compartida. Un
+    hilo ligero de este proceso lee las ranuras sin candados, entrega los
+    cambios a los callbacks y supervisa al hijo: si muere o deja de latir se
+    termina y se reinicia con backoff, sin afectar a la UI.
+    """
+
+    def __init__(self, platform_configs, update_callback=None, stable_callback=None,
+                 use_simulator=False, replay_path=None, selected_platform=None):
+        self.logger = app_logger.getChild('ScaleProcessHost')
+        self.platform_configs = [dict(config) for config in platform_configs]
+        self.update_callback = update_callback
+        self.stable_callback = stable_callback
+        self.use_simulator = use_simulator
+        self.replay_path = replay_path
+        self.selected_platform = selected_platform
+
+        # spawn en todos los sistemas: igual que en Windows y sin heredar el estado de Tk
+        self.context = multiprocessing.get_context('spawn')
+        self.supervisor = ConnectionSupervisor(base_delay=1, max_delay=30, silent_timeout=0)
+        self.readers = {
+            config['name']: RemoteScaleReader(self, index, config['name'])
+            for index, config in enumerate(self.platform_configs)
+        }
+
+        self.shm = None
+        self.state = None
+        self.process = None
+        self.monitor_thread = None
+        self.running = False
+        self.restarts = 0
+        self.started_at = None
+        self._lock = threading.Lock()
+        self._seen = {}  # posición -> (secuencia, eventos estables) ya entregados
+
+    def start(self):
+        """Crear la memoria compartida, lanzar el proceso lector y su supervisión (idempotente)"""
+        with self._lock:
+            if self.running:
+                return True
+            size = SharedWeightState.size_for(len(self.platform_configs))
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.state = SharedWeightState(self.shm.buf, len(self.platform_configs))
+            self.running = True
+            self._spawn()
+            self.monitor_thread = threading.Thread(target=self._monitor, name="ScaleProcessMonitor")
+            self.monitor_thread.daemon = True
+            self.monitor_thread.start()
+        return True
+
+    def stop(self):
+        with self._lock:
+            if not self.running:
+                return
+            self.running = False
+        if self.monitor_thread and self.monitor_thread is not threading.current_thread():
+            self.monitor_thread.join(timeout=2)
+        self._terminate()
+        self.state = None
+        if self.shm:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+        for config in self.platform_configs:
+            self._notify_update(config['name'], "0 desc", "red")
+        self.logger.info("⏹️ Proceso lector de básculas detenido")
+
+    def _spawn(self):
+        # Ranuras en cero: el proceso nuevo numera sus secuencias desde el inicio
+        size = SharedWeightState.size_for(len(self.platform_configs))
+        self.shm.buf[:size] = bytes(size)
+        self._seen = {}
+        self.process = self.context.Process(
+            target=_reader_process_main,
+            args=(self.shm.name, self.platform_configs, self.use_simulator,
+                  self.replay_path, self.selected_platform),
+            name="ScaleReaderProcess",
+            daemon=True
+        )
+        self.process.start()
+        self.started_at = time.monotonic()
+        self.supervisor.on_connected()
+        self.logger.info(f"🧩 Proceso lector de básculas iniciado (pid {self.process.pid})")
+
+    def _terminate(self):
+        process = self.process
+        if process is None:
+            return
+        if process.is_alive() and self.state:
+            self.state.request_stop()
+        process.join(timeout=2)
+        if process.is_alive():
+            self.logger.warning(f"⚠️ El proceso lector {process.pid} no respondió; se termina")
+            process.terminate()
+            process.join(timeout=1)
+        self.process = None
+        self.supervisor.on_disconnected()
+
+    def _monitor(self):
+        """Hilo de la UI: entrega los cambios de las ranuras y reinicia al proceso si falla"""
+        restart_at = None
+        while self.running:
+            time.sleep(POLL_INTERVAL)
+            if restart_at is not None:
+                if time.monotonic() >= restart_at and self.running:
+                    restart_at = None
+                    self.restarts += 1
+                    self._spawn()
+                continue
+
+            self._deliver_changes()
+
+            failure = self._process_failure()
+            if failure:
+                self.logger.error(f"❌ Proceso lector de básculas: {failure}")
+                self._terminate()
+                for config in self.platform_configs:
+                    self._notify_update(config['name'], "0 Err Proc", "red")
+                delay = self.supervisor.next_delay()
+                self.logger.warning(f"⏳ Reiniciando el proceso lector en {delay:.1f}s")
+                restart_at = time.monotonic() + delay
+            elif self.supervisor.attempts and time.monotonic() - self.started_at > STABLE_UPTIME:
+                self.supervisor.attempts = 0
+
+    def _process_failure(self):
+        """Motivo de falla del proceso hijo o None si está sano"""
+        if self.process is None:
+            return None
+        if not self.process.is_alive():
+            return f"terminó inesperadamente (código {self.process.exitcode})"
+        header = self.state.read_header() if self.state else None
+        beating = bool(header and header['seq'] and header['pid'] == self.process.pid)
+        # Mientras no llegue el primer latido se cuenta desde el arranque
+        last_beat = header['heartbeat'] if beating else self.started_at
+        elapsed = time.monotonic() - last_beat
+        if elapsed > (HEARTBEAT_TIMEOUT if beating else STARTUP_TIMEOUT):
+            return f"sin latido durante {elapsed:.0f}s"
+        return None
+
+    def _deliver_changes(self):
+        state = self.state
+        if state is None:
+            return
+        for index, config in enumerate(self.platform_configs):
+            slot = state.read_slot(index)
+            if slot is None or not slot['seq']:
+                continue
+            seen_seq, seen_stable = self._seen.get(index, (0, 0))
+            if slot['seq'] == seen_seq:
+                continue
+            self._seen[index] = (slot['seq'], slot['stable_events'])
+            self._notify_update(config['name'], slot['display_text'], slot['color'])
+            if slot['stable_events'] != seen_stable and slot['stable_weight'] is not None:
+                if self.stable_callback:
+                    self.stable_callback(slot['stable_weight'], config['name'])
+
+    def _notify_update(self, platform, text, color):
+        if self.update_callback:
+            self.update_callback(platform, text, color)
+
+    def read_platform(self, index):
+        state = self.state
+        try:
+            return state.read_slot(index) if state else None
+        except ValueError:
+            return None  # La memoria se liberó durante stop()
+
+    def is_platform_connected(self, index):
+        state = self.state
+        if state is None or self.process is None:
+            return False
+        try:
+            header = state.read_header()
+        except ValueError:
+            return False
+        return bool(header and header['connected_mask'] & (1 << index))
+
+    def get_stats(self):
+        return {
+            'pid': self.process.pid if self.process else None,
+            'running': self.running,
+            'restarts': self.restarts,
+            'uptime_s': round(time.monotonic() - self.started_at, 1) if self.process else 0.0,
+            'retry_attempts': self.supervisor.attempts
+        }
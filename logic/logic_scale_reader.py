@@ -3,41 +3,110 @@
 import serial
 import threading
 import time
-import re
 from datetime import datetime
-from db_operations.db_config import get_company_config
+from db_operations.db_config import get_company_config, get_scale_config
+from logic.logic_scale_capture import CaptureReplaySource, CaptureWriter
+from logic.logic_scale_decoders import get_decoder
+from logic.logic_scale_framing import FrameAssembler
+from logic.logic_scale_stability import StabilityDetector
+from logic.logic_scale_supervisor import ConnectionSupervisor
 from utils.logger_config import app_logger, scale_logger
 
+# Formatos de carácter soportados: nombre -> (bits de datos, paridad, bits de paro)
+SERIAL_FRAMINGS = {
+    '8N1': (serial.EIGHTBITS, serial.PARITY_NONE, serial.STOPBITS_ONE),
+    '7E1': (serial.SEVENBITS, serial.PARITY_EVEN, serial.STOPBITS_ONE),
+    '7O1': (serial.SEVENBITS, serial.PARITY_ODD, serial.STOPBITS_ONE),
+}
+
 class ScaleReader:
-    def __init__(self, port='COM4', baudrate=9600, update_callback=None):       
+    def __init__(self, port=None, baudrate=None, update_callback=None, stable_callback=None, protocol=None):       
         self.logger = app_logger.getChild('ScaleReader')
         #self.scale_logger = scale_logger
-        COMPANY_DATA = get_company_config()
-        company_port = COMPANY_DATA.get('company_port_scale')
 
-        if company_port:
-            port = company_port 
+        # Un puerto explícito (p. ej. un indicador virtual) tiene prioridad sobre el de la empresa
+        if not port:
+            COMPANY_DATA = get_company_config()
+            port = COMPANY_DATA.get('company_port_scale') or 'COM4'
 
-        self.logger.info(f"🚀 Inicializando ScaleReader en puerto: {port}, baudrate: {baudrate}")
+        self.logger.info(f"🚀 Inicializando ScaleReader en puerto: {port}, baudrate: {baudrate or 'configurado'}")
         
         self.port = port
         self.baudrate = baudrate
         self.update_callback = update_callback
+        self.stable_callback = stable_callback
         self.serial_conn = None
         self.reading = False
         self.current_weight = "0"
         self.current_unit = "kg"
         self.thread = None
+        self.io_loop = None
+        self._stop_event = threading.Event()
         self.last_raw_data = ""
         self.bytes_received = 0
         self.read_attempts = 0
         self.consecutive_errors = 0
         self.max_consecutive_errors = 3
+        self.capture = None
+        self._load_read_settings(protocol)
+
+    def _load_read_settings(self, protocol=None):
+        """Cargar estrategia de lectura (event/poll), intervalos y protocolo desde app_settings"""
+        scale_config = get_scale_config()
+
+        self.read_mode = scale_config.get('scale_read_mode', 'event').strip().lower()
+        if self.read_mode not in ('event', 'poll'):
+            self.logger.warning(f"⚠️ Modo de lectura desconocido '{self.read_mode}', usando 'event'")
+            self.read_mode = 'event'
+
+        # Baudrate explícito (plataforma) o el de la configuración; formato 8N1/7E1/7O1
+        if not self.baudrate:
+            try:
+                self.baudrate = int(scale_config.get('scale_baudrate', 9600))
+            except (TypeError, ValueError):
+                self.baudrate = 9600
+        self.framing = str(scale_config.get('scale_framing', '8N1')).strip().upper()
+        if self.framing not in SERIAL_FRAMINGS:
+            self.logger.warning(f"⚠️ Formato serial desconocido '{self.framing}', usando 8N1")
+            self.framing = '8N1'
+
+        self.read_timeout = self._parse_seconds(scale_config.get('scale_read_timeout'), 0.05)
+        self.poll_interval = self._parse_seconds(scale_config.get('scale_poll_interval'), 3)
+        self.stability = StabilityDetector.from_settings(scale_config, stable_callback=self._on_stable_weight)
+        self.decoder = get_decoder(protocol or scale_config.get('scale_protocol'))
+        try:
+            max_frame_size = int(scale_config.get('scale_max_frame_bytes', 256))
+        except (TypeError, ValueError):
+            max_frame_size = 256
+        self.assembler = FrameAssembler.for_decoder(self.decoder, max_frame_size=max_frame_size)
+        self.capture_path = (scale_config.get('scale_capture_path') or '').strip()
+        self.supervisor = ConnectionSupervisor.from_settings(scale_config)
+
+        self.logger.info(f"⚙️ Modo de lectura: {self.read_mode}, timeout: {self.read_timeout}s, intervalo poll: {self.poll_interval}s")
+        self.logger.info(f"🧩 Protocolo del indicador: {self.decoder.name} ({self.decoder.description})")
+
+    def _parse_seconds(self, value, default):
+        """Convertir un setting de segundos a float positivo"""
+        try:
+            seconds = float(value)
+            return seconds if seconds > 0 else default
+        except (TypeError, ValueError):
+            return default
         
+    def _on_stable_weight(self, weight):
+        """Reenviar el evento de peso estable al callback registrado"""
+        self.logger.info(f"⚖️ Peso estable detectado: {weight} kg")
+        if self.stable_callback:
+            try:
+                self.stable_callback(weight)
+            except Exception as callback_error:
+                self.logger.error(f"Error en callback de peso estable: {callback_error}")
+
     def _update_display_with_error(self, error_message, error_type="error"):
         """Actualizar la pantalla con mensaje de error"""
         display_text = f"0 {error_type}"
         color = "red"
+        self.stability.reset()
         
         self.logger.warning(f"Mostrando error en display: {error_message}")
         
@@ -47,6 +116,21 @@ class ScaleReader:
             except Exception as callback_error:
                 self.logger.error(f"Error en callback de actualización: {callback_error}")
     
+    def _update_display_with_status(self, status_message, color="orange"):
+        """
+        Avisar de un estado del puerto sin inventar un peso: se vuelve a mostrar
+        el último peso recibido en otro color (la pestaña de pesaje lo toma como
+        el mismo peso y no limpia el formulario).
+        """
+        display_text = f"{self.current_weight} {self.current_unit}"
+        self.logger.warning(f"Mostrando estado en display: {status_message} ({display_text})")
+
+        if self.update_callback:
+            try:
+                self.update_callback(display_text, color)
+            except Exception as callback_error:
+                self.logger.error(f"Error en callback de actualización: {callback_error}")
+
     def _update_display_with_weight(self, weight, unit="kg"):
         """Actualizar la pantalla con peso válido"""
         display_text = f"{weight} {unit}"
@@ -61,27 +145,26 @@ class ScaleReader:
                 self.logger.error(f"Error en callback de actualización: {callback_error}")
     
     def connect(self):
-        """Establecer conexión con la báscula"""
+        """Establecer conexión con la báscula (sin esperas: el puerto queda listo al abrirse)"""
         self.logger.info(f"🔧 Intentando conectar a {self.port} con baudrate {self.baudrate}")
         
         try:
+            bytesize, parity, stopbits = SERIAL_FRAMINGS[self.framing]
             self.serial_conn = serial.Serial(
                 port=self.port,
                 baudrate=self.baudrate,
-                bytesize=serial.EIGHTBITS,
-                parity=serial.PARITY_NONE,
-                stopbits=serial.STOPBITS_ONE,
-                timeout=1,
+                bytesize=bytesize,
+                parity=parity,
+                stopbits=stopbits,
+                timeout=self.read_timeout if self.read_mode == 'event' else 1,
                 write_timeout=1
             )
             
-            # Esperar a que la conexión se estabilice
-            time.sleep(2)
-            
             if self.serial_conn.is_open:
                 self.logger.info(f"✅ Conectado a báscula en {self.port}")
-                self.logger.info(f"📊 Configuración: {self.baudrate} baud, 8N1")
+                self.logger.info(f"📊 Configuración: {self.baudrate} baud, {self.framing}")
                 self.consecutive_errors = 0  # Resetear contador de errores
+                self.supervisor.on_connected()
                 return True
             else:
                 error_msg = f"❌ Puerto {self.port} no se pudo abrir"
@@ -100,18 +183,24 @@ class ScaleReader:
             self._update_display_with_error("Err Con")
             return False
     
-    def start_reading(self):
-        """Iniciar la lectura continua de peso"""
+    def start_reading(self, io_loop=None):
+        """
+        Iniciar la lectura continua de peso sin bloquear: la conexión y los
+        reintentos (con backoff) los hace el loop compartido (io_loop) o el
+        hilo propio del lector, nunca el hilo que llama.
+        """
         self.logger.info("🔃 Iniciando lectura de báscula")
         
-        if not self.serial_conn or not self.serial_conn.is_open:
-            self.logger.warning("🔄 Conexión no establecida, intentando reconectar...")
-            if not self.connect():
-                self.logger.error("❌ No se pudo conectar a la báscula")
-                self._update_display_with_error("No Conect")
-                return False
-        
+        self._open_capture()
+        self._stop_event.clear()
         self.reading = True
+        if io_loop:
+            self.io_loop = io_loop
+            self.assembler.reset()
+            io_loop.add_reader(self)
+            self.logger.info("✅ Lectura de báscula iniciada (loop compartido)")
+            return True
+
         self.thread = threading.Thread(target=self._read_loop, name="ScaleReaderThread")
         self.thread.daemon = True
         self.thread.start()
@@ -123,145 +212,219 @@ class ScaleReader:
         display_text = "0 desc"
         self.logger.info("⏹️ Deteniendo lectura de báscula...")
         self.reading = False
+        self._stop_event.set()
+        if self.io_loop:
+            self.io_loop.remove_reader(self)
+            self.io_loop = None
         if self.thread:
             self.thread.join(timeout=2)
         if self.serial_conn and self.serial_conn.is_open:
             self.serial_conn.close()
-            self.update_callback(display_text, "red")
+            if self.update_callback:
+                self.update_callback(display_text, "red")
             self.logger.info("✅ Conexión serial cerrada")
+        self.supervisor.on_disconnected()
+        if self.capture:
+            self.capture.close()
+            self.capture = None
         self.logger.info("✅ Lectura de báscula detenida")
+
+    def _open_capture(self):
+        """Abrir el archivo de captura de bytes crudos si está configurado"""
+        if not self.capture_path or self.capture:
+            return
+        try:
+            self.capture = CaptureWriter(self.capture_path)
+        except OSError as e:
+            self.logger.error(f"❌ No se pudo abrir el archivo de captura '{self.capture_path}': {e}")
+            self.capture = None
     
     def _read_loop(self):
-        """Loop principal de lectura - VERSIÓN MEJORADA"""
+        """Loop principal de lectura (modo hilo propio) con reconexión supervisada"""
         self.logger.info(f"🔄 Iniciando loop de lectura en puerto {self.port}")
-        buffer = ""  # Buffer para datos incompletos
+        self.assembler.reset()
         
         while self.reading:
             try:
-                if not self.serial_conn or not self.serial_conn.is_open:
-                    self.logger.warning("⚠️ Conexión perdida, intentando reconectar...")
+                if not self.is_connected():
+                    self.assembler.reset()
                     if not self.connect():
-                        self._update_display_with_error("No Conect")
-                        time.sleep(2)
+                        delay = self.supervisor.next_delay()
+                        self.logger.warning(f"⏳ Reintentando conexión a {self.port} en {delay:.1f}s")
+                        self._stop_event.wait(delay)
                         continue
                 
-                # Leer todos los datos disponibles
-                if self.serial_conn.in_waiting > 0:
-                    raw_data = self.serial_conn.read(self.serial_conn.in_waiting)
-                    self.bytes_received += len(raw_data)
-                    self.read_attempts += 1
-                    
-                    try:
-                        # Decodificar y agregar al buffer
-                        new_data = raw_data.decode('utf-8', errors='ignore')
-                        buffer += new_data
-                        
-                        # Procesar líneas completas (separadas por \r o \n)
-                        lines = buffer.split('\r')
-                        if len(lines) > 1:
-                            # Mantener última línea incompleta en buffer
-                            buffer = lines[-1]
-                            
-                            # Procesar líneas completas
-                            for line in lines[:-1]:
-                                line = line.replace('\n', '').strip()
-                                if line and len(line) > 3:  # Ignorar líneas muy cortas
-                                    self._process_scale_data(line)
-                        
-                        self.logger.debug(f"📥 Buffer actual: '{buffer}' - Bytes recibidos: {self.bytes_received}")
-                        
-                    except UnicodeDecodeError as ude:
-                        self.logger.warning(f"📥 Datos binarios recibidos: {raw_data.hex()}")
-                        self._update_display_with_error("Err Dat")
+                # Leer los datos disponibles según la estrategia configurada
+                raw_data = self._read_available()
+                if raw_data:
+                    self._handle_raw_data(raw_data)
+                elif self.supervisor.is_silent():
+                    self._on_silent_port()
+                    self._stop_event.wait(self.supervisor.next_delay())
+                    continue
                 
-                time.sleep(3)  # Reducir frecuencia de lectura
+                if self.read_mode == 'poll':
+                    self._stop_event.wait(self.poll_interval)
                     
+            except serial.SerialException as e:
+                # El puerto desapareció (cable, adaptador USB): cerrar para reconectar
+                self._on_io_error(e)
+                self._stop_event.wait(self.supervisor.next_delay())
+
             except Exception as e:
                 error_msg = f"❌ Error en loop de lectura: {e}"
                 self.logger.error(error_msg)
                 self.consecutive_errors += 1
+                self.supervisor.on_error()
                 
                 if self.consecutive_errors >= self.max_consecutive_errors:
                     self.logger.error("🔴 Múltiples errores consecutivos, mostrando error en display")
                     self._update_display_with_error("Err Sis")
                 
-                time.sleep(1)
+                self._stop_event.wait(1)
+
+    def is_connected(self):
+        return bool(self.serial_conn and self.serial_conn.is_open)
+
+    def _handle_raw_data(self, raw_data):
+        """Contabilizar, grabar y entregar al ensamblador los bytes recibidos"""
+        self.bytes_received += len(raw_data)
+        self.read_attempts += 1
+        self.supervisor.on_bytes(len(raw_data))
+        if self.capture:
+            self.capture.write(raw_data)
+        
+        # Entregar las tramas completas al decodificador (sin copiar)
+        self.assembler.feed(raw_data, self._process_scale_data)
+
+    def _read_ready(self, readable=False):
+        """
+        Leer sin bloquear lo que ya está en espera (lo llama ScaleIOLoop cuando
+        el puerto tiene datos o en cada revisión periódica). Nunca espera en
+        read(): el hilo del loop es compartido por todas las básculas.
+
+        Args:
+            readable: True si el selector reportó el descriptor listo para leer
+        """
+        # Sin descriptor (Windows) la desconexión llega como excepción de in_waiting
+        pending = self.serial_conn.in_waiting
+        if pending:
+            self._handle_raw_data(self.serial_conn.read(pending))
+        elif readable:
+            # Listo para leer sin datos en espera: read() regresa de inmediato y
+            # detecta la desconexión (fin de archivo)
+            raw_data = self.serial_conn.read(1)
+            if raw_data:
+                self._handle_raw_data(raw_data)
+        return pending
+
+    def _on_io_error(self, error):
+        """Error de puerto (desconexión): cerrar para que el supervisor reconecte"""
+        self.logger.error(f"❌ Error de puerto en {self.port}: {error}")
+        self.consecutive_errors += 1
+        self.supervisor.on_error()
+        self.supervisor.on_disconnected()
+        self._close_port()
+        self._update_display_with_error("Err COM")
+
+    def _on_silent_port(self):
+        """
+        Puerto abierto pero sin datos (solo con scale_silent_timeout > 0): se
+        cierra y se reconecta, conservando en pantalla el último peso.
+        """
+        self.logger.warning(f"🔇 Sin datos de la báscula en {self.port} por más de {self.supervisor.silent_timeout}s, reconectando")
+        self.supervisor.on_silent()
+        self._close_port()
+        self._update_display_with_status("Sin Dat")
+
+    def _close_port(self):
+        self.assembler.reset()
+        try:
+            self.serial_conn.close()
+        except Exception:
+            pass
+
+    def _read_available(self):
+        """
+        Leer bytes del puerto.
+        En modo 'event' bloquea en read() hasta recibir un byte o vencer el timeout
+        (sin espera activa) y después vacía lo que quede en el buffer del driver.
+        En modo 'poll' solo lee lo que ya está en espera.
+        """
+        if self.read_mode == 'event':
+            raw_data = self.serial_conn.read(1)
+            if raw_data:
+                pending = self.serial_conn.in_waiting
+                if pending:
+                    raw_data += self.serial_conn.read(pending)
+            return raw_data
+
+        pending = self.serial_conn.in_waiting
+        if pending > 0:
+            return self.serial_conn.read(pending)
+        return b''
 
     def _process_scale_data(self, data):
-        """Procesar datos recibidos de la báscula - VERSIÓN MEJORADA CON DETECCIÓN DE NEGATIVOS"""
+        """
+        Procesar una trama recibida de la báscula con el decodificador del protocolo configurado.
+        'data' es un memoryview del buffer del ensamblador: solo es válido durante la llamada.
+        """
         timestamp = datetime.now().strftime("%H:%M:%S")
-        self.last_raw_data = data
+        frame = self.decoder.decode(data)
+        self.last_raw_data = str(data, 'ascii', errors='replace')
+        if frame is not None:
+            self.supervisor.on_frame()
         
-        #self.logger.debug(f"[{timestamp}] 📟 Datos crudos: '{data}'")
+        if frame is None:
+            # No se pudo extraer un peso válido
+            self.supervisor.on_error()
+            self.logger.warning(f"❌ No se pudo extraer peso válido de: '{self.last_raw_data}'")
+            self._update_display_with_error("Err For")
+            return
         
-        # LIMPIEZA DE DATOS - más agresiva
-        # Remover espacios extra y caracteres no deseados
-        cleaned_data = re.sub(r'\s+', ' ', data.strip())  # Normalizar espacios
-        cleaned_data = re.sub(r'[^a-zA-Z0-9\s\-+]', '', cleaned_data)  # Permitir signos negativo/positivo
+        # 🔴 SOBRECARGA REPORTADA POR EL INDICADOR
+        if frame.overload:
+            self.logger.error("🚫 Indicador fuera de rango (sobrecarga)")
+            self._update_display_with_error("Err OL", "red")
+            self.consecutive_errors += 1
+            return
         
-        self.logger.debug(f"[{timestamp}] 🧹 Datos limpios: '{cleaned_data}'")
+        weight_int = frame.weight
         
-        # Buscar el patrón de peso más reciente (último número en los datos)
-        weight_patterns = [
-            r'([-+]?\d+)\s*KG',           # 65 KG o -65 KG
-            r'([-+]?\d+)\s*KGS',          # 65 KGS o -65 KGS  
-            r'([-+]?\d+)\s*KILO',         # 65 KILO o -65 KILO
-            r'([-+]?\d+)\s*G',            # 65 G (asumimos kg) o -65 G
-            r'\b([-+]?\d+)\b',            # Solo número con posible signo
-        ]
+        # 🔴 DETECCIÓN DE PESO NEGATIVO
+        if weight_int < 0:
+            error_msg = f"🚫 Peso negativo detectado: {weight_int} kg"
+            self.logger.error(error_msg)
+            self._update_display_with_error("Err Neg", "red")
+            self.consecutive_errors += 1
+            return
         
-        for pattern in weight_patterns:
-            matches = re.findall(pattern, cleaned_data, re.IGNORECASE)
-            if matches:
-                # Tomar el ÚLTIMO peso encontrado (más reciente)
-                last_weight = matches[-1]
-                try:
-                    weight_int = int(last_weight)
-                    
-                    # 🔴 DETECCIÓN DE PESO NEGATIVO
-                    if weight_int < 0:
-                        error_msg = f"🚫 Peso negativo detectado: {weight_int} kg"
-                        self.logger.error(error_msg)
-                        self._update_display_with_error("Err Neg", "red")
-                        self.consecutive_errors += 1
-                        return
-                    
-                    # ✅ PESO VÁLIDO (positivo o cero)
-                    self.consecutive_errors = 0  # Resetear contador de errores
-                    
-                    # FILTRO: Redondear a múltiplo de 5
-                    weight_rounded = self._round_to_5_kg(weight_int)
-                    
-                    # FILTRO: Evitar fluctuaciones rápidas
-                    current_display_weight = int(self.current_weight) if self.current_weight.isdigit() else 0
-                    weight_diff = abs(weight_rounded - current_display_weight)
-                    
-                    # Solo actualizar si hay cambio significativo (más de 5kg diferencia)
-                    if weight_diff >= 5:
-                        weight_rounded_str = str(weight_rounded)
-                        
-                        # Actualizar estado
-                        self.current_weight = weight_rounded_str
-                        self.current_unit = "kg"
-                        
-                        # Llamar al callback
-                        self.logger.info(f"[{timestamp}] ✅ Peso estable: {weight_rounded_str} kg")
-                        self._update_display_with_weight(weight_rounded_str, "kg")
-                    else:
-                        self.logger.debug(f"🔍 Cambio pequeño ignorado: {weight_rounded} kg (diff: {weight_diff})")
-                        
-                    return
-                    
-                except ValueError as ve:
-                    error_msg = f"❌ Error convirtiendo peso '{last_weight}': {ve}"
-                    self.logger.error(error_msg)
-                    self._update_display_with_error("Err Val")
-                    continue
+        # ✅ PESO VÁLIDO (positivo o cero)
+        self.consecutive_errors = 0  # Resetear contador de errores
+
+        # Alimentar el detector de estabilidad con el peso sin filtrar
+        self.stability.add_sample(weight_int, motion=frame.motion)
+        
+        # FILTRO: Redondear a múltiplo de 5
+        weight_rounded = self._round_to_5_kg(weight_int)
         
-        # Si llegamos aquí, no se pudo extraer un peso válido
-        error_msg = f"❌ No se pudo extraer peso válido de: '{data}'"
-        self.logger.warning(error_msg)
-        self._update_display_with_error("Err For")
+        # FILTRO: Evitar fluctuaciones rápidas
+        current_display_weight = int(self.current_weight) if self.current_weight.isdigit() else 0
+        weight_diff = abs(weight_rounded - current_display_weight)
+        
+        # Solo actualizar si hay cambio significativo (más de 5kg diferencia)
+        if weight_diff >= 5:
+            weight_rounded_str = str(weight_rounded)
+            
+            # Actualizar estado
+            self.current_weight = weight_rounded_str
+            self.current_unit = frame.unit
+            
+            # Llamar al callback
+            self.logger.info(f"[{timestamp}] ✅ Peso estable: {weight_rounded_str} {frame.unit}")
+            self._update_display_with_weight(weight_rounded_str, frame.unit)
+        else:
+            self.logger.debug(f"🔍 Cambio pequeño ignorado: {weight_rounded} kg (diff: {weight_diff})")
 
     def _round_to_5_kg(self, weight):
         """Redondea un peso al múltiplo de 5 kg más cercano - VERSIÓN MEJORADA"""
@@ -275,58 +438,6 @@ class ScaleReader:
         # Para pesos mayores, redondear a múltiplo de 5
         return int(round(weight / 5.0) * 5.0)
     
-    def _parse_weight_data(self, data):
-        """Parsear datos de peso con múltiples patrones"""
-        self.logger.debug(f"🔍 Analizando datos: '{data}'")
-        
-        try:
-            # Patrón 1: Número con unidades ej: "150 kg"
-            pattern1 = r'([-+]?\d+)\s*([a-zA-Z]*)'
-            match1 = re.search(pattern1, data)
-            if match1:
-                weight_int = int(match1.group(1))
-                unit = match1.group(2).strip().lower() if match1.group(2) else "kg"
-                normalized_unit = self._normalize_unit(unit)
-                self.logger.debug(f"✅ Parseado (patrón 1): {weight_int} {normalized_unit}")
-                return weight_int, normalized_unit
-            
-            # Patrón 2: Solo número ej: "150"
-            pattern2 = r'([-+]?\d+)'
-            match2 = re.search(pattern2, data)
-            if match2:
-                weight_int = int(match2.group(1))
-                self.logger.debug(f"✅ Parseado (patrón 2): {weight_int} kg")
-                return weight_int, "kg"
-            
-            # Patrón 3: Datos con caracteres especiales
-            pattern3 = r'[^\d]*(\d+)[^\d]*'
-            match3 = re.search(pattern3, data)
-            if match3:
-                weight_int = int(match3.group(1))
-                self.logger.debug(f"✅ Parseado (patrón 3): {weight_int} kg")
-                return weight_int, "kg"
-                
-        except ValueError as ve:
-            self.logger.error(f"❌ Error de valor parseando datos: {ve}")
-        except Exception as e:
-            self.logger.error(f"❌ Error parseando datos: {e}")
-        
-        return None
-    
-    def _normalize_unit(self, unit):
-        """Normalizar las unidades a formato estándar"""
-        unit = unit.lower().strip()
-        
-        unit_mapping = {
-            'kg': 'kg', 'kgs': 'kg', 'kilogramo': 'kg', 'kilogramos': 'kg',
-            'lb': 'lb', 'lbs': 'lb', 'libra': 'lb', 'libras': 'lb',
-            'g': 'g', 'gr': 'g', 'gramo': 'g', 'gramos': 'g',
-            'tn': 't', 'ton': 't', 'tonelada': 't', 'toneladas': 't',
-            '': 'kg'  # Unidad vacía por defecto kg
-        }
-        
-        return unit_mapping.get(unit, unit)
-    
     def send_test_command(self):
         """Enviar comando de prueba a la báscula"""
         self.logger.info("📤 Enviando comandos de prueba a la báscula")
@@ -367,7 +478,9 @@ class ScaleReader:
             'weight': weight_value,
             'unit': self.current_unit,
             'display_text': f"{self.current_weight} {self.current_unit}",
-            'raw_data': self.last_raw_data
+            'raw_data': self.last_raw_data,
+            'is_stable': self.stability.is_stable,
+            'stable_weight': self.stability.stable_weight
         }
 
     def get_debug_info(self):
@@ -375,6 +488,12 @@ class ScaleReader:
         return {
             'port': self.port,
             'baudrate': self.baudrate,
+            'serial_framing': self.framing,
+            'read_mode': self.read_mode,
+            'read_timeout': self.read_timeout,
+            'poll_interval': self.poll_interval,
+            'protocol': self.decoder.name,
+            'capture_path': self.capture_path if self.capture else None,
             'reading': self.reading,
             'connected': self.serial_conn.is_open if self.serial_conn else False,
             'bytes_received': self.bytes_received,
@@ -383,14 +502,19 @@ class ScaleReader:
             'current_weight': self.current_weight,
             'current_unit': self.current_unit,
             'has_callback': self.update_callback is not None,
-            'consecutive_errors': self.consecutive_errors
+            'consecutive_errors': self.consecutive_errors,
+            'stability': self.stability.get_state(),
+            'framing': self.assembler.get_state(),
+            'health': self.supervisor.get_metrics()
         }
 
 
 # Simulador mejorado con unidades (SIN CAMBIOS EN EL SIMULADOR)
 class ScaleSimulator:
-    def __init__(self, update_callback=None):
+    def __init__(self, update_callback=None, stable_callback=None):
         self.update_callback = update_callback
+        self.stable_callback = stable_callback
+        self.stability = StabilityDetector.from_settings(get_scale_config(), stable_callback=self._on_stable_weight)
         self.reading = False
         self.current_weight = "0"
         self.current_unit = "kg"
@@ -403,8 +527,12 @@ class ScaleSimulator:
     def connect(self):
         print("Simulador de báscula iniciado")
         return True
+
+    def is_connected(self):
+        return self.reading
     
-    def start_reading(self):
+    def start_reading(self, io_loop=None):
+        # El simulador no usa puerto: siempre genera los datos en su propio hilo
         self.reading = True
         self.thread = threading.Thread(target=self._simulate_loop)
         self.thread.daemon = True
@@ -419,6 +547,10 @@ class ScaleSimulator:
         self.update_callback("0 desc", "red")
         print("Simulador de báscula: lectura detenida")
     
+    def _on_stable_weight(self, weight):
+        if self.stable_callback:
+            self.stable_callback(weight)
+
     def _simulate_loop(self):
         """Simular cambios de peso para testing"""
         import random
@@ -455,6 +587,7 @@ class ScaleSimulator:
                 
                 self.current_weight = formatted_weight
                 self.current_unit = self.units[self.current_unit_index]
+                self.stability.add_sample(weight_int_rounded)
                 
                 #print(f"Simulador: {self.current_weight} {self.current_unit} (iteración {self.iteration_count})")
                 
@@ -480,17 +613,82 @@ class ScaleSimulator:
         return {
             'weight': weight_value,
             'unit': self.current_unit,
-            'display_text': f"{self.current_weight} {self.current_unit}"
+            'display_text': f"{self.current_weight} {self.current_unit}",
+            'is_stable': self.stability.is_stable,
+            'stable_weight': self.stability.stable_weight
         }
 
+class ReplayScaleReader(ScaleReader):
+    """
+    Lector que reproduce un archivo de captura por la misma ruta de ensamblado,
+    decodificación y estabilidad que ScaleReader, en tiempo real o a máxima velocidad.
+    """
+    def __init__(self, replay_path, realtime=True, speed=1.0, protocol=None, update_callback=None, stable_callback=None):
+        self.replay_path = replay_path
+        self.realtime = realtime
+        self.speed = speed
+        super().__init__(port=replay_path, update_callback=update_callback, stable_callback=stable_callback, protocol=protocol)
+        self.logger = app_logger.getChild('ReplayScaleReader')
+
+        # La reproducción siempre usa lectura por evento, nunca vuelve a grabar
+        # y las pausas de la captura no cuentan como puerto silencioso
+        self.read_mode = 'event'
+        self.capture_path = ''
+        self.supervisor.silent_timeout = 0
+
+    def connect(self):
+        """Abrir la captura como si fuera el puerto serial"""
+        try:
+            self.serial_conn = CaptureReplaySource(
+                self.replay_path,
+                realtime=self.realtime,
+                speed=self.speed,
+                timeout=self.read_timeout
+            )
+            modo = f"tiempo real x{self.speed}" if self.realtime else "máxima velocidad"
+            self.logger.info(f"▶️ Reproduciendo captura {self.replay_path} ({modo})")
+            self.consecutive_errors = 0
+            self.supervisor.on_connected()
+            return True
+        except (OSError, ValueError) as e:
+            self.logger.error(f"❌ No se pudo abrir la captura: {e}")
+            self._update_display_with_error("Err Cap")
+            return False
+
+    def _read_available(self):
+        raw_data = super()._read_available()
+        if not raw_data and self.serial_conn.finished:
+            self._finish_replay()
+        return raw_data
+
+    def _read_ready(self, readable=False):
+        pending = self.serial_conn.in_waiting
+        if pending:
+            self._handle_raw_data(self.serial_conn.read(pending))
+        elif self.serial_conn.finished:
+            self._finish_replay()
+        return pending
+
+    def _finish_replay(self):
+        self.logger.info(f"⏹️ Fin de la captura: {self.bytes_received} bytes reproducidos")
+        self.reading = False
+
+
 # Factory para seleccionar reader real o simulado
-def create_scale_reader(use_simulator=False, **kwargs):
-    print(f"🔧 create_scale_reader: use_simulator = {use_simulator}")
+def create_scale_reader(use_simulator=False, replay_path=None, replay_realtime=True, **kwargs):
+    print(f"🔧 create_scale_reader: use_simulator = {use_simulator}, replay_path = {replay_path}")
 
     global current_use_simulator
     current_use_simulator = use_simulator
 
+    if replay_path:
+        kwargs.pop('port', None)
+        kwargs.pop('baudrate', None)
+        return ReplayScaleReader(replay_path, realtime=replay_realtime, **kwargs)
     if use_simulator:
-        return ScaleSimulator(**kwargs)
+        return ScaleSimulator(
+            update_callback=kwargs.get('update_callback'),
+            stable_callback=kwargs.get('stable_callback')
+        )
     else:
         return ScaleReader(**kwargs)
\ No newline at end of file
@@ -0,0 +1,155 @@
+# logic_scale_stability.py
+
+import time
+from array import array
+from collections import deque
+from utils.logger_config import app_logger
+
+
+class StabilityDetector:
+    """
+    Detector de movimiento/estabilidad sobre una ventana circular de las últimas N muestras.
+
+    Las muestras se guardan en un array('d') de tamaño fijo y se mantienen sumas
+    acumuladas y colas monótonas de máximo/mínimo, de modo que cada muestra
+    cuesta O(1) (amortizado) sin importar la frecuencia del indicador.
+
+    Criterios:
+        'spread'   -> (máximo - mínimo) de la ventana <= tolerancia
+        'variance' -> desviación estándar de la ventana <= tolerancia
+
+    La lectura se declara estable cuando la ventana está llena, cumple el criterio
+    y lo ha cumplido de forma continua durante al menos window_ms milisegundos.
+    """
+
+    MODES = ('spread', 'variance')
+
+    def __init__(self, window_size=5, window_ms=500, tolerance=10, mode='spread', stable_callback=None):
+        self.logger = app_logger.getChild('StabilityDetector')
+
+        self.window_size = max(2, int(window_size))
+        self.window_seconds = max(0.0, float(window_ms) / 1000.0)
+        self.tolerance = max(0.0, float(tolerance))
+        self.mode = mode if mode in self.MODES else 'spread'
+        self.stable_callback = stable_callback
+
+        self.samples = array('d', bytes(8 * self.window_size))
+        self.reset()
+
+    @classmethod
+    def from_settings(cls, scale_config, stable_callback=None):
+        """Crear el detector a partir de los settings 'scale_stability_*'"""
+        def _number(key, default):
+            try:
+                return float(scale_config.get(key, default))
+            except (TypeError, ValueError):
+                return default
+
+        return cls(
+            window_size=int(_number('scale_stability_samples', 5)),
+            window_ms=_number('scale_stability_window_ms', 500),
+            tolerance=_number('scale_stability_tolerance', 10),
+            mode=str(scale_config.get('scale_stability_mode', 'spread')).strip().lower(),
+            stable_callback=stable_callback
+        )
+
+    def reset(self):
+        """Vaciar la ventana (cambio de báscula, error o desconexión)"""
+        self.count = 0
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self._max_queue = deque()  # (secuencia, valor) con valores decrecientes
+        self._min_queue = deque()  # (secuencia, valor) con valores crecientes
+        self._candidate_since = None
+        self.is_stable = False
+        self.stable_weight = None
+
+    def add_sample(self, weight, timestamp=None, motion=None):
+        """
+        Agregar una muestra y reevaluar la estabilidad.
+
+        Args:
+            weight: Peso leído del indicador
+            timestamp: Tiempo monotónico de la muestra (por defecto time.monotonic())
+            motion: Bandera de movimiento reportada por el indicador (si la hay)
+
+        Returns:
+            bool: Estado de estabilidad después de la muestra
+        """
+        now = time.monotonic() if timestamp is None else timestamp
+        value = float(weight)
+        size = self.window_size
+        seq = self.count
+        slot = seq % size
+
+        if seq >= size:
+            old_value = self.samples[slot]
+            self._sum -= old_value
+            self._sum_sq -= old_value * old_value
+
+        self.samples[slot] = value
+        self._sum += value
+        self._sum_sq += value * value
+        self.count = seq + 1
+
+        oldest_seq = self.count - size
+        max_queue = self._max_queue
+        while max_queue and max_queue[-1][1] <= value:
+            max_queue.pop()
+        max_queue.append((seq, value))
+        while max_queue[0][0] < oldest_seq:
+            max_queue.popleft()
+
+        min_queue = self._min_queue
+        while min_queue and min_queue[-1][1] >= value:
+            min_queue.pop()
+        min_queue.append((seq, value))
+        while min_queue[0][0] < oldest_seq:
+            min_queue.popleft()
+
+        within_tolerance = self.count >= size and not motion and self._measure() <= self.tolerance
+        if not within_tolerance:
+            self._candidate_since = None
+            self._set_unstable()
+            return False
+
+        if self._candidate_since is None:
+            self._candidate_since = now
+
+        if now - self._candidate_since >= self.window_seconds and not self.is_stable:
+            self.is_stable = True
+            self.stable_weight = int(round(self._sum / size))
+            self.logger.debug(f"⚖️ Peso estable: {self.stable_weight} kg (ventana {size} muestras)")
+            if self.stable_callback:
+                try:
+                    self.stable_callback(self.stable_weight)
+                except Exception as callback_error:
+                    self.logger.error(f"Error en callback de peso estable: {callback_error}")
+
+        return self.is_stable
+
+    def _measure(self):
+        """Dispersión de la ventana según el modo configurado"""
+        if self.mode == 'variance':
+            mean = self._sum / self.window_size
+            variance = max(0.0, self._sum_sq / self.window_size - mean * mean)
+            return variance ** 0.5
+        return self._max_queue[0][1] - self._min_queue[0][1]
+
+    def _set_unstable(self):
+        if self.is_stable:
+            self.logger.debug("〰️ Peso en movimiento")
+        self.is_stable = False
+        self.stable_weight = None
+
+    def get_state(self):
+        """Estado actual para debug/UI"""
+        return {
+            'is_stable': self.is_stable,
+            'stable_weight': self.stable_weight,
+            'mode': self.mode,
+            'window_size': self.window_size,
+            'window_ms': int(self.window_seconds * 1000),
+            'tolerance': self.tolerance,
+            'samples': min(self.count, self.window_size)
+        }
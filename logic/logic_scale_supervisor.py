@@ -0,0 +1,138 @@
+# logic_scale_supervisor.py
+
+import random
+import time
+from collections import deque
+
+
+class ConnectionSupervisor:
+    """
+    Estado de conexión y métricas de salud de un puerto de báscula.
+
+    - Reintentos con backoff exponencial y jitter: base, 2x base, 4x base...
+      hasta max_delay, cada espera elegida al azar entre la mitad y el total
+      para que varias plataformas no reintenten al mismo tiempo.
+    - El contador de intentos solo se reinicia cuando llega una trama válida,
+      así un puerto que abre y falla enseguida no entra en un ciclo rápido.
+    - Puerto silencioso: abierto pero sin bytes durante silent_timeout segundos
+      (0 = desactivado, por defecto: hay indicadores que solo envían al cambiar
+      el peso o cuando se les pide).
+    - Tasas de tramas, bytes y errores sobre una ventana móvil de segundos.
+    """
+
+    def __init__(self, base_delay=0.5, max_delay=30, silent_timeout=0, window_seconds=10):
+        self.base_delay = max(0.05, float(base_delay))
+        self.max_delay = max(self.base_delay, float(max_delay))
+        self.silent_timeout = max(0.0, float(silent_timeout))
+        self.window_seconds = max(1, int(window_seconds))
+
+        self.attempts = 0
+        self.connected = False
+        self.connected_at = None
+        self.last_data_at = None
+        self.last_delay = 0.0
+
+        self.connects = 0
+        self.reconnects = 0
+        self.silent_events = 0
+        self.total_frames = 0
+        self.total_bytes = 0
+        self.total_errors = 0
+        self._buckets = deque()  # [segundo, tramas, bytes, errores]
+
+    @classmethod
+    def from_settings(cls, scale_config):
+        """Crear el supervisor a partir de los settings 'scale_reconnect_*' y 'scale_silent_timeout'"""
+        def _number(key, default):
+            try:
+                return float(scale_config.get(key, default))
+            except (TypeError, ValueError):
+                return default
+
+        return cls(
+            base_delay=_number('scale_reconnect_base', 0.5),
+            max_delay=_number('scale_reconnect_max', 30),
+            silent_timeout=_number('scale_silent_timeout', 0)
+        )
+
+    def next_delay(self):
+        """Segundos a esperar antes del siguiente intento de conexión"""
+        delay = min(self.max_delay, self.base_delay * (2 ** min(self.attempts, 16)))
+        self.attempts += 1
+        self.last_delay = random.uniform(delay / 2, delay)
+        return self.last_delay
+
+    def on_connected(self):
+        now = time.monotonic()
+        if self.connects:
+            self.reconnects += 1
+        self.connects += 1
+        self.connected = True
+        self.connected_at = now
+        self.last_data_at = now
+
+    def on_disconnected(self):
+        self.connected = False
+
+    def on_silent(self):
+        self.silent_events += 1
+        self.connected = False
+
+    def on_bytes(self, count):
+        self.last_data_at = time.monotonic()
+        self.total_bytes += count
+        self._bucket()[2] += count
+
+    def on_frame(self):
+        self.attempts = 0
+        self.total_frames += 1
+        self._bucket()[1] += 1
+
+    def on_error(self):
+        self.total_errors += 1
+        self._bucket()[3] += 1
+
+    def is_silent(self, now=None):
+        """True si el puerto está abierto pero no ha enviado bytes en silent_timeout segundos"""
+        if not self.connected or not self.silent_timeout or self.last_data_at is None:
+            return False
+        now = time.monotonic() if now is None else now
+        return now - self.last_data_at > self.silent_timeout
+
+    def _bucket(self):
+        second = int(time.monotonic())
+        buckets = self._buckets
+        if not buckets or buckets[-1][0] != second:
+            buckets.append([second, 0, 0, 0])
+            while buckets[0][0] <= second - self.window_seconds:
+                buckets.popleft()
+        return buckets[-1]
+
+    def get_metrics(self):
+        """Métricas de salud del puerto para get_debug_info()"""
+        now = time.monotonic()
+        oldest = int(now) - self.window_seconds
+        frames = data_bytes = errors = 0
+        for second, bucket_frames, bucket_bytes, bucket_errors in self._buckets:
+            if second > oldest:
+                frames += bucket_frames
+                data_bytes += bucket_bytes
+                errors += bucket_errors
+
+        window = float(self.window_seconds)
+        return {
+            'connected': self.connected,
+            'uptime_s': round(now - self.connected_at, 1) if self.connected and self.connected_at else 0.0,
+            'seconds_since_data': round(now - self.last_data_at, 1) if self.last_data_at else None,
+            'reconnects': self.reconnects,
+            'silent_events': self.silent_events,
+            'retry_attempts': self.attempts,
+            'last_retry_delay_s': round(self.last_delay, 2),
+            'frames_per_second': round(frames / window, 2),
+            'bytes_per_second': round(data_bytes / window, 1),
+            'errors_per_second': round(errors / window, 3),
+            'error_rate': round(errors / (frames + errors), 4) if frames + errors else 0.0,
+            'total_frames': self.total_frames,
+            'total_bytes': self.total_bytes,
+            'total_errors': self.total_errors
+        }
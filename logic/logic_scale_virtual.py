@@ -0,0 +1,223 @@
+# logic_scale_virtual.py
+
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from logic.logic_scale_decoders import get_decoder
+from utils.logger_config import app_logger
+
+# Probabilidad por trama de cada falla inyectada
+DEFAULT_FAULTS = {
+    'split': 0.0,       # Trama enviada en dos escrituras separadas
+    'garbage': 0.0,     # Bytes aleatorios antes de la trama
+    'negative': 0.0,    # Peso negativo
+    'overload': 0.0,    # Indicador fuera de rango
+    'disconnect': 0.0,  # Cierre del pseudo-terminal y reapertura
+}
+
+
+class VirtualIndicator:
+    """
+    Indicador de báscula virtual sobre un pseudo-terminal de Linux.
+
+    Emite tramas reales del protocolo elegido a la frecuencia indicada, con un
+    perfil de ruido y fallas configurables, de modo que ScaleReader se conecta
+    al puerto como si fuera un indicador físico y se prueba toda la ruta de
+    lectura (serial.Serial, ensamblado de tramas y decodificación).
+
+    Perfiles de ruido:
+        'static' -> peso objetivo con ruido gaussiano
+        'truck'  -> ciclo de camión: sube con movimiento, se asienta, baja a cero
+    """
+
+    PROFILES = ('static', 'truck')
+
+    def __init__(self, protocol='generic', rate=20, target_weight=23550, noise=3.0,
+                 profile='static', faults=None, link_path=None, seed=None):
+        if not hasattr(os, 'openpty'):
+            raise RuntimeError("El indicador virtual requiere pseudo-terminales (Linux/macOS)")
+
+        self.logger = app_logger.getChild('VirtualIndicator')
+        self.decoder = get_decoder(protocol)
+        self.rate = max(0.1, float(rate))
+        self.target_weight = int(target_weight)
+        self.noise = max(0.0, float(noise))
+        self.profile = profile if profile in self.PROFILES else 'static'
+        self.faults = dict(DEFAULT_FAULTS)
+        self.faults.update(faults or {})
+        self.link_path = link_path
+        self.random = random.Random(seed)
+
+        self.master_fd = None
+        self.slave_fd = None
+        self.port = None
+        self.running = False
+        self.thread = None
+        self.frames_sent = 0
+        self.fault_counts = {name: 0 for name in self.faults}
+        self._open_pty()
+
+    def _open_pty(self):
+        """Crear el pseudo-terminal (y actualizar el enlace simbólico estable si se pidió)"""
+        import tty
+
+        self.master_fd, self.slave_fd = os.openpty()
+        tty.setraw(self.slave_fd)
+        slave_name = os.ttyname(self.slave_fd)
+
+        if self.link_path:
+            if os.path.lexists(self.link_path):
+                os.unlink(self.link_path)
+            os.symlink(slave_name, self.link_path)
+            self.port = self.link_path
+        else:
+            self.port = slave_name
+        self.logger.info(f"🧪 Indicador virtual '{self.decoder.name}' en {self.port} -> {slave_name}")
+
+    def _close_pty(self):
+        for fd in (self.master_fd, self.slave_fd):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self.master_fd = None
+        self.slave_fd = None
+
+    def start(self):
+        """Iniciar la emisión de tramas en un hilo"""
+        self.running = True
+        self.thread = threading.Thread(target=self._emit_loop, name="VirtualIndicatorThread")
+        self.thread.daemon = True
+        self.thread.start()
+        return self.port
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=2)
+        self._close_pty()
+        if self.link_path and os.path.lexists(self.link_path):
+            os.unlink(self.link_path)
+        self.logger.info(f"⏹️ Indicador virtual detenido: {self.frames_sent} tramas enviadas")
+
+    def _fault(self, name):
+        """Decidir si se inyecta una falla en esta trama"""
+        probability = self.faults.get(name, 0.0)
+        if probability and self.random.random() < probability:
+            self.fault_counts[name] += 1
+            return True
+        return False
+
+    def _next_weight(self, tick):
+        """Peso y bandera de movimiento según el perfil de ruido"""
+        noise = self.random.gauss(0, self.noise) if self.noise else 0.0
+        if self.profile == 'truck':
+            cycle = int(self.rate * 20)              # Ciclo de 20 s
+            ramp = max(1, int(self.rate * 3))        # 3 s subiendo / bajando
+            hold = cycle - 2 * ramp
+            position = tick % cycle
+            if position < ramp:
+                return int(self.target_weight * position / ramp + noise * 10), True
+            if position < ramp + hold:
+                return int(self.target_weight + noise), False
+            return int(self.target_weight * (cycle - position) / ramp + noise * 10), True
+        return int(self.target_weight + noise), False
+
+    def _write(self, data):
+        os.write(self.master_fd, data)
+
+    def _emit_loop(self):
+        next_time = time.monotonic()
+        tick = 0
+
+        while self.running:
+            interval = 1.0 / self.rate  # La frecuencia se puede cambiar en caliente
+            try:
+                weight, motion = self._next_weight(tick)
+                overload = self._fault('overload')
+                if self._fault('negative'):
+                    weight = -abs(weight) or -10
+                frame = self.decoder.encode(weight, motion=motion, overload=overload)
+
+                if self._fault('garbage'):
+                    self._write(bytes(self.random.randrange(32, 127) for _ in range(self.random.randint(1, 40))))
+
+                if self._fault('split') and len(frame) > 2:
+                    cut = self.random.randint(1, len(frame) - 1)
+                    self._write(frame[:cut])
+                    time.sleep(min(interval / 2, 0.01))
+                    self._write(frame[cut:])
+                else:
+                    self._write(frame)
+                self.frames_sent += 1
+
+                if self._fault('disconnect'):
+                    self.logger.warning("🔌 Indicador virtual: simulando desconexión")
+                    self._close_pty()
+                    time.sleep(1)
+                    self._open_pty()
+
+            except OSError as e:
+                self.logger.error(f"❌ Error escribiendo en el pseudo-terminal: {e}")
+                time.sleep(0.5)
+
+            tick += 1
+            next_time += interval
+            delay = next_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_time = time.monotonic()
+
+    def get_stats(self):
+        return {
+            'port': self.port,
+            'protocol': self.decoder.name,
+            'rate': self.rate,
+            'frames_sent': self.frames_sent,
+            'faults': dict(self.fault_counts)
+        }
+
+
+def soak_test(seconds=30, protocol='toledo', rate=50, faults=None, profile='truck'):
+    """
+    Prueba de resistencia: conecta un ScaleReader real al indicador virtual y
+    compara las tramas enviadas con las recibidas y decodificadas.
+    """
+    from logic.logic_scale_reader import ScaleReader
+
+    link_path = os.path.join(tempfile.gettempdir(), f"bascula_virtual_{os.getpid()}")
+    indicator = VirtualIndicator(protocol=protocol, rate=rate, profile=profile, faults=faults, link_path=link_path)
+    reader = ScaleReader(port=indicator.port, protocol=protocol)
+    if not reader.connect():
+        indicator.stop()
+        return None
+
+    indicator.start()
+    reader.start_reading()
+    time.sleep(seconds)
+    reader.stop_reading()
+    indicator.stop()
+
+    framing = reader.assembler.get_state()
+    return {
+        'seconds': seconds,
+        'sent': indicator.get_stats(),
+        'frames_received': framing['frames'],
+        'discarded_bytes': framing['discarded_bytes'],
+        'bytes_received': reader.bytes_received,
+        'stability': reader.stability.get_state()
+    }
+
+
+if __name__ == '__main__':
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 30
+    protocol_name = sys.argv[2] if len(sys.argv) > 2 else 'toledo'
+    frame_rate = float(sys.argv[3]) if len(sys.argv) > 3 else 50
+    result = soak_test(duration, protocol_name, frame_rate,
+                       faults={'split': 0.05, 'garbage': 0.01, 'negative': 0.005})
+    print(result)
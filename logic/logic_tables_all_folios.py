@@ -4,7 +4,10 @@ import tkinter as tk
 from tkinter import ttk
 from datetime import datetime
 from db_operations.db_search import SearchOperations
-from logic.logic_odoo_records import OdooAPI
+from db_operations.db_change_notifier import get_change_notifier, FOLIO_TABLES
+
+# Filas por página al cargar todos los folios
+ALL_FOLIOS_PAGE_SIZE = 200
 
 class FoliosWeighingsTable:
     def __init__(self, parent_frame, search_folio_entry=None, styles=None):
@@ -16,6 +19,11 @@ class FoliosWeighingsTable:
         self.row_select_callback = None
         self.selected_data = {} 
         self.search_folio_entry = search_folio_entry
+        self._page_load_id = 0
+        # Versión de los datos de la lista de últimos folios; None si se muestra otra cosa (búsqueda, todos)
+        self._loaded_version = None
+        self.change_notifier = get_change_notifier()
+        self.change_notifier.subscribe(FOLIO_TABLES, self._on_data_changed)
         self.db_manager = SearchOperations()        
         self.create_table()
         self.load_folios()
@@ -266,11 +274,14 @@ class FoliosWeighingsTable:
         """Cargar pesajes pendientes desde la base de datos"""        
         if not self.folioTree:
             return
+        self._page_load_id += 1
         
         # Limpiar tabla existente
         for item in self.folioTree.get_children():
             self.folioTree.delete(item)
         
+        # La versión se toma antes de consultar: un cambio durante la carga no se pierde
+        self._loaded_version = self.change_notifier.versions(FOLIO_TABLES)
         folios = self.db_manager.get_last_folios_weighings_manual()
         # Alternar colores de filas para mejor legibilidad
         tags = ('evenrow', 'oddrow')
@@ -278,10 +289,6 @@ class FoliosWeighingsTable:
         for i, weighing in enumerate(folios):
             
             self.folio_id = weighing['id_weighing']
-            saved_in_odoo = weighing['saved_in_Odoo']            
-            if saved_in_odoo != 1:
-                self.odoo_records = OdooAPI(self.folio_id)
-                self.odoo_records.create_record_scale()
             
             tag = tags[i % 2]
             days_open_folio = self.create_open_folio_days(weighing['date_start'], weighing['date_end'])
@@ -318,7 +325,7 @@ class FoliosWeighingsTable:
         self.update_count_label(len(folios))
 
     def _load_all_folios(self):
-        """Cargar pesajes pendientes desde la base de datos"""        
+        """Cargar todos los pesajes por páginas, sin congelar la interfaz"""        
         if not self.folioTree:
             return
         
@@ -326,53 +333,68 @@ class FoliosWeighingsTable:
         for item in self.folioTree.get_children():
             self.folioTree.delete(item)
         
-        folios = self.db_manager.get_all_folios_weighings_closed()
-        # Alternar colores de filas para mejor legibilidad
-        tags = ('evenrow', 'oddrow')
-        
-        for i, weighing in enumerate(folios):
-            
-            self.folio_id = weighing['id_weighing']
-            saved_in_odoo = weighing['saved_in_Odoo']            
-            if saved_in_odoo != 1:
-                self.odoo_records = OdooAPI(self.folio_id)
-                print(f"Folio id en if: {self.folio_id}\nsaved_in_odoo:{saved_in_odoo}")
-                self.odoo_records.create_record_scale()
-            
-            tag = tags[i % 2]
-            days_open_folio = self.create_open_folio_days(weighing['date_start'], weighing['date_end'])
-            weighing_type_value = weighing['weighing_type']
-            self.folioTree.insert('', tk.END, values=(
-                weighing['id_weighing'],
-                weighing['folio_number'],
-                self._format_date(weighing['date_start']),
-                self._format_date(weighing['date_end']),
-                days_open_folio,
-                weighing['user_name'],
-                weighing['weighing_type'],
-                weighing['gross_weight'],
-                weighing['net_weight'],
-                weighing['tare_weight'],
-                weighing['plates'],
-                weighing['vehicle_name'],
-                weighing['trailer_name'],
-                weighing['driver_name'],
-                weighing['customer_name'],
-                weighing['material_name'],
-                weighing['scale_record_status'],
-                weighing['id_status_odoo'],                
-                weighing['user_name_closed'],
-                weighing['notes'],
-                weighing['folio_ALM2'],
-                weighing['weight_original']
-            ), tags=(tag,))
+        # Una carga nueva (o load_folios/update_table) deja sin efecto la anterior
+        self._page_load_id += 1
+        self._loaded_version = None
+        pages = self.db_manager.iter_folio_pages(self.db_manager.get_all_folios_weighings_closed, fetch_size=ALL_FOLIOS_PAGE_SIZE)
         
         # Configurar colores alternados
         self.folioTree.tag_configure('evenrow', background="#dfdfdf")
         self.folioTree.tag_configure('oddrow', background='#ffffff')
         self.search_folio_entry.delete(0, tk.END)
+        self._load_next_page(pages, self._page_load_id, 0)
+
+    def _load_next_page(self, pages, load_id, count):
+        """Insertar la siguiente página y dejar que la interfaz atienda eventos antes de la otra"""
+        if load_id != self._page_load_id:
+            return
+        
+        rows = next(pages, None)
+        if rows is None:
+            self.update_count_label(count)
+            return
+        
+        for weighing in rows:
+            self._insert_all_folio_row(count, weighing)
+            count += 1
         # Actualizar contador
-        self.update_count_label(len(folios))
+        self.update_count_label(count)
+        self.folioTree.after(1, self._load_next_page, pages, load_id, count)
+
+    def _insert_all_folio_row(self, index, weighing):
+        """Insertar un pesaje en la tabla de todos los folios"""
+        # Alternar colores de filas para mejor legibilidad
+        tags = ('evenrow', 'oddrow')
+        
+        self.folio_id = weighing['id_weighing']
+        
+        tag = tags[index % 2]
+        days_open_folio = self.create_open_folio_days(weighing['date_start'], weighing['date_end'])
+        weighing_type_value = weighing['weighing_type']
+        self.folioTree.insert('', tk.END, values=(
+            weighing['id_weighing'],
+            weighing['folio_number'],
+            self._format_date(weighing['date_start']),
+            self._format_date(weighing['date_end']),
+            days_open_folio,
+            weighing['user_name'],
+            weighing['weighing_type'],
+            weighing['gross_weight'],
+            weighing['net_weight'],
+            weighing['tare_weight'],
+            weighing['plates'],
+            weighing['vehicle_name'],
+            weighing['trailer_name'],
+            weighing['driver_name'],
+            weighing['customer_name'],
+            weighing['material_name'],
+            weighing['scale_record_status'],
+            weighing['id_status_odoo'],                
+            weighing['user_name_closed'],
+            weighing['notes'],
+            weighing['folio_ALM2'],
+            weighing['weight_original']
+        ), tags=(tag,))
 
         
     def _format_date(self, date_string):
@@ -492,11 +514,31 @@ class FoliosWeighingsTable:
         """Refrescar la tabla"""
         self.load_folios()
 
+    def load_if_changed(self):
+        """
+        Mostrar los últimos folios, consultando solo si los datos cambiaron
+        desde la última carga o si la tabla muestra otra cosa.
+
+        Returns:
+            bool: True si se recargó
+        """
+        if self._loaded_version is not None and self._loaded_version == self.change_notifier.versions(FOLIO_TABLES):
+            return False
+        self.load_folios()
+        return True
+
+    def _on_data_changed(self, tables):
+        """Aviso del ChangeNotifier: solo se recarga la lista de últimos folios, no una búsqueda"""
+        if self._loaded_version is not None:
+            self.load_if_changed()
+
     
     def update_table(self, text):
         """Cargar pesajes desde la base de datos filtrados por texto"""
         if not self.folioTree:
             return
+        self._page_load_id += 1
+        self._loaded_version = None
         
         for item in self.folioTree.get_children():
             self.folioTree.delete(item)
@@ -4,6 +4,7 @@ import tkinter as tk
 from tkinter import ttk
 from datetime import datetime
 from db_operations.db_save_folio import WeighingDBManager
+from db_operations.db_change_notifier import get_change_notifier, FOLIO_TABLES
 
 class PendingWeighingsTable:
     def __init__(self, parent_frame, styles=None):
@@ -12,8 +13,12 @@ class PendingWeighingsTable:
         self.tree = None
         self.row_select_callback = None
         self.db_manager = WeighingDBManager()
+        # Versión de los datos con la que se llenó la tabla
+        self._loaded_version = None
+        self.change_notifier = get_change_notifier()
         self.create_table()
         self.load_pending_weighings()
+        self.change_notifier.subscribe(FOLIO_TABLES, self._on_data_changed)
 
 
     def set_row_select_callback(self, callback):
@@ -150,7 +155,9 @@ class PendingWeighingsTable:
         is_outside = not (tx <= event.x_root < tx + tw and ty <= event.y_root < ty + th)
         
         if is_outside:
-            self.load_pending_weighings() 
+            # Solo se vuelve a consultar si los datos cambiaron; si no, basta con deseleccionar
+            if not self.load_if_changed() and self.tree.selection():
+                self.tree.selection_remove(self.tree.selection())
             
 
     
@@ -254,6 +261,8 @@ class PendingWeighingsTable:
         for item in self.tree.get_children():
             self.tree.delete(item)
         
+        # La versión se toma antes de consultar: un cambio durante la carga no se pierde
+        self._loaded_version = self.change_notifier.versions(FOLIO_TABLES)
         weighings = self.db_manager.get_pending_weighings()
         # Alternar colores de filas para mejor legibilidad
         tags = ('evenrow', 'oddrow')
@@ -291,6 +300,22 @@ class PendingWeighingsTable:
         # Actualizar contador
         self.update_count_label(len(weighings))
     
+    def load_if_changed(self):
+        """
+        Recargar la tabla solo si los pesajes o sus catálogos cambiaron desde la última carga.
+
+        Returns:
+            bool: True si se recargó
+        """
+        if self._loaded_version == self.change_notifier.versions(FOLIO_TABLES):
+            return False
+        self.load_pending_weighings()
+        return True
+
+    def _on_data_changed(self, tables):
+        """Aviso del ChangeNotifier (cambios de esta u otra estación)"""
+        self.load_if_changed()
+
     def format_date(self, date_string):
         """Formatear fecha para mejor visualización"""
         if not date_string:
@@ -270,13 +270,14 @@ class WeighingLogic:
         
         self.logger.info(f"📊 Datos procesados - Cliente: {datos['customer_nombre']}, Material: {datos['material_name']}, Peso: {datos['weight']}")
         
+        weighing_data_alm2 = None
         if tipo_pesaje == 'Entrada':
             weighing_type = tipo_pesaje
             self.input_weighing = datos
             if customer_discount > 0 and material_spd == 1:
                 self.logger.info("🔔 Aplicando descuento ALM2")
+                # El pesaje de ALM2 se guarda junto con el principal, en la misma transacción
                 new_datos, weighing_data_alm2 = self._create_weighing_input_alm2(datos, weighing_type)
-                db_manager.save_weighing_record(weighing_data_alm2)
                 datos = new_datos
 
             weighing_data = self._create_weighing_input(datos, weighing_type)
@@ -289,7 +290,7 @@ class WeighingLogic:
             weighing_data = self._create_weighing_input(datos, weighing_type)
         
         self.logger.info(f"💾 Guardando registro en base de datos - Folio: {datos['folio']}")
-        exito, siguiente_folio = db_manager.save_weighing_record(weighing_data)
+        exito, siguiente_folio = db_manager.save_weighing_record(weighing_data, companion=weighing_data_alm2)
         
         if exito and siguiente_folio:
             # Actualizar el campo folio en la UI con el siguiente folio
@@ -492,9 +493,17 @@ class WeighingLogic:
                 new_net_weight_ALM2 = data_new_weight['new_net_weight_ALM2']
                 new_gross_weight = data_new_weight['new_gross_weight']
                 new_net_weight = data_new_weight['new_net_weight']
+
+                # Sin pesaje complementario no se cierra nada: nunca se adivina su id
+                companion_id = db_manager.get_companion_id(data.get('id_weighing'))
+                if companion_id is None:
+                    error = (f"El folio {data.get('folio_number')} tiene folio ALM2 {folio_alm2_closed}, "
+                             f"pero no se encontró su pesaje complementario. No se cerró el folio.")
+                    self.logger.error(f"❌ {error}")
+                    return {'exito': False, 'updated_row': None, 'error': error}
                 
                 weighing_closed_data_alm2 = {
-                    'id_weighing': int(data.get('id_weighing')) - 1,
+                    'id_weighing': companion_id,
                     'folio_number': (f"{data.get('folio_number')}A"),
                     'gross_weight': new_gross_weight_ALM2,
                     'tare_weight': tare_weight,
@@ -506,26 +515,25 @@ class WeighingLogic:
                     'notes': data.get('notes')
                 }
                 
-                self.logger.info(f"💾 Guardando cierre ALM2 - Folio: {weighing_closed_data_alm2['folio_number']}")
-                result = db_manager.close_weighing_input_alm2(weighing_closed_data_alm2)
-                self.logger.info(f"✅ Respuesta BD ALM2: {result}, exito={result['exito']}")
-                exito =  result['exito']
-                if exito:
-                    weighing_closed_data = {
-                        'id_weighing': data.get('id_weighing'),
-                        'folio_number': data.get('folio_number'),
-                        'gross_weight': new_gross_weight,
-                        'tare_weight': tare_weight,
-                        'date_end': current_date_time,
-                        'net_weight': new_net_weight,
-                        'id_changes': 0,
-                        'scale_record_status': "Cerrado",
-                        'id_user_closed': id_user_closed,
-                        'notes': data.get('notes')
-                    }
-                    self.logger.info(f"💾 Guardando cierre principal - Folio: {weighing_closed_data['folio_number']}")
-                    result = db_manager.close_weighing_input_alm2(weighing_closed_data)
-                    self.logger.info(f"✅ Cierre principal completado: {result}")
+                weighing_closed_data = {
+                    'id_weighing': data.get('id_weighing'),
+                    'folio_number': data.get('folio_number'),
+                    'gross_weight': new_gross_weight,
+                    'tare_weight': tare_weight,
+                    'date_end': current_date_time,
+                    'net_weight': new_net_weight,
+                    'id_changes': 0,
+                    'scale_record_status': "Cerrado",
+                    'id_user_closed': id_user_closed,
+                    'notes': data.get('notes')
+                }
+                # ALM2 y principal se cierran juntos; el principal va al final para el ticket
+                self.logger.info(f"💾 Guardando cierre ALM2 + principal - Folio: {weighing_closed_data['folio_number']}")
+                result = db_manager.close_weighings([
+                    (weighing_closed_data_alm2, None),
+                    (weighing_closed_data, None),
+                ])
+                self.logger.info(f"✅ Cierre ALM2 + principal completado: exito={result['exito']}")
             else:
                 self.logger.info("🔔 Cerrando pesaje entrada normal")
                 gross_weight = data.get('gross_weight')
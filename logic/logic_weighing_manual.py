@@ -271,16 +271,17 @@ class WeighingManualLogic:
             self.logger.info(f"📊 Datos procesados - Descuento: {customer_discount}, se puede descontar material: {material_spd}, ID del folio: {id_folio_selected}")
             if customer_discount > 0 and material_spd == 1:
                 self.logger.info("🔔 Aplicando descuento ALM2")
+                # El pesaje de ALM2 se guarda junto con el principal, en la misma transacción
                 new_datos, weighing_data_alm2 = self._create_weighing_input_alm2_manual(datos, weighing_type)
-                db_manager.save_manual_weighing_record(weighing_data_alm2)
                 datos = new_datos
                 weighing_data = self._create_weighing_manual(datos, weighing_type)
             
             else:
+                weighing_data_alm2 = None
                 weighing_data = self._create_weighing_manual(datos, weighing_type)
             
             self.logger.info(f"💾 Guardando registro en base de datos - Folio: {datos['folio']}")
-            exito, siguiente_folio = db_manager.save_manual_weighing_record(weighing_data)
+            exito, siguiente_folio = db_manager.save_manual_weighing_record(weighing_data, companion=weighing_data_alm2)
             
             if exito and siguiente_folio:
                 # Actualizar el campo folio en la UI con el siguiente folio
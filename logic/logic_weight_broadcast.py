@@ -0,0 +1,265 @@
+# logic_weight_broadcast.py
+
+import json
+import selectors
+import socket
+import sys
+import threading
+import time
+from utils.logger_config import app_logger
+
+
+class _Subscriber:
+    """Cliente conectado: buzón con el último mensaje por llave y lo pendiente de enviar"""
+
+    def __init__(self, sock, address, mailbox):
+        self.sock = sock
+        self.address = address
+        self.mailbox = mailbox   # llave -> bytes (solo el valor más reciente)
+        self.outbuf = b''
+        self.sent = 0
+        self.dropped = 0
+
+
+class WeightBroadcastServer:
+    """
+    Difusión local del peso en vivo (TCP, una línea JSON por mensaje).
+
+    Pensado para pantallas de patio, controladores de pluma u otra PC de
+    operación. publish() nunca bloquea al lector de la báscula: cada
+    suscriptor tiene un buzón con el último valor por (plataforma, tipo) y, si
+    un cliente lento no ha terminado de recibir, el valor anterior se
+    reemplaza (se descarta) en lugar de encolarse.
+    """
+
+    def __init__(self, host='127.0.0.1', port=8765, max_clients=32):
+        self.logger = app_logger.getChild('WeightBroadcastServer')
+        self.host = host
+        self.port = int(port)
+        self.max_clients = max_clients
+
+        self.selector = selectors.DefaultSelector()
+        self.server_sock = None
+        self.thread = None
+        self.running = False
+        self.sequence = 0
+
+        self._lock = threading.Lock()
+        self._latest = {}       # llave -> bytes, para los clientes que se conectan después
+        self._subscribers = {}  # socket -> _Subscriber
+        self._wake_recv, self._wake_send = socket.socketpair()
+        self._wake_recv.setblocking(False)
+        self._wake_send.setblocking(False)
+
+    def start(self):
+        """Abrir el socket de escucha e iniciar el hilo de difusión"""
+        if self.running:
+            return True
+        try:
+            self.server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.server_sock.bind((self.host, self.port))
+            self.server_sock.listen()
+            self.server_sock.setblocking(False)
+        except OSError as e:
+            self.logger.error(f"❌ No se pudo iniciar la difusión de peso en {self.host}:{self.port}: {e}")
+            self.server_sock = None
+            return False
+
+        self.port = self.server_sock.getsockname()[1]
+        self.selector.register(self.server_sock, selectors.EVENT_READ, 'accept')
+        self.selector.register(self._wake_recv, selectors.EVENT_READ, 'wake')
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="WeightBroadcastThread")
+        self.thread.daemon = True
+        self.thread.start()
+        self.logger.info(f"📡 Difusión de peso escuchando en {self.host}:{self.port}")
+        return True
+
+    def stop(self):
+        self.running = False
+        self._wake()
+        if self.thread:
+            self.thread.join(timeout=2)
+
+    def publish(self, key, message):
+        """
+        Publicar un mensaje (dict) para todos los suscriptores. Seguro desde cualquier hilo.
+
+        Args:
+            key: Llave del buzón, p. ej. ('Báscula 1', 'weight'); un mensaje nuevo
+                 con la misma llave reemplaza al que no se haya enviado todavía
+            message: dict serializable a JSON
+        """
+        with self._lock:
+            self.sequence += 1
+            message = dict(message, seq=self.sequence, ts=round(time.time(), 3))
+            data = (json.dumps(message, ensure_ascii=False) + '\n').encode('utf-8')
+            self._latest[key] = data
+            wake = False
+            for subscriber in self._subscribers.values():
+                if key in subscriber.mailbox:
+                    subscriber.dropped += 1
+                else:
+                    # Solo hace falta despertar al hilo si el buzón estaba vacío
+                    wake = wake or not subscriber.mailbox
+                subscriber.mailbox[key] = data
+        if wake:
+            self._wake()
+
+    def publish_weight(self, platform, display_text, color, is_stable=False, stable_weight=None):
+        """Publicar el peso mostrado de una plataforma"""
+        first_token = display_text.split()[0] if display_text else ''
+        weight = int(first_token) if first_token.lstrip('-').isdigit() else None
+        parts = display_text.split(maxsplit=1)
+        self.publish((platform, 'weight'), {
+            'type': 'weight',
+            'platform': platform,
+            'weight': weight,
+            'unit': parts[1] if len(parts) > 1 and color == 'green' else None,
+            'display': display_text,
+            'ok': color == 'green',
+            'stable': bool(is_stable),
+            'stable_weight': stable_weight
+        })
+
+    def publish_stable(self, platform, weight):
+        """Publicar un evento de peso estable de una plataforma"""
+        self.publish((platform, 'stable'), {
+            'type': 'stable',
+            'platform': platform,
+            'weight': weight
+        })
+
+    def _wake(self):
+        try:
+            self._wake_send.send(b'\0')
+        except (BlockingIOError, OSError):
+            pass  # Ya hay un aviso pendiente
+
+    def _run(self):
+        while self.running:
+            for key, events in self.selector.select(timeout=1):
+                if key.data == 'accept':
+                    self._accept()
+                elif key.data == 'wake':
+                    try:
+                        self._wake_recv.recv(4096)
+                    except OSError:
+                        pass
+                else:
+                    subscriber = key.data
+                    if events & selectors.EVENT_READ and not self._read(subscriber):
+                        continue
+                    if events & selectors.EVENT_WRITE:
+                        self._flush(subscriber)
+
+            # Activar la escritura de los clientes con mensajes pendientes
+            with self._lock:
+                subscribers = list(self._subscribers.values())
+            for subscriber in subscribers:
+                if subscriber.mailbox and not subscriber.outbuf:
+                    self._flush(subscriber)
+
+        for subscriber in list(self._subscribers.values()):
+            self._close(subscriber)
+        if self.server_sock:
+            self.selector.unregister(self.server_sock)
+            self.server_sock.close()
+        self.logger.info("⏹️ Difusión de peso detenida")
+
+    def _accept(self):
+        try:
+            sock, address = self.server_sock.accept()
+        except OSError:
+            return
+        if len(self._subscribers) >= self.max_clients:
+            self.logger.warning(f"⚠️ Suscriptor rechazado ({address}): máximo {self.max_clients}")
+            sock.close()
+            return
+
+        sock.setblocking(False)
+        with self._lock:
+            # El cliente nuevo recibe de inmediato el último valor de cada llave
+            subscriber = _Subscriber(sock, address, dict(self._latest))
+            self._subscribers[sock] = subscriber
+        self.selector.register(sock, selectors.EVENT_READ, subscriber)
+        self.logger.info(f"➕ Suscriptor de peso conectado: {address}")
+
+    def _read(self, subscriber):
+        """Los clientes no envían comandos: solo se detecta el cierre"""
+        try:
+            data = subscriber.sock.recv(1024)
+        except BlockingIOError:
+            return True
+        except OSError:
+            data = b''
+        if not data:
+            self._close(subscriber)
+            return False
+        return True
+
+    def _flush(self, subscriber):
+        if not subscriber.outbuf:
+            with self._lock:
+                if not subscriber.mailbox:
+                    return
+                subscriber.outbuf = b''.join(subscriber.mailbox.values())
+                subscriber.sent += len(subscriber.mailbox)
+                subscriber.mailbox = {}
+
+        try:
+            sent = subscriber.sock.send(subscriber.outbuf)
+            subscriber.outbuf = subscriber.outbuf[sent:]
+        except BlockingIOError:
+            pass
+        except OSError:
+            self._close(subscriber)
+            return
+
+        # Esperar a que el socket acepte más datos solo si quedó algo pendiente
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if subscriber.outbuf else 0)
+        self.selector.modify(subscriber.sock, events, subscriber)
+
+    def _close(self, subscriber):
+        with self._lock:
+            self._subscribers.pop(subscriber.sock, None)
+        try:
+            self.selector.unregister(subscriber.sock)
+        except (KeyError, ValueError):
+            pass
+        subscriber.sock.close()
+        self.logger.info(f"➖ Suscriptor de peso desconectado: {subscriber.address}")
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'address': f"{self.host}:{self.port}",
+                'running': self.running,
+                'published': self.sequence,
+                'subscribers': [
+                    {'address': str(sub.address), 'sent': sub.sent, 'dropped': sub.dropped}
+                    for sub in self._subscribers.values()
+                ]
+            }
+
+
+def create_broadcast_server(scale_config):
+    """Crear e iniciar el servidor si 'scale_broadcast_enabled' está activo; None si no"""
+    if str(scale_config.get('scale_broadcast_enabled', '0')).strip().lower() not in ('1', 'true', 'si', 'sí'):
+        return None
+    try:
+        port = int(scale_config.get('scale_broadcast_port', 8765))
+    except (TypeError, ValueError):
+        port = 8765
+    server = WeightBroadcastServer(scale_config.get('scale_broadcast_host') or '127.0.0.1', port)
+    return server if server.start() else None
+
+
+if __name__ == '__main__':
+    # Suscriptor de prueba: imprime cada mensaje recibido
+    host = sys.argv[1] if len(sys.argv) > 1 else '127.0.0.1'
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 8765
+    with socket.create_connection((host, port)) as client:
+        for line in client.makefile('r', encoding='utf-8'):
+            print(line.rstrip())
@@ -0,0 +1,79 @@
+# logic_weight_display_dispatcher.py
+
+import threading
+import tkinter as tk
+from utils.logger_config import app_logger
+
+
+class WeightDisplayDispatcher:
+    """
+    Puente entre los hilos de lectura de la báscula y Tk.
+
+    Los lectores llaman publish() desde su hilo: solo se guarda el último peso
+    en una ranura protegida (sin tocar widgets ni la cola de eventos de Tk).
+    El loop principal de Tk vacía la ranura a una frecuencia máxima
+    (refresh_hz) y aplica los cambios de widgets en el hilo principal, así que
+    una ráfaga de muestras se reduce a una sola actualización por ciclo.
+    """
+
+    def __init__(self, widget, apply_callback, refresh_hz=15):
+        self.logger = app_logger.getChild('WeightDisplayDispatcher')
+        self.widget = widget
+        self.apply_callback = apply_callback
+        try:
+            refresh_hz = float(refresh_hz)
+        except (TypeError, ValueError):
+            refresh_hz = 15
+        self.interval_ms = max(20, int(1000 / max(1.0, refresh_hz)))
+
+        self._lock = threading.Lock()
+        self._latest = None
+        self._after_id = None
+
+        self.published = 0
+        self.applied = 0
+
+    def publish(self, weight_text, text_color):
+        """Guardar el peso más reciente (seguro desde cualquier hilo)"""
+        with self._lock:
+            self._latest = (weight_text, text_color)
+            self.published += 1
+
+    def start(self):
+        """Iniciar el vaciado periódico en el loop de Tk (llamar desde el hilo principal)"""
+        if self._after_id is None:
+            self._after_id = self.widget.after(self.interval_ms, self._drain)
+
+    def stop(self):
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except tk.TclError:
+                pass
+            self._after_id = None
+
+    def _drain(self):
+        with self._lock:
+            latest, self._latest = self._latest, None
+
+        if latest is not None:
+            self.applied += 1
+            try:
+                self.apply_callback(*latest)
+            except Exception as e:
+                self.logger.error(f"Error aplicando peso en la UI: {e}", exc_info=True)
+
+        try:
+            self._after_id = self.widget.after(self.interval_ms, self._drain)
+        except tk.TclError:
+            # El widget fue destruido (cierre de la aplicación)
+            self._after_id = None
+
+    def get_stats(self):
+        """Muestras recibidas vs. actualizaciones aplicadas en la UI"""
+        return {
+            'published': self.published,
+            'applied': self.applied,
+            'coalesced': self.published - self.applied,
+            'interval_ms': self.interval_ms
+        }
@@ -1,11 +1,15 @@
 # main.py
 
+import multiprocessing
 import os
 import sys
 import subprocess
 import tkinter as tk
-import sqlite3
+from db_operations.db_connect import DatabaseManager
 from db_operations.db_create_db import create_database
+from db_operations.db_archive import start_archive_job
+from db_operations.db_backup import start_backup_service
+from db_operations.db_odoo_outbox import start_odoo_outbox_worker
 from db_operations.db_operations import check_and_create_admin_user
 from ui.ui_login import LoginApp
 from utils.logger_config import app_logger, scale_logger  # Importar el logger
@@ -53,14 +57,15 @@ def setup_environment():
 def check_database_tables():
     """Verificar si las tablas esenciales existen en la base de datos"""
     try:
-        conn = sqlite3.connect('scale_app_DB.db')
+        db_manager = DatabaseManager()
+        conn = db_manager.connect_db(row_factory=None)
         cursor = conn.cursor()
         
         # Verificar si la tabla de usuarios existe (tabla clave)
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='users'")
         table_exists = cursor.fetchone() is not None
         
-        conn.close()
+        db_manager.close_db(conn)
         return table_exists
     except Exception as e:
         app_logger.error(f"Error al verificar tablas de la base de datos: {e}")
@@ -94,7 +99,7 @@ def main():
         setup_environment()
         
         # Verificar y crear base de datos
-        if not os.path.exists('scale_app_DB.db') or not check_database_tables():
+        if not os.path.exists(DatabaseManager.default_db_path) or not check_database_tables():
             app_logger.warning("La base de datos no existe o está incompleta. Creándola...")
             scale_logger.info("Iniciando creación de base de datos")
             
@@ -107,7 +112,18 @@ def main():
                 raise Exception("No se pudo crear la base de datos")
         else:
             app_logger.info("Base de datos encontrada y verificada")
-        
+            # Aplicar las migraciones pendientes de versiones anteriores
+            if not create_database():
+                app_logger.error("Falló la actualización del esquema de la base de datos")
+                raise Exception("No se pudo actualizar la base de datos")
+        
+        # Pasar a los archivos anuales los pesajes cerrados antiguos (en segundo plano)
+        start_archive_job()
+        # Respaldos periódicos en línea de la base de datos (en segundo plano)
+        backup_service = start_backup_service()
+        # Envíos a Odoo pendientes en la cola, fuera del hilo de la interfaz
+        odoo_outbox_worker = start_odoo_outbox_worker()
+
         # Verificar y crear usuario admin
         app_logger.info("Verificando usuario administrador...")
         admin_created = check_and_create_admin_user()
@@ -132,6 +148,8 @@ def main():
         
         root.mainloop()
         app_logger.info("Loop principal de la interfaz finalizado")
+        backup_service.stop(timeout=10)
+        odoo_outbox_worker.stop(timeout=5)
         
         # Verificar si se requiere reinicio
         if os.environ.get('RESTART_APP') == '1':
@@ -170,4 +188,7 @@ def main():
         sys.exit(1)
 
 if __name__ == '__main__':
+    # En el .exe de PyInstaller el proceso lector (spawn) vuelve a ejecutar este
+    # punto de entrada: freeze_support() lo atiende antes de abrir la aplicación
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
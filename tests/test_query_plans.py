@@ -0,0 +1,15 @@
+# test_query_plans.py
+
+from db_operations.db_query_plan_check import QUERY_CALLS, check_query_plans, query_methods
+
+
+def test_every_query_method_is_checked():
+    """Cada método público de SearchOperations y WeighingDBManager tiene su llamada en QUERY_CALLS"""
+    checked = {name for name, _, _ in QUERY_CALLS}
+    assert sorted(set(query_methods()) - checked) == []
+    assert sorted(checked - set(query_methods())) == []
+
+
+def test_no_full_table_scans():
+    """Ninguna sentencia recorre una tabla completa, salvo las listas completas sin paginar"""
+    assert check_query_plans(verbose=False) == []
@@ -4,10 +4,11 @@ from tkinter import messagebox, ttk
 import tkinter as tk
 import sys
 import os
+import threading
 from  db_operations.db_users import Users
 from  db_operations.db_odoo_config import OdooConfig
 from logic.logic_odoo_api import test_odoo_connection
-from db_operations.db_config import get_logo_path, get_logo_path_print, save_company_data_settings
+from db_operations.db_config import get_logo_path, get_logo_path_print, save_company_data_settings, get_company_config, save_scale_settings
 
 class AppStylesMenu:
     def __init__(self):
@@ -55,7 +56,7 @@ class DialogWindows:
     def add_company_data(self):
         self.add_data_window = tk.Toplevel(self.root)
         self.add_data_window.title("Agregar datos")
-        self.add_data_window.geometry("500x300")
+        self.add_data_window.geometry("600x300")
         self.add_data_window.config(bg=self.styles.secondary_color)
         frame_logo = tk.Frame(self.add_data_window, bg=self.styles.secondary_color, padx=20, pady=20)
         frame_logo.pack(expand=True)
@@ -79,9 +80,13 @@ class DialogWindows:
         self.entry_port_scale = tk.Entry(frame_logo, font=self.styles.font_title, bg="#FFFFFF", fg=self.styles.entry_second_color)
         self.entry_port_scale.grid(row=3, column=1, pady=10, sticky="ew")
 
-        port_scale_value = "COM4"
+        port_scale_value = get_company_config().get('company_port_scale') or "COM4"
         self.entry_port_scale.insert(0, port_scale_value)
 
+        self.detected_scale = None
+        self.btn_detect_scale = tk.Button(frame_logo, text="Detectar", bg=self.styles.primary_color, fg="white", cursor="hand2", command=self.detect_scale_port)
+        self.btn_detect_scale.grid(row=3, column=2, pady=10, padx=(10, 0))
+
         self.btn_company_data=tk.Button(frame_logo, text="Guardar configuración", bg=self.styles.primary_color, fg="white", cursor="hand2", command=self.save_company_settings)
         self.btn_company_data.grid(row=4, column=1, pady=20, sticky="e")
         frame_logo.columnconfigure(1, weight=1)
@@ -101,11 +106,60 @@ class DialogWindows:
         else:
             messagebox.showerror("Error", "No se pudo guardar el logotipo. Asegúrate de seleccionar un archivo .png o .jpeg.")
 
+    def detect_scale_port(self):
+        """Buscar la báscula en todos los puertos seriales sin bloquear la ventana"""
+        from logic.logic_scale_discovery import discover_scales
+
+        self.btn_detect_scale.config(text="Buscando...", state="disabled")
+        result = {}
+
+        def _worker():
+            try:
+                result['candidates'] = discover_scales()
+            except Exception as e:
+                result['error'] = str(e)
+
+        worker = threading.Thread(target=_worker, name="ScaleDiscoveryThread", daemon=True)
+        worker.start()
+
+        def _check():
+            if worker.is_alive():
+                self.add_data_window.after(200, _check)
+                return
+            self.btn_detect_scale.config(text="Detectar", state="normal")
+            if 'error' in result:
+                messagebox.showerror("Error", f"No se pudo buscar la báscula:\n{result['error']}", parent=self.add_data_window)
+                return
+            candidates = result.get('candidates') or []
+            if not candidates:
+                messagebox.showwarning("Báscula", "No se detectó ninguna báscula transmitiendo.", parent=self.add_data_window)
+                return
+
+            best = candidates[0]
+            self.detected_scale = best
+            self.entry_port_scale.delete(0, tk.END)
+            self.entry_port_scale.insert(0, best['port'])
+            messagebox.showinfo(
+                "Báscula detectada",
+                f"Puerto: {best['port']}\nVelocidad: {best['baudrate']} baud {best['framing']}\n"
+                f"Protocolo: {best['protocol']} ({best['frames']} tramas válidas)",
+                parent=self.add_data_window
+            )
+
+        self.add_data_window.after(200, _check)
+
     def save_company_settings(self):
         address = self.entry_address.get()
         company_name = self.entry_company_name.get()
         port_scale =  self.entry_port_scale.get()
         if address and company_name:
+            # Guardar también velocidad, formato y protocolo si el puerto es el detectado
+            if self.detected_scale and self.detected_scale['port'] == port_scale:
+                save_scale_settings({
+                    'scale_baudrate': self.detected_scale['baudrate'],
+                    'scale_framing': self.detected_scale['framing'],
+                    'scale_protocol': self.detected_scale['protocol']
+                })
             if save_company_data_settings(address, company_name, port_scale):
                 messagebox.showinfo("Éxito", "Configuración de la empresa guardada correctamente.", parent=self.add_data_window)
                 self.add_data_window.destroy()
@@ -33,6 +33,12 @@ class FoliosTab:
                 style="TButton")
          self.print_button.pack(side=tk.LEFT, padx=5)
 
+         # Buscar también en los archivos anuales (pesajes fuera de la base viva)
+         self.search_history_var = tk.BooleanVar(value=False)
+         self.search_history_check = ttk.Checkbutton(action_frame, text="Historial",
+                variable=self.search_history_var, command=self.search_folio)
+         self.search_history_check.pack(side=tk.RIGHT, padx=5)
+
          self.search_folio_entry = ttk.Entry(action_frame)
          self.search_folio_entry.pack(side=tk.RIGHT, padx=5)
          self.search_folio_entry.bind('<KeyRelease>', self.search_folio)
@@ -98,6 +104,6 @@ class FoliosTab:
     search_text = self.search_folio_entry.get().strip()
     
     if search_text:
-        self.folio_table.update_table(search_text)            
+        self.folio_table.update_table(search_text, include_history=self.search_history_var.get())
     else:
         self.folio_table.load_folios()
\ No newline at end of file
@@ -5,6 +5,7 @@ import tkinter as tk
 from tkinter import ttk
 from db_operations.db_config import load_logo, set_window_icon
 from db_operations.db_config import get_company_config
+from db_operations.db_change_notifier import get_change_notifier
 from ui.ui_menu_handlers import MenuHandlers
 from ui.ui_tab_creators import TabCreators
 from logic.logic_autocomplete import AutocompleteHandler  # Nuevo import
@@ -67,6 +68,9 @@ class MainApp:
         # SÉPTIMO: Crear el menú
         self.create_menu_bar()
 
+        # OCTAVO: Vigilar cambios en la base (de esta u otras estaciones) para las tablas y autocompletados
+        get_change_notifier().start(self.root)
+
         
         
         self.root.update_idletasks()
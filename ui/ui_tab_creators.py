@@ -54,11 +54,11 @@ class TabCreators:
             
             # Si la pestaña seleccionada es "Folios", cargar los datos
             if tab_text == "Folios" and self.folios_tab_instance:
-                self.folios_tab_instance.folio_table.load_folios()
+                self.folios_tab_instance.folio_table.load_if_changed()
 
             if tab_text == "Registrar peso" and self.create_pesaje_tab_instance:
                 self.create_pesaje_tab_instance.set_initial_folio()
 
             if tab_text == "Generar folio manual" and self.manual_folios_instance:
                 self.manual_folios_instance._set_initial_folio()
-                self.manual_folios_instance.table_all_folios.refresh_table()
\ No newline at end of file
+                self.manual_folios_instance.table_all_folios.load_if_changed()
\ No newline at end of file
@@ -4,11 +4,13 @@ import tkinter as tk
 import datetime
 from tkinter import ttk, messagebox  
 from logic.logic_scale_manager import ScaleManager
+from logic.logic_weight_display_dispatcher import WeightDisplayDispatcher
 from logic.logic_weighing import WeighingLogic
 from logic.logic_weighing_video import WeighingVideo
 from logic.logic_weighing_automatic_close import AutomaticClose
 from logic.logic_print_folios import print_weighing_ticket
 from db_operations.db_save_folio import WeighingDBManager
+from db_operations.db_config import get_scale_config
 from logic.logic_tables_weighings import PendingWeighingsTable
 from utils.logger_config import app_logger
 
@@ -36,7 +38,14 @@ class PesajeTab:
         # Inicializar el manager de base de datos
         self.db_manager = WeighingDBManager()
         self.video_manager = WeighingVideo()
-        self.update_weight_display = self._create_weight_display_callback()
+
+        # Los hilos de la báscula solo publican el último peso; Tk lo aplica a frecuencia limitada
+        self.weight_dispatcher = WeightDisplayDispatcher(
+            self.frame,
+            self._apply_weight_display,
+            refresh_hz=get_scale_config().get('scale_display_hz')
+        )
+        self.update_weight_display = self.weight_dispatcher.publish
         
         # Inyectar dependencias
         self.scale_manager = ScaleManager(update_callback=self.update_weight_display)
@@ -49,42 +58,38 @@ class PesajeTab:
         
         self.logger.info("Pestaña de pesaje inicializada correctamente")
     
-    def _create_weight_display_callback(self):
-        """Crear el callback para actualizar el display de peso"""
-        def update_callback(weight_text, text_color):
-            """Callback para actualizar la etiqueta de peso"""
-            timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-            
-            # Actualizar la UI de forma segura desde el hilo principal
-            if hasattr(self, 'weight_label') and self.weight_label.winfo_exists():
-                try:
-                    self.weight_label.after(0, lambda: self.weight_label.config(
-                        text=weight_text,  foreground=text_color))
-                    weight_int = int(weight_text.split()[0])
-                    if weight_int <=0:
-                        self.weight_status = False
-                        self.entrada_button.config(state="disabled")
-                        self.salida_button.config(state="disabled")#btn_exit_with_weight
-                        self.btn_exit_with_weight.config(state="disabled")#btn_exit_with_weight
-                        self.close_folio_button.config(state="disabled")
-                        self._clear_form_automatic()
-                    else:
-                        self.weight_status = True
-                        if self.btn_status:
-                            self.entrada_button.config(state="normal")
-                            self.salida_button.config(state="normal")
-                            self.btn_exit_with_weight.config(state="normal")#btn_exit_with_weight
-                        self.logger.debug(f"Peso actualizado: {weight_text}, Estado botones: {self.btn_status}")
-                        
-                except Exception as e:
-                    self.logger.error(f"Error actualizando UI del peso: {str(e)}", exc_info=True)
-                    messagebox.showerror(
-                        "Error Inesperado",
-                        f"❌ BSC-Error actualizando UI:\n{str(e)}")
+    def _apply_weight_display(self, weight_text, text_color):
+        """Actualizar la etiqueta de peso y los botones (siempre en el hilo principal de Tk)"""
+        if not (hasattr(self, 'weight_label') and self.weight_label.winfo_exists()):
+            self.logger.warning("Label de peso no disponible o destruido")
+            return
+
+        try:
+            self.weight_label.config(text=weight_text, foreground=text_color)
+            weight_int = int(weight_text.split()[0])
+            if weight_int <= 0:
+                was_loaded = self.weight_status
+                self.weight_status = False
+                self.entrada_button.config(state="disabled")
+                self.salida_button.config(state="disabled")#btn_exit_with_weight
+                self.btn_exit_with_weight.config(state="disabled")#btn_exit_with_weight
+                self.close_folio_button.config(state="disabled")
+                # Limpiar el formulario solo cuando la báscula pasa de cargada a vacía
+                if was_loaded:
+                    self._clear_form_automatic()
             else:
-                self.logger.warning("Label de peso no disponible o destruido")
-        
-        return update_callback
+                self.weight_status = True
+                if self.btn_status:
+                    self.entrada_button.config(state="normal")
+                    self.salida_button.config(state="normal")
+                    self.btn_exit_with_weight.config(state="normal")#btn_exit_with_weight
+                self.logger.debug(f"Peso actualizado: {weight_text}, Estado botones: {self.btn_status}")
+
+        except Exception as e:
+            self.logger.error(f"Error actualizando UI del peso: {str(e)}", exc_info=True)
+            messagebox.showerror(
+                "Error Inesperado",
+                f"❌ BSC-Error actualizando UI:\n{str(e)}")
     
     def _create_ui(self):
         """Solo creación de widgets visuales"""
@@ -212,7 +217,23 @@ class PesajeTab:
         self.weight_label = ttk.Label(scale_control_frame, text="0 kg",  font=("Helvetica",30 , "bold"), foreground="green")
         self.weight_label.pack(side=tk.LEFT, padx=100)
 
-        
+        # Selector de plataforma (solo en sitios con varias básculas)
+        platform_names = self.scale_manager.platform_names
+        if len(platform_names) > 1:
+            ttk.Label(scale_control_frame, text="Plataforma:", style="TLabel").pack(side=tk.LEFT, padx=(20, 5))
+            self.platform_var = tk.StringVar(value=self.scale_manager.selected_platform)
+            platform_combo = ttk.Combobox(scale_control_frame, textvariable=self.platform_var,
+                                          values=platform_names, state="readonly", width=15)
+            platform_combo.pack(side=tk.LEFT)
+            platform_combo.bind("<<ComboboxSelected>>", self._on_platform_selected)
+
+    def _on_platform_selected(self, event=None):
+        """Mostrar el peso de la plataforma elegida"""
+        platform = self.platform_var.get()
+        self.logger.info(f"Plataforma seleccionada: {platform}")
+        self.scale_manager.select_platform(platform)
+
+
     def _connect_disconnect(self):
         """Conectar y desconectar la bascula"""
         current_text = self.btn_scale_control.cget('text')
@@ -476,6 +497,7 @@ class PesajeTab:
         }
         self.weighing_logic.set_ui_references(ui_references)
         
+        self.weight_dispatcher.start()
         self.scale_manager.connect()  # Conectar automáticamente
         self.logger.debug("Managers configurados exitosamente")
 
@@ -900,9 +922,10 @@ class PesajeTab:
                 return None
             else:
                 self.logger.warning(f"No se encontró el registro con Folio {data['folio_number']} para cerrar")
+                error = result.get('error') or f"No se encontró el registro con Folio  {data['folio_number']} para cerrar."
                 messagebox.showerror(
                     "Error",
-                    f"⚠️ No se encontró el registro con Folio  {data['folio_number']} para cerrar.",
+                    f"⚠️ {error}",
                     parent=self.frame
                 )
                 return None
@@ -964,9 +987,10 @@ class PesajeTab:
                 return None
             else:
                 self.logger.error(f"Error en cierre automático: {data['folio_number']}")
+                error = result.get('error') or f"No se encontró el registro con Folio  {data['folio_number']} para cerrar."
                 messagebox.showerror(
                     "Error CWWA",
-                    f"⚠️ CWWA-No se encontró el registro con Folio  {data['folio_number']} para cerrar.",
+                    f"⚠️ CWWA-{error}",
                     parent=self.frame
                 )
                 return None